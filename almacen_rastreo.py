@@ -0,0 +1,122 @@
+import json
+import sqlite3
+import time
+
+'''
+* CLASE: AlmacenRastreo
+* DESCRIPCIÓN: Clase que persiste en disco el estado de un rastreo (frontera, URLs visitadas y monederos encontrados)
+               en una base de datos SQLite en modo WAL. Las escrituras se acumulan en memoria y se confirman por
+               lotes, de modo que un cierre inesperado solo pierde el último lote y el rastreo puede reanudarse
+               sin volver a descargar las páginas ya visitadas.
+'''
+class AlmacenRastreo():
+    def __init__(self, ruta, tamano_lote=500, intervalo_confirmacion=5.0):
+        self.ruta = ruta
+        self.tamano_lote = tamano_lote
+        self.intervalo_confirmacion = intervalo_confirmacion
+
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, visitada INTEGER NOT NULL DEFAULT 0, "
+                              "profundidad INTEGER NOT NULL DEFAULT 0)")
+        # Los ficheros de versiones anteriores no guardan la profundidad: sus URLs se consideran iniciales
+        if "profundidad" not in [fila[1] for fila in self.conexion.execute("PRAGMA table_info(urls)")]:
+            self.conexion.execute("ALTER TABLE urls ADD COLUMN profundidad INTEGER NOT NULL DEFAULT 0")
+        self.conexion.execute("CREATE TABLE IF NOT EXISTS resultados (url TEXT PRIMARY KEY, direcciones TEXT NOT NULL)")
+        self.conexion.commit()
+
+        # Escrituras pendientes de confirmar
+        self.lista_urls_nuevas = []
+        self.lista_urls_visitadas = []
+        self.lista_resultados = []
+        self.instante_ultima_confirmacion = time.monotonic()
+
+    '''
+    * FUNCIÓN: cargar
+    * DESCRIPCIÓN: Lee el estado guardado de un rastreo anterior.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Lista de pares (URL, profundidad) pendientes de visitar, en orden de descubrimiento.
+        - Lista de URLs ya visitadas.
+        - Diccionario de resultados. Clave: URL. Valor: Lista de monederos Bitcoin.
+    '''
+    def cargar(self):
+        lista_urls_pendientes = self.conexion.execute("SELECT url, profundidad FROM urls WHERE visitada = 0 ORDER BY rowid").fetchall()
+        lista_urls_visitadas = [fila[0] for fila in self.conexion.execute("SELECT url FROM urls WHERE visitada = 1")]
+        diccionario_url_direcciones = {url: json.loads(direcciones) for url, direcciones
+                                       in self.conexion.execute("SELECT url, direcciones FROM resultados ORDER BY rowid")}
+        return lista_urls_pendientes, lista_urls_visitadas, diccionario_url_direcciones
+
+    '''
+    * FUNCIÓN: registrar_url
+    * DESCRIPCIÓN: Registra una URL añadida a la frontera.
+    * ARGS_IN:
+        - url: dirección de la página encolada.
+        - profundidad: número de enlaces seguidos desde las URLs iniciales hasta la página.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def registrar_url(self, url, profundidad=0):
+        self.lista_urls_nuevas.append((url, profundidad))
+        self.confirmar_si_procede()
+
+    '''
+    * FUNCIÓN: registrar_visita
+    * DESCRIPCIÓN: Registra una URL como visitada junto con los monederos encontrados en ella, si los hay.
+    * ARGS_IN:
+        - url: dirección de la página visitada.
+        - lista_direcciones: lista de monederos Bitcoin encontrados en la página (Opcional).
+    * ARGS_OUT:
+        - N/A
+    '''
+    def registrar_visita(self, url, lista_direcciones=None):
+        self.lista_urls_visitadas.append((url,))
+        if lista_direcciones:
+            self.lista_resultados.append((url, json.dumps(lista_direcciones)))
+        self.confirmar_si_procede()
+
+    '''
+    * FUNCIÓN: confirmar_si_procede
+    * DESCRIPCIÓN: Confirma las escrituras pendientes si se ha alcanzado el tamaño de lote o el intervalo máximo.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def confirmar_si_procede(self):
+        num_pendientes = len(self.lista_urls_nuevas) + len(self.lista_urls_visitadas) + len(self.lista_resultados)
+        if num_pendientes >= self.tamano_lote or time.monotonic() - self.instante_ultima_confirmacion >= self.intervalo_confirmacion:
+            self.confirmar()
+
+    '''
+    * FUNCIÓN: confirmar
+    * DESCRIPCIÓN: Escribe en una única transacción todas las escrituras pendientes.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def confirmar(self):
+        with self.conexion:
+            self.conexion.executemany("INSERT OR IGNORE INTO urls (url, profundidad) VALUES (?, ?)", self.lista_urls_nuevas)
+            self.conexion.executemany("INSERT INTO urls (url, visitada) VALUES (?, 1) ON CONFLICT(url) DO UPDATE SET visitada = 1",
+                                      self.lista_urls_visitadas)
+            self.conexion.executemany("INSERT OR REPLACE INTO resultados (url, direcciones) VALUES (?, ?)", self.lista_resultados)
+        self.lista_urls_nuevas.clear()
+        self.lista_urls_visitadas.clear()
+        self.lista_resultados.clear()
+        self.instante_ultima_confirmacion = time.monotonic()
+
+    '''
+    * FUNCIÓN: cerrar
+    * DESCRIPCIÓN: Confirma las escrituras pendientes y cierra la base de datos.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar(self):
+        self.confirmar()
+        self.conexion.close()
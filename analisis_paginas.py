@@ -0,0 +1,43 @@
+from urllib.parse import urljoin
+from analizador_html import extraer_texto_y_enlaces
+from extractor_direcciones import encontrar_direcciones_bitcoin
+from huellas_contenido import calcular_huella
+from normalizacion_urls import normalizar_url
+
+'''
+* DESCRIPCIÓN: Etapa de análisis de las páginas descargadas por el crawler. Solo depende de lxml y del motor de
+               extracción de direcciones, de modo que puede ejecutarse tanto en el hilo de rastreo como en los
+               procesos de un ProcessPoolExecutor, que reciben el contenido en bruto de cada página.
+'''
+
+
+'''
+* FUNCIÓN: analizar_pagina
+* DESCRIPCIÓN: Analiza el contenido de una página, busca direcciones Bitcoin y nuevos enlaces para visitar y calcula
+               la huella de su texto para detectar páginas casi duplicadas.
+* ARGS_IN:
+    - contenido: cuerpo de la página, en bytes sin decodificar o como texto.
+    - url_base: URL de la página, para resolver los enlaces relativos.
+* ARGS_OUT:
+    - set con las direcciones de monederos Bitcoin encontrados en el texto.
+    - set con los enlaces normalizados a páginas de servicios ocultos encontrados en el código.
+    - Huella del texto de la página. None, si el texto es demasiado corto para compararlo.
+'''
+def analizar_pagina(contenido, url_base):
+    if not contenido:
+        return set(), set(), None
+    if isinstance(contenido, (bytes, bytearray)):
+        contenido = contenido.decode('utf-8', errors='replace')
+
+    # Texto visible y enlaces obtenidos en una única pasada incremental, sin construir el árbol del documento
+    texto, lista_hrefs = extraer_texto_y_enlaces(contenido)
+    set_direcciones_bitcoin = encontrar_direcciones_bitcoin(texto)
+    set_enlaces = set()
+    for href in lista_hrefs:
+        try:
+            url = normalizar_url(urljoin(url_base, href))
+        except ValueError:
+            continue
+        if url:
+            set_enlaces.add(url)
+    return set_direcciones_bitcoin, set_enlaces, calcular_huella(texto)
@@ -0,0 +1,157 @@
+from lxml import etree
+
+'''
+* DESCRIPCIÓN: Analizador incremental de HTML. Recorre el documento en una única pasada con el analizador de lxml en
+               modo objetivo (eventos de tipo SAX), recogiendo el texto visible y los atributos href de los enlaces
+               sin construir el árbol del documento. Reproduce el resultado de BeautifulSoup(html, 'lxml') con
+               get_text(separator=' ') y find_all('a', href=True).
+'''
+
+# Etiquetas cuyo texto BeautifulSoup excluye de get_text (hojas de estilo, scripts, plantillas y anotaciones ruby)
+ETIQUETAS_SIN_TEXTO = frozenset(("script", "style", "template", "rt", "rp"))
+
+# Número de caracteres entregados al analizador en cada llamada
+TAMANO_FRAGMENTO_ANALISIS = 65536
+
+
+'''
+* CLASE: ObjetivoAnalizador
+* DESCRIPCIÓN: Clase objetivo del analizador de lxml. Recibe los eventos de apertura y cierre de etiquetas, texto y
+               comentarios. Los fragmentos de texto consecutivos se agrupan en una única cadena, que se cierra en el
+               siguiente evento de etiqueta o comentario, igual que las cadenas de BeautifulSoup.
+'''
+class ObjetivoAnalizador():
+    def __init__(self):
+        self.lista_textos = []
+        self.lista_hrefs = []
+        # Fragmentos de la cadena de texto en curso
+        self.lista_fragmentos = []
+        # Número de etiquetas sin texto abiertas
+        self.num_etiquetas_sin_texto = 0
+
+    '''
+    * FUNCIÓN: start
+    * DESCRIPCIÓN: Evento de apertura de una etiqueta.
+    * ARGS_IN:
+        - etiqueta: nombre de la etiqueta.
+        - atributos: diccionario de atributos de la etiqueta.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def start(self, etiqueta, atributos):
+        self.cerrar_texto()
+        if etiqueta in ETIQUETAS_SIN_TEXTO:
+            self.num_etiquetas_sin_texto += 1
+        elif etiqueta == "a":
+            href = atributos.get("href")
+            if href:
+                self.lista_hrefs.append(href)
+
+    '''
+    * FUNCIÓN: end
+    * DESCRIPCIÓN: Evento de cierre de una etiqueta.
+    * ARGS_IN:
+        - etiqueta: nombre de la etiqueta.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def end(self, etiqueta):
+        self.cerrar_texto()
+        if etiqueta in ETIQUETAS_SIN_TEXTO:
+            self.num_etiquetas_sin_texto -= 1
+
+    '''
+    * FUNCIÓN: data
+    * DESCRIPCIÓN: Evento de texto. lxml puede entregar una misma cadena en varios fragmentos.
+    * ARGS_IN:
+        - fragmento: texto recibido.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def data(self, fragmento):
+        self.lista_fragmentos.append(fragmento)
+
+    '''
+    * FUNCIÓN: comment
+    * DESCRIPCIÓN: Evento de comentario. Los comentarios no forman parte del texto.
+    * ARGS_IN:
+        - texto: contenido del comentario.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def comment(self, texto):
+        self.cerrar_texto()
+
+    '''
+    * FUNCIÓN: pi
+    * DESCRIPCIÓN: Evento de instrucción de procesamiento. No forma parte del texto.
+    * ARGS_IN:
+        - destino: destino de la instrucción.
+        - datos: contenido de la instrucción.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def pi(self, destino, datos=None):
+        self.cerrar_texto()
+
+    '''
+    * FUNCIÓN: doctype
+    * DESCRIPCIÓN: Evento de declaración de tipo de documento. No forma parte del texto.
+    * ARGS_IN:
+        - nombre: nombre del tipo de documento.
+        - id_publico: identificador público.
+        - url_sistema: identificador de sistema.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def doctype(self, nombre, id_publico, url_sistema):
+        self.cerrar_texto()
+
+    '''
+    * FUNCIÓN: close
+    * DESCRIPCIÓN: Evento de fin de documento.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Texto visible del documento, con sus cadenas separadas por espacios.
+        - Lista de valores no vacíos de los atributos href de los enlaces.
+    '''
+    def close(self):
+        self.cerrar_texto()
+        return ' '.join(self.lista_textos), self.lista_hrefs
+
+    '''
+    * FUNCIÓN: cerrar_texto
+    * DESCRIPCIÓN: Cierra la cadena de texto en curso y la añade al texto visible si no está dentro de una etiqueta
+                   sin texto.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar_texto(self):
+        if self.lista_fragmentos:
+            if not self.num_etiquetas_sin_texto:
+                self.lista_textos.append(''.join(self.lista_fragmentos))
+            self.lista_fragmentos = []
+
+
+'''
+* FUNCIÓN: extraer_texto_y_enlaces
+* DESCRIPCIÓN: Analiza un documento HTML en una única pasada incremental, sin construir su árbol.
+* ARGS_IN:
+    - html: código HTML de la página.
+* ARGS_OUT:
+    - Texto visible del documento, con sus cadenas separadas por espacios.
+    - Lista de valores no vacíos de los atributos href de los enlaces.
+'''
+def extraer_texto_y_enlaces(html):
+    objetivo = ObjetivoAnalizador()
+    analizador = etree.HTMLParser(target=objetivo, recover=True)
+    try:
+        for inicio in range(0, max(len(html), 1), TAMANO_FRAGMENTO_ANALISIS):
+            analizador.feed(html[inicio:inicio + TAMANO_FRAGMENTO_ANALISIS])
+        return analizador.close()
+    except etree.LxmlError:
+        # Documento irrecuperable: se devuelve lo recogido hasta el error
+        return objetivo.close()
@@ -0,0 +1,167 @@
+'''
+* DESCRIPCIÓN: Utilidades para mostrar listas de gran tamaño en un ttk.Treeview sin bloquear la interfaz: carga de
+               filas por bloques a medida que el usuario se desplaza y un índice de búsqueda en memoria para
+               filtrar los elementos mostrados.
+'''
+
+# Número de filas insertadas en el árbol en cada bloque
+TAMANO_BLOQUE = 500
+# Fracción de la lista visible a partir de la cual se carga el siguiente bloque
+UMBRAL_CARGA = 0.9
+
+
+'''
+* CLASE: ArbolPaginado
+* DESCRIPCIÓN: Clase que muestra una lista de elementos en un ttk.Treeview insertando solo los primeros bloques de
+               filas. Cuando el usuario se desplaza hasta el final de las filas insertadas, se inserta el siguiente
+               bloque. Los elementos añadidos a la lista tras mostrarla se insertan si caben en los bloques cargados.
+'''
+class ArbolPaginado():
+    def __init__(self, arbol, barra_desplazamiento, funcion_insertar, tamano_bloque=TAMANO_BLOQUE):
+        self.arbol = arbol
+        self.barra_desplazamiento = barra_desplazamiento
+        # Función que inserta en el árbol la fila (o filas) de un elemento
+        self.funcion_insertar = funcion_insertar
+        self.tamano_bloque = tamano_bloque
+
+        # Elementos de la vista actual, número de elementos insertados y número máximo de elementos a insertar
+        self.lista_elementos = []
+        self.num_insertados = 0
+        self.limite_insertados = tamano_bloque
+
+        self.arbol.configure(yscrollcommand=self.desplazamiento)
+
+    '''
+    * FUNCIÓN: mostrar
+    * DESCRIPCIÓN: Sustituye los elementos mostrados en el árbol e inserta el primer bloque.
+    * ARGS_IN:
+        - lista_elementos: lista de elementos a mostrar.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def mostrar(self, lista_elementos):
+        self.arbol.delete(*self.arbol.get_children())
+        self.lista_elementos = lista_elementos
+        self.num_insertados = 0
+        self.limite_insertados = self.tamano_bloque
+        self.completar()
+
+    '''
+    * FUNCIÓN: agregar
+    * DESCRIPCIÓN: Añade elementos al final de la vista actual. Solo se insertan en el árbol si caben en los bloques
+                   ya cargados; el resto se insertan al desplazarse.
+    * ARGS_IN:
+        - lista_elementos: lista de elementos a añadir.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def agregar(self, lista_elementos):
+        self.lista_elementos.extend(lista_elementos)
+        self.completar()
+
+    '''
+    * FUNCIÓN: completar
+    * DESCRIPCIÓN: Inserta los elementos pendientes de la vista hasta alcanzar el límite de filas cargadas.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def completar(self):
+        fin = min(len(self.lista_elementos), self.limite_insertados)
+        for elemento in self.lista_elementos[self.num_insertados:fin]:
+            self.funcion_insertar(elemento)
+        self.num_insertados = max(self.num_insertados, fin)
+
+    '''
+    * FUNCIÓN: desplazamiento
+    * DESCRIPCIÓN: Función asociada al desplazamiento vertical del árbol. Actualiza la barra de desplazamiento y, si
+                   se ha alcanzado el final de las filas insertadas, carga el siguiente bloque.
+    * ARGS_IN:
+        - inicio: fracción de la lista en la parte superior de la vista.
+        - fin: fracción de la lista en la parte inferior de la vista.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def desplazamiento(self, inicio, fin):
+        self.barra_desplazamiento.set(inicio, fin)
+        if float(fin) >= UMBRAL_CARGA and self.num_insertados < len(self.lista_elementos):
+            self.limite_insertados = self.num_insertados + self.tamano_bloque
+            self.completar()
+
+
+'''
+* CLASE: IndiceBusqueda
+* DESCRIPCIÓN: Clase que indexa en memoria un conjunto de elementos para filtrarlos por texto. Un elemento coincide
+               si el texto aparece en su clave de búsqueda, precalculada en minúsculas. Cada búsqueda recorre todas
+               las claves: una dirección o un hash completos pueden ser subcadena de los de otro elemento, así que un
+               diccionario de términos exactos no evitaría el recorrido.
+'''
+class IndiceBusqueda():
+    def __init__(self):
+        self.lista_elementos = []
+        self.lista_claves = []
+
+    '''
+    * FUNCIÓN: agregar
+    * DESCRIPCIÓN: Añade un elemento al índice.
+    * ARGS_IN:
+        - elemento: elemento a indexar.
+        - texto: texto en el que se busca el elemento.
+    * ARGS_OUT:
+        - Posición del elemento en el índice.
+    '''
+    def agregar(self, elemento, texto):
+        self.lista_elementos.append(elemento)
+        self.lista_claves.append(texto.lower())
+        return len(self.lista_elementos) - 1
+
+    '''
+    * FUNCIÓN: actualizar
+    * DESCRIPCIÓN: Añade texto a la clave de búsqueda de un elemento ya indexado.
+    * ARGS_IN:
+        - posicion: posición del elemento en el índice.
+        - texto: texto a añadir.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def actualizar(self, posicion, texto):
+        self.lista_claves[posicion] += ' ' + texto.lower()
+
+    '''
+    * FUNCIÓN: buscar
+    * DESCRIPCIÓN: Devuelve los elementos que contienen el texto indicado, en orden de inserción.
+    * ARGS_IN:
+        - texto: texto a buscar. Si está vacío, se devuelven todos los elementos.
+    * ARGS_OUT:
+        - Lista de elementos encontrados.
+    '''
+    def buscar(self, texto):
+        texto = texto.strip().lower()
+        if not texto:
+            return list(self.lista_elementos)
+        return [elemento for elemento, clave in zip(self.lista_elementos, self.lista_claves) if texto in clave]
+
+    '''
+    * FUNCIÓN: coincide
+    * DESCRIPCIÓN: Comprueba si el elemento de una posición contiene el texto indicado.
+    * ARGS_IN:
+        - posicion: posición del elemento en el índice.
+        - texto: texto a buscar.
+    * ARGS_OUT:
+        - True si el elemento contiene el texto o el texto está vacío.
+    '''
+    def coincide(self, posicion, texto):
+        texto = texto.strip().lower()
+        return not texto or texto in self.lista_claves[posicion]
+
+    '''
+    * FUNCIÓN: __len__
+    * DESCRIPCIÓN: Número de elementos indexados.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Número de elementos.
+    '''
+    def __len__(self):
+        return len(self.lista_elementos)
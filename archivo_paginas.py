@@ -0,0 +1,315 @@
+import os
+import sys
+import gzip
+import json
+import mmap
+import uuid
+import zlib
+import time
+import argparse
+import threading
+import multiprocessing
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from analisis_paginas import analizar_pagina
+
+'''
+* DESCRIPCIÓN: Archivo en disco de las páginas descargadas por el crawler y reproducción del análisis sobre él, sin
+               acceso a la red. Cada página se añade al final del archivo como un registro WARC/1.1 de tipo resource
+               comprimido como un miembro gzip independiente (el formato .warc.gz habitual), y su posición se anota
+               en un índice de texto contiguo (<archivo>.idx, una línea "posición<TAB>longitud<TAB>URL" por registro).
+               La reproducción lee el índice, proyecta el archivo en memoria con mmap y vuelve a ejecutar
+               analizar_pagina sobre cada registro, en el propio proceso o repartiendo los registros por lotes entre
+               varios procesos. Ejemplo:
+
+                   python archivo_paginas.py paginas.warc.gz -p 4 -o monederos.jsonl
+'''
+
+# Extensión del índice de posiciones de los registros, añadida a la ruta del archivo
+EXTENSION_INDICE = ".idx"
+# Nivel de compresión gzip de los registros
+NIVEL_COMPRESION = 6
+# Tamaño de los fragmentos leídos al reconstruir el índice
+TAMANO_FRAGMENTO = 65536
+# Número de registros que se envían juntos a cada proceso durante la reproducción
+REGISTROS_POR_LOTE = 32
+
+# Proyección en memoria del archivo en cada proceso de reproducción
+mapa_archivo = None
+
+
+'''
+* CLASE: ArchivoPaginas
+* DESCRIPCIÓN: Clase que añade páginas a un archivo WARC comprimido y a su índice. Solo se escribe al final de ambos
+               ficheros y el índice se actualiza después del registro, de modo que, si el proceso se interrumpe, al
+               volver a abrir el archivo basta con descartar lo escrito tras el último registro indexado. Las
+               escrituras pueden realizarse desde varios hilos.
+'''
+class ArchivoPaginas():
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.ruta_indice = ruta + EXTENSION_INDICE
+        self.cerrojo = threading.Lock()
+        self.num_registros = self.recuperar()
+        self.fichero = open(ruta, "ab")
+        self.fichero_indice = open(self.ruta_indice, "a", encoding="utf-8")
+
+    '''
+    * FUNCIÓN: recuperar
+    * DESCRIPCIÓN: Descarta el final del archivo y del índice que quedara incompleto por una interrupción: las líneas
+                   del índice sin terminar o que apuntan fuera del archivo y los bytes del archivo posteriores al
+                   último registro indexado. Si el archivo no tiene índice, se reconstruye.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Número de registros del archivo.
+    '''
+    def recuperar(self):
+        tamano_archivo = os.path.getsize(self.ruta) if os.path.exists(self.ruta) else 0
+        if not os.path.exists(self.ruta_indice):
+            return self.reconstruir_indice() if tamano_archivo else 0
+
+        num_registros = 0
+        fin_registros = 0
+        longitud_indice_valida = 0
+        with open(self.ruta_indice, "rb") as fichero_indice:
+            for linea in fichero_indice:
+                if not linea.endswith(b"\n"):
+                    break
+                posicion, longitud, _ = linea.split(b"\t", 2)
+                if int(posicion) + int(longitud) > tamano_archivo:
+                    break
+                num_registros += 1
+                fin_registros = max(fin_registros, int(posicion) + int(longitud))
+                longitud_indice_valida += len(linea)
+        os.truncate(self.ruta_indice, longitud_indice_valida)
+        if tamano_archivo > fin_registros:
+            os.truncate(self.ruta, fin_registros)
+        return num_registros
+
+    '''
+    * FUNCIÓN: reconstruir_indice
+    * DESCRIPCIÓN: Recorre los miembros gzip del archivo y escribe de nuevo su índice. Se descarta el último registro
+                   si está incompleto o dañado.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Número de registros del archivo.
+    '''
+    def reconstruir_indice(self):
+        num_registros = 0
+        posicion = 0
+        with open(self.ruta, "rb") as fichero, open(self.ruta_indice, "w", encoding="utf-8") as fichero_indice:
+            while True:
+                fichero.seek(posicion)
+                descompresor = zlib.decompressobj(wbits=31)
+                registro = bytearray()
+                longitud = 0
+                try:
+                    while not descompresor.eof:
+                        fragmento = fichero.read(TAMANO_FRAGMENTO)
+                        if not fragmento:
+                            break
+                        registro += descompresor.decompress(fragmento)
+                        longitud += len(fragmento)
+                    url, _ = separar_registro(registro)
+                except (zlib.error, ValueError, KeyError):
+                    break
+                if not descompresor.eof:
+                    break
+                longitud -= len(descompresor.unused_data)
+                fichero_indice.write(f"{posicion}\t{longitud}\t{url}\n")
+                posicion += longitud
+                num_registros += 1
+        os.truncate(self.ruta, posicion)
+        return num_registros
+
+    '''
+    * FUNCIÓN: escribir
+    * DESCRIPCIÓN: Añade una página al archivo y su posición al índice.
+    * ARGS_IN:
+        - url: URL de la página.
+        - contenido: cuerpo de la página, en bytes sin decodificar o como texto.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def escribir(self, url, contenido):
+        if isinstance(contenido, str):
+            contenido = contenido.encode('utf-8')
+        fecha = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        cabecera = (f"WARC/1.1\r\nWARC-Type: resource\r\nWARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+                    f"WARC-Date: {fecha}\r\nWARC-Target-URI: {url}\r\nContent-Type: text/html\r\n"
+                    f"Content-Length: {len(contenido)}\r\n\r\n").encode("utf-8")
+        registro = gzip.compress(cabecera + contenido + b"\r\n\r\n", NIVEL_COMPRESION)
+        with self.cerrojo:
+            posicion = self.fichero.tell()
+            self.fichero.write(registro)
+            self.fichero.flush()
+            self.fichero_indice.write(f"{posicion}\t{len(registro)}\t{url}\n")
+            self.fichero_indice.flush()
+            self.num_registros += 1
+
+    '''
+    * FUNCIÓN: cerrar
+    * DESCRIPCIÓN: Cierra el archivo y su índice.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar(self):
+        with self.cerrojo:
+            self.fichero.close()
+            self.fichero_indice.close()
+
+
+'''
+* FUNCIÓN: leer_indice
+* DESCRIPCIÓN: Lee el índice de un archivo de páginas.
+* ARGS_IN:
+    - ruta: ruta del archivo.
+* ARGS_OUT:
+    - Lista de tuplas (posición, longitud) de los registros, en orden de escritura.
+'''
+def leer_indice(ruta):
+    lista_posiciones = []
+    with open(ruta + EXTENSION_INDICE, encoding="utf-8") as fichero_indice:
+        for linea in fichero_indice:
+            if linea.endswith("\n"):
+                posicion, longitud, _ = linea.split("\t", 2)
+                lista_posiciones.append((int(posicion), int(longitud)))
+    return lista_posiciones
+
+
+'''
+* FUNCIÓN: separar_registro
+* DESCRIPCIÓN: Separa la cabecera y el cuerpo de un registro WARC descomprimido.
+* ARGS_IN:
+    - registro: bytes del registro descomprimido.
+* ARGS_OUT:
+    - URL de la página.
+    - Cuerpo de la página, en bytes.
+'''
+def separar_registro(registro):
+    cabecera, _, resto = bytes(registro).partition(b"\r\n\r\n")
+    campos = dict(linea.split(": ", 1) for linea in cabecera.decode("utf-8").split("\r\n")[1:])
+    return campos["WARC-Target-URI"], resto[:int(campos["Content-Length"])]
+
+
+'''
+* FUNCIÓN: leer_registro
+* DESCRIPCIÓN: Descomprime un registro del archivo y obtiene la URL y el cuerpo de la página.
+* ARGS_IN:
+    - datos: bytes comprimidos del registro.
+* ARGS_OUT:
+    - URL de la página.
+    - Cuerpo de la página, en bytes.
+'''
+def leer_registro(datos):
+    return separar_registro(zlib.decompress(datos, wbits=31))
+
+
+'''
+* FUNCIÓN: abrir_mapa
+* DESCRIPCIÓN: Proyecta en memoria un archivo de páginas para su lectura.
+* ARGS_IN:
+    - ruta: ruta del archivo.
+* ARGS_OUT:
+    - Objeto mmap.
+'''
+def abrir_mapa(ruta):
+    with open(ruta, "rb") as fichero:
+        return mmap.mmap(fichero.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+'''
+* FUNCIÓN: inicializar_proceso
+* DESCRIPCIÓN: Inicializa un proceso de reproducción proyectando el archivo en memoria una única vez.
+* ARGS_IN:
+    - ruta: ruta del archivo.
+* ARGS_OUT:
+    - N/A
+'''
+def inicializar_proceso(ruta):
+    global mapa_archivo
+    mapa_archivo = abrir_mapa(ruta)
+
+
+'''
+* FUNCIÓN: analizar_registros
+* DESCRIPCIÓN: Analiza un lote de registros del archivo proyectado en memoria.
+* ARGS_IN:
+    - lista_posiciones: lista de tuplas (posición, longitud) de los registros.
+    - mapa: archivo proyectado en memoria (Opcional). Por defecto, el del proceso de reproducción.
+* ARGS_OUT:
+    - Lista de tuplas (URL, set de direcciones Bitcoin, número de enlaces) en el orden del lote.
+'''
+def analizar_registros(lista_posiciones, mapa=None):
+    mapa = mapa if mapa is not None else mapa_archivo
+    lista_resultados = []
+    for posicion, longitud in lista_posiciones:
+        url, contenido = leer_registro(mapa[posicion:posicion + longitud])
+        set_direcciones, set_enlaces, _ = analizar_pagina(contenido, url)
+        lista_resultados.append((url, set_direcciones, len(set_enlaces)))
+    return lista_resultados
+
+
+'''
+* FUNCIÓN: reproducir
+* DESCRIPCIÓN: Vuelve a analizar todas las páginas de un archivo, sin acceso a la red.
+* ARGS_IN:
+    - ruta: ruta del archivo.
+    - num_procesos: número de procesos de análisis. Con 0, se analizan en el propio proceso.
+* ARGS_OUT:
+    - Generador de tuplas (URL, set de direcciones Bitcoin, número de enlaces), en el orden del archivo.
+'''
+def reproducir(ruta, num_procesos=0):
+    lista_posiciones = leer_indice(ruta)
+    if not lista_posiciones:
+        return
+    lista_lotes = [lista_posiciones[i:i + REGISTROS_POR_LOTE] for i in range(0, len(lista_posiciones), REGISTROS_POR_LOTE)]
+
+    if num_procesos == 0:
+        mapa = abrir_mapa(ruta)
+        try:
+            for lote in lista_lotes:
+                yield from analizar_registros(lote, mapa)
+        finally:
+            mapa.close()
+        return
+
+    with ProcessPoolExecutor(max_workers=num_procesos, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=inicializar_proceso, initargs=(ruta,)) as ejecutor:
+        for lista_resultados in ejecutor.map(analizar_registros, lista_lotes):
+            yield from lista_resultados
+
+
+if __name__ == "__main__":
+    analizador = argparse.ArgumentParser(description="Vuelve a analizar las páginas de un archivo WARC del crawler sin "
+                                                     "acceso a la red y escribe los monederos encontrados en formato JSON Lines.")
+    analizador.add_argument("archivo", help="archivo de páginas (.warc.gz) con su índice .idx")
+    analizador.add_argument("-p", "--procesos", type=int, default=os.cpu_count(),
+                            help="número de procesos de análisis (por defecto, el número de núcleos; 0: en el propio proceso)")
+    analizador.add_argument("-o", "--salida", default="-",
+                            help="fichero JSON Lines de resultados ('-' para la salida estándar, por defecto)")
+    argumentos = analizador.parse_args()
+
+    salida = sys.stdout if argumentos.salida == "-" else open(argumentos.salida, "w", encoding="utf-8")
+    num_paginas = 0
+    num_enlaces = 0
+    set_direcciones_encontradas = set()
+    inicio = time.perf_counter()
+    try:
+        for url, set_direcciones, num_enlaces_pagina in reproducir(argumentos.archivo, argumentos.procesos):
+            num_paginas += 1
+            num_enlaces += num_enlaces_pagina
+            if set_direcciones:
+                set_direcciones_encontradas.update(set_direcciones)
+                salida.write(json.dumps({"url": url, "direcciones": sorted(set_direcciones)}) + "\n")
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    tiempo = time.perf_counter() - inicio
+    print(f"{num_paginas} páginas ({os.path.getsize(argumentos.archivo) / 2 ** 20:.1f} MB comprimidos) analizadas en "
+          f"{tiempo:.1f} s ({num_paginas / max(tiempo, 1e-9):.1f} páginas/s): {num_enlaces} enlaces y "
+          f"{len(set_direcciones_encontradas)} monederos distintos", file=sys.stderr)
@@ -0,0 +1,137 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bs4 import BeautifulSoup
+from analizador_html import extraer_texto_y_enlaces
+from extractor_direcciones import encontrar_direcciones_bitcoin
+
+'''
+* DESCRIPCIÓN: Benchmark del analizador incremental de HTML frente a la implementación anterior de
+               HiloCrawler.procesar_y_extraer_enlaces, que construía el árbol completo con BeautifulSoup. Para cada
+               tamaño de página se mide el tiempo y el pico de memoria (tracemalloc) y se comprueba que ambos
+               devuelven exactamente las mismas direcciones y enlaces.
+'''
+
+URL_BASE = "http://ejemplo3fz4yatccu7y4ncpkkg6qwwddhu4fkaoa4vjyisjosyqoyd.onion/indice"
+
+DIRECCIONES = ["1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2", "3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy",
+               "bc1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3qccfmv3",
+               "1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN3"]
+
+
+'''
+* FUNCIÓN: procesar_y_extraer_enlaces_anterior
+* DESCRIPCIÓN: Copia de la implementación anterior de HiloCrawler.procesar_y_extraer_enlaces.
+* ARGS_IN:
+    - html: código HTML de la página.
+    - url_base: URL de la página.
+* ARGS_OUT:
+    - set con las direcciones de monederos Bitcoin encontrados en el texto.
+    - set con los enlaces a otras páginas encontrados en el código.
+'''
+def procesar_y_extraer_enlaces_anterior(html, url_base):
+    soup = BeautifulSoup(html, 'lxml')
+    set_direcciones_bitcoin = encontrar_direcciones_bitcoin(soup.get_text(separator=' '))
+    set_enlaces = set()
+    for link in soup.find_all('a', href=True):
+        if link['href']:
+            url = urljoin(url_base, link['href'])
+            if ".onion" in url:
+                set_enlaces.add(url)
+    return set_direcciones_bitcoin, set_enlaces
+
+
+'''
+* FUNCIÓN: procesar_y_extraer_enlaces_nuevo
+* DESCRIPCIÓN: Copia de la implementación actual de HiloCrawler.procesar_y_extraer_enlaces.
+* ARGS_IN:
+    - html: código HTML de la página.
+    - url_base: URL de la página.
+* ARGS_OUT:
+    - set con las direcciones de monederos Bitcoin encontrados en el texto.
+    - set con los enlaces a otras páginas encontrados en el código.
+'''
+def procesar_y_extraer_enlaces_nuevo(html, url_base):
+    texto, lista_hrefs = extraer_texto_y_enlaces(html)
+    set_direcciones_bitcoin = encontrar_direcciones_bitcoin(texto)
+    set_enlaces = set()
+    for href in lista_hrefs:
+        url = urljoin(url_base, href)
+        if ".onion" in url:
+            set_enlaces.add(url)
+    return set_direcciones_bitcoin, set_enlaces
+
+
+'''
+* FUNCIÓN: pagina_sintetica
+* DESCRIPCIÓN: Genera una página HTML sintética con tablas, listas de enlaces, scripts, estilos y comentarios,
+               similar a la de un mercado o foro, con direcciones incrustadas.
+* ARGS_IN:
+    - num_bytes: tamaño aproximado de la página.
+    - semilla: semilla del generador aleatorio.
+* ARGS_OUT:
+    - HTML de la página.
+'''
+def pagina_sintetica(num_bytes, semilla):
+    aleatorio = random.Random(semilla)
+    partes = ["<!DOCTYPE html><html><head><title>Mercado</title><style>td { padding: 2px; }</style></head><body>"]
+    longitud = len(partes[0])
+    while longitud < num_bytes:
+        opcion = aleatorio.random()
+        if opcion < 0.4:
+            parte = (f"<tr><td>Producto {aleatorio.randrange(10000)}</td><td>0.00{aleatorio.randrange(999)} BTC</td>"
+                     f"<td><a href=\"/producto/{aleatorio.randrange(10000)}\">ver</a></td></tr>")
+        elif opcion < 0.7:
+            parte = (f"<li><a href=\"http://sitio{aleatorio.randrange(500)}.onion/p/{aleatorio.randrange(100)}\">"
+                     f"Enlace <b>{aleatorio.randrange(100)}</b></a></li>")
+        elif opcion < 0.8:
+            parte = f"<script>var pedido = {aleatorio.randrange(10 ** 6)};</script><!-- fila -->"
+        elif opcion < 0.81:
+            parte = f"<p>Donaciones: <code>{aleatorio.choice(DIRECCIONES)}</code></p>"
+        else:
+            parte = f"<div class=\"resena\"><p>Envío rápido, vendedor de confianza. Pedido {aleatorio.randrange(10 ** 6)}</p></div>"
+        partes.append(parte)
+        longitud += len(parte)
+    partes.append("</body></html>")
+    return "".join(partes)
+
+
+'''
+* FUNCIÓN: medir
+* DESCRIPCIÓN: Mide el tiempo y el pico de memoria de una función de procesamiento sobre una página.
+* ARGS_IN:
+    - funcion: función de procesamiento.
+    - html: HTML de la página.
+* ARGS_OUT:
+    - Resultado de la función.
+    - Tiempo en segundos.
+    - Pico de memoria en bytes.
+'''
+def medir(funcion, html):
+    inicio = time.perf_counter()
+    resultado = funcion(html, URL_BASE)
+    tiempo = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    funcion(html, URL_BASE)
+    _, pico_memoria = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, tiempo, pico_memoria
+
+
+if __name__ == "__main__":
+    print(f"{'Tamaño (KB)':>12} | {'BS4 (ms)':>9} | {'lxml (ms)':>10} | {'BS4 (MB)':>9} | {'lxml (MB)':>10}")
+    for num_kb in (16, 256, 1024, 5120):
+        html = pagina_sintetica(num_kb * 1024, semilla=num_kb)
+        resultado_anterior, tiempo_anterior, memoria_anterior = medir(procesar_y_extraer_enlaces_anterior, html)
+        resultado_nuevo, tiempo_nuevo, memoria_nuevo = medir(procesar_y_extraer_enlaces_nuevo, html)
+
+        assert resultado_anterior == resultado_nuevo, "Los resultados difieren"
+        print(f"{num_kb:>12} | {tiempo_anterior * 1000:9.1f} | {tiempo_nuevo * 1000:10.1f} | "
+              f"{memoria_anterior / 2 ** 20:9.1f} | {memoria_nuevo / 2 ** 20:10.1f}")
@@ -0,0 +1,77 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from analisis_paginas import analizar_pagina
+from archivo_paginas import ArchivoPaginas, abrir_mapa, leer_indice, leer_registro, reproducir
+from benchmark_procesos import cargar_corpus
+
+'''
+* DESCRIPCIÓN: Benchmark del archivo de páginas. Se escribe el corpus de benchmark_procesos en un archivo WARC
+               comprimido, midiendo la velocidad de escritura y la tasa de compresión, se mide la lectura y
+               descompresión de los registros proyectados en memoria y se reproduce el análisis en el propio
+               proceso y con 1 a N procesos, comprobando que los resultados coinciden con los del análisis directo.
+               También se comprueba la recuperación de un archivo interrumpido a mitad de un registro y la
+               reconstrucción del índice.
+'''
+
+URL_BASE = "http://ejemplo3fz4yatccu7y4ncpkkg6qwwddhu4fkaoa4vjyisjosyqoyd.onion/pagina/"
+
+
+if __name__ == "__main__":
+    lista_paginas = cargar_corpus(sys.argv[1] if len(sys.argv) > 1 else None)
+    lista_urls = [f"{URL_BASE}{indice}" for indice in range(len(lista_paginas))]
+    num_mb = sum(len(pagina) for pagina in lista_paginas) / 2 ** 20
+    print(f"Corpus: {len(lista_paginas)} páginas, {num_mb:.1f} MB, {os.cpu_count()} núcleos")
+
+    lista_esperados = [(url, analizar_pagina(pagina, url)[0]) for url, pagina in zip(lista_urls, lista_paginas)]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "paginas.warc.gz")
+        archivo = ArchivoPaginas(ruta)
+        inicio = time.perf_counter()
+        for url, pagina in zip(lista_urls, lista_paginas):
+            archivo.escribir(url, pagina)
+        archivo.cerrar()
+        tiempo = time.perf_counter() - inicio
+        num_mb_archivo = os.path.getsize(ruta) / 2 ** 20
+        print(f"Escritura: {num_mb / tiempo:.1f} MB/s, {num_mb_archivo:.1f} MB en disco ({num_mb / num_mb_archivo:.1f}x)")
+
+        mapa = abrir_mapa(ruta)
+        inicio = time.perf_counter()
+        lista_leidas = [leer_registro(mapa[posicion:posicion + longitud]) for posicion, longitud in leer_indice(ruta)]
+        tiempo = time.perf_counter() - inicio
+        mapa.close()
+        assert lista_leidas == list(zip(lista_urls, lista_paginas)), "Los registros leídos difieren"
+        print(f"Lectura y descompresión: {num_mb / tiempo:.1f} MB/s")
+
+        print(f"{'Procesos':>9} | {'Páginas/s':>10} | {'MB/s':>7}")
+        lista_num_procesos = [0] + sorted({2 ** i for i in range(os.cpu_count().bit_length())} | {os.cpu_count()})
+        for num_procesos in lista_num_procesos:
+            inicio = time.perf_counter()
+            lista_resultados = [(url, set_direcciones) for url, set_direcciones, _ in reproducir(ruta, num_procesos)]
+            tiempo = time.perf_counter() - inicio
+            assert lista_resultados == lista_esperados, "Los resultados de la reproducción difieren"
+            print(f"{num_procesos or 'proceso':>9} | {len(lista_paginas) / tiempo:10.1f} | {num_mb / tiempo:7.2f}")
+
+        # Interrupción a mitad de un registro: se descarta el registro incompleto y su línea del índice
+        tamano_completo = os.path.getsize(ruta)
+        with open(ruta, "ab") as fichero:
+            fichero.write(b"\x1f\x8b\x08\x00registro incompleto")
+        with open(ruta + ".idx", "a", encoding="utf-8") as fichero_indice:
+            fichero_indice.write(f"{tamano_completo}\t999")
+        archivo = ArchivoPaginas(ruta)
+        assert archivo.num_registros == len(lista_paginas) and os.path.getsize(ruta) == tamano_completo
+        archivo.escribir(lista_urls[0], lista_paginas[0])
+        archivo.cerrar()
+
+        # Reconstrucción del índice a partir del archivo
+        os.remove(ruta + ".idx")
+        archivo = ArchivoPaginas(ruta)
+        archivo.cerrar()
+        assert archivo.num_registros == len(lista_paginas) + 1
+        assert [url for url, _, _ in reproducir(ruta)] == lista_urls + lista_urls[:1]
+        print("Recuperación y reconstrucción del índice: correctas")
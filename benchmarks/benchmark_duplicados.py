@@ -0,0 +1,192 @@
+import base64
+import hashlib
+import os
+import queue
+import random
+import sys
+import time
+from threading import Event
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from crawler import HiloCrawler
+from analisis_paginas import analizar_pagina
+from analizador_html import extraer_texto_y_enlaces
+from huellas_contenido import IndiceHuellas, calcular_huella, distancia_hamming, DISTANCIA_MAXIMA_DUPLICADOS
+from normalizacion_urls import VERSION_ONION
+
+'''
+* DESCRIPCIÓN: Benchmark de la detección de páginas casi duplicadas. Se rastrea, sin red, una web sintética con
+               servicios originales, varias réplicas de cada uno en otros hosts (mismo texto con pequeñas variaciones)
+               y una trampa de rastreo (un calendario con una página por día y el mismo texto), con y sin índice de
+               huellas. Se comparan las descargas realizadas, se comprueba que no se pierde ninguna página original
+               y se mide el coste de calcular y buscar las huellas. Además, se comprueba que las páginas largas con
+               una misma cabecera extensa y distinto contenido no se consideran casi duplicadas y que las réplicas
+               de una página larga sí.
+'''
+
+NUM_SITIOS = 10
+PAGINAS_POR_SITIO = 30
+REPLICAS_POR_SITIO = 3
+DIAS_CALENDARIO = 300
+PALABRAS_POR_PAGINA = 250
+
+VOCABULARIO = [f"palabra{i}" for i in range(3000)]
+# Palabras de la cabecera común y del contenido de las páginas largas
+PALABRAS_CABECERA = 3000
+PALABRAS_CONTENIDO = 4000
+NUM_PAGINAS_LARGAS = 20
+
+
+'''
+* FUNCIÓN: host
+* DESCRIPCIÓN: Genera un host .onion v3 sintético con una suma de control válida.
+* ARGS_IN:
+    - indice: índice del host.
+* ARGS_OUT:
+    - Nombre del host.
+'''
+def host(indice):
+    clave_publica = hashlib.sha256(str(indice).encode()).digest()
+    suma_control = hashlib.sha3_256(b".onion checksum" + clave_publica + bytes([VERSION_ONION])).digest()[:2]
+    return base64.b32encode(clave_publica + suma_control + bytes([VERSION_ONION])).decode().lower() + ".onion"
+
+
+'''
+* FUNCIÓN: crear_web
+* DESCRIPCIÓN: Genera el contenido de la web sintética.
+* ARGS_IN:
+    - semilla: semilla del generador aleatorio.
+* ARGS_OUT:
+    - Diccionario. Clave: URL. Valor: HTML de la página.
+    - set con las URLs de las páginas originales.
+'''
+def crear_web(semilla=0):
+    generador = random.Random(semilla)
+    diccionario_paginas = {}
+    set_originales = set()
+    for sitio in range(NUM_SITIOS):
+        lista_hosts = [host(sitio * (REPLICAS_POR_SITIO + 1) + replica) for replica in range(REPLICAS_POR_SITIO + 1)]
+        lista_textos = [' '.join(generador.choices(VOCABULARIO, k=PALABRAS_POR_PAGINA)) for _ in range(PAGINAS_POR_SITIO)]
+        for replica, host_replica in enumerate(lista_hosts):
+            for pagina, texto in enumerate(lista_textos):
+                enlaces = [f"/p{(pagina + 1) % PAGINAS_POR_SITIO}", f"/p{(pagina * 7 + 3) % PAGINAS_POR_SITIO}"]
+                if replica == 0 and pagina == 0:
+                    # La portada de cada original enlaza a sus réplicas, al siguiente sitio y al calendario
+                    enlaces += [f"http://{h}/p0" for h in lista_hosts[1:]]
+                    enlaces.append(f"http://{host((sitio + 1) % NUM_SITIOS * (REPLICAS_POR_SITIO + 1))}/p0")
+                    enlaces.append(f"http://{host(10 ** 6)}/calendario?dia=0")
+                # Las réplicas cambian una palabra del texto y añaden la hora de generación de la página
+                palabras = texto.split()
+                if replica:
+                    palabras[generador.randrange(len(palabras))] = generador.choice(VOCABULARIO)
+                    palabras.append(f"generada {generador.randint(0, 86399)}")
+                html_enlaces = ''.join(f'<a href="{enlace}">enlace</a>' for enlace in enlaces)
+                url = f"http://{host_replica}/p{pagina}"
+                diccionario_paginas[url] = f"<html><body><p>{' '.join(palabras)}</p>{html_enlaces}</body></html>"
+                if replica == 0:
+                    set_originales.add(url)
+
+    texto_calendario = ' '.join(generador.choices(VOCABULARIO, k=PALABRAS_POR_PAGINA))
+    for dia in range(DIAS_CALENDARIO):
+        url = f"http://{host(10 ** 6)}/calendario?dia={dia}"
+        diccionario_paginas[url] = (f"<html><body><h1>Día {dia}</h1><p>{texto_calendario}</p>"
+                                    f'<a href="?dia={dia + 1}">siguiente</a></body></html>')
+    set_originales.add(f"http://{host(10 ** 6)}/calendario?dia=0")
+    return diccionario_paginas, set_originales
+
+
+'''
+* CLASE: IndiceSinDuplicados
+* DESCRIPCIÓN: Índice de huellas que nunca encuentra duplicados, para rastrear sin detección.
+'''
+class IndiceSinDuplicados(IndiceHuellas):
+    def buscar(self, huella):
+        return None
+
+
+'''
+* CLASE: CrawlerSimulado
+* DESCRIPCIÓN: HiloCrawler que descarga las páginas de la web sintética en lugar de la red TOR.
+'''
+class CrawlerSimulado(HiloCrawler):
+    def __init__(self, diccionario_paginas, url_inicial, detectar_duplicados, **opciones):
+        super().__init__([url_inicial], 10 ** 9, queue.Queue(), Event(), **opciones)
+        self.diccionario_paginas = diccionario_paginas
+        self.lista_descargas = []
+        self.planificador.retardo_minimo = 0.0
+        if not detectar_duplicados:
+            self.indice_huellas = IndiceSinDuplicados()
+
+    def verificar_conexion_tor(self):
+        pass
+
+    def obtener_html(self, url):
+        self.lista_descargas.append(url)
+        self.planificador.registrar_resultado(url, 0.001, True)
+        return self.diccionario_paginas.get(url)
+
+
+if __name__ == "__main__":
+    diccionario_paginas, set_originales = crear_web()
+    url_inicial = f"http://{host(0)}/p0"
+    print(f"Web sintética: {len(diccionario_paginas)} páginas, {len(set_originales)} originales")
+
+    print(f"{'Rastreo':>16} | {'Descargas':>9} | {'Duplicadas':>10} | {'Evitadas':>8} | {'Originales':>10} | {'Tiempo (s)':>10}")
+    # En orden de descubrimiento, los originales se visitan antes que sus réplicas
+    for detectar_duplicados in (False, True):
+        crawler = CrawlerSimulado(diccionario_paginas, url_inicial, detectar_duplicados, priorizar_enlaces=False)
+        inicio = time.perf_counter()
+        crawler.run()
+        tiempo = time.perf_counter() - inicio
+        lista_mensajes = []
+        while not crawler.cola_comunicacion.empty():
+            lista_mensajes.append(crawler.cola_comunicacion.get())
+        assert [comando for comando, _ in lista_mensajes[-2:]] == ["estadisticas", "terminado"], lista_mensajes[-2:]
+        estadisticas = lista_mensajes[-2][1]
+        set_descargas = set(crawler.lista_descargas)
+        num_originales = len(set_originales & set_descargas)
+        assert num_originales == len(set_originales), "Se han dejado de visitar páginas originales"
+        print(f"{'con huellas' if detectar_duplicados else 'sin huellas':>16} | {len(crawler.lista_descargas):>9} | "
+              f"{estadisticas['paginas_duplicadas']:>10} | {estadisticas['descargas_evitadas']:>8} | {num_originales:>10} | {tiempo:10.2f}")
+
+    # Coste de las huellas frente al análisis completo y distancia entre páginas originales distintas
+    lista_paginas = list(diccionario_paginas.values())
+    inicio = time.perf_counter()
+    for pagina in lista_paginas:
+        analizar_pagina(pagina, url_inicial)
+    tiempo_analisis = time.perf_counter() - inicio
+    lista_textos = [extraer_texto_y_enlaces(pagina)[0] for pagina in lista_paginas]
+    inicio = time.perf_counter()
+    lista_huellas = [calcular_huella(texto) for texto in lista_textos]
+    tiempo_huellas = time.perf_counter() - inicio
+    indice = IndiceHuellas()
+    inicio = time.perf_counter()
+    for indice_pagina, huella in enumerate(lista_huellas):
+        if indice.buscar(huella) is None:
+            indice.agregar(huella, indice_pagina)
+    tiempo_indice = time.perf_counter() - inicio
+    lista_huellas_originales = [calcular_huella(extraer_texto_y_enlaces(diccionario_paginas[url])[0]) for url in sorted(set_originales)]
+    distancia_minima = min(distancia_hamming(a, b) for i, a in enumerate(lista_huellas_originales) for b in lista_huellas_originales[i + 1:])
+    print(f"Huella: {tiempo_huellas / len(lista_paginas) * 1e6:.0f} µs/página ({tiempo_huellas / tiempo_analisis:.0%} del análisis). "
+          f"Búsqueda e inserción: {tiempo_indice / len(lista_paginas) * 1e6:.1f} µs/página. "
+          f"Distancia mínima entre originales: {distancia_minima} bits")
+
+    # Páginas largas con la misma cabecera (más larga que la muestra de la huella) y distinto contenido, y una réplica
+    # de cada una con una palabra cambiada
+    generador = random.Random(1)
+    cabecera = ' '.join(generador.choices(VOCABULARIO, k=PALABRAS_CABECERA))
+    lista_distancias_distintas = []
+    lista_distancias_replicas = []
+    lista_huellas_largas = []
+    for _ in range(NUM_PAGINAS_LARGAS):
+        palabras = generador.choices(VOCABULARIO, k=PALABRAS_CONTENIDO)
+        huella = calcular_huella(f"{cabecera} {' '.join(palabras)}")
+        palabras[generador.randrange(len(palabras))] = generador.choice(VOCABULARIO)
+        lista_distancias_replicas.append(distancia_hamming(huella, calcular_huella(f"{cabecera} {' '.join(palabras)}")))
+        lista_distancias_distintas += [distancia_hamming(huella, otra) for otra in lista_huellas_largas]
+        lista_huellas_largas.append(huella)
+    assert min(lista_distancias_distintas) > DISTANCIA_MAXIMA_DUPLICADOS, min(lista_distancias_distintas)
+    assert max(lista_distancias_replicas) <= DISTANCIA_MAXIMA_DUPLICADOS, max(lista_distancias_replicas)
+    print(f"Páginas largas con cabecera común de {len(cabecera)} caracteres: distancia mínima entre páginas distintas "
+          f"{min(lista_distancias_distintas)} bits, máxima entre réplicas {max(lista_distancias_replicas)} bits")
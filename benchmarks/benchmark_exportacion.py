@@ -0,0 +1,116 @@
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pandas as pd
+import pyarrow.parquet
+from openpyxl import load_workbook
+from benchmark_modelo_transacciones import respuesta_sintetica, cargar_respuesta
+from exportador import exportar, filas_transacciones, filas_resultados, COLUMNAS_TRANSACCIONES, COLUMNAS_RESULTADOS
+from monedero_bitcoin import MonederoBitcoin, formatear_participantes
+
+'''
+* DESCRIPCIÓN: Benchmark de la exportación de transacciones y resultados del rastreo. Se compara la exportación
+               anterior (lista de diccionarios, DataFrame de pandas y to_excel) con la exportación por bloques a
+               Excel en modo de solo escritura, CSV, JSON Lines y Parquet, midiendo el tiempo y el pico de memoria
+               (tracemalloc), y se comprueba que cada fichero contiene las mismas filas.
+'''
+
+NUM_TRANSACCIONES = 20000
+NUM_URLS = 20000
+MONEDEROS_POR_URL = 10
+
+
+'''
+* FUNCIÓN: exportar_anterior
+* DESCRIPCIÓN: Exportación anterior de las transacciones de un monedero a Excel, en memoria.
+* ARGS_IN:
+    - monedero: objeto MonederoBitcoin.
+    - archivo: ruta del fichero .xlsx.
+* ARGS_OUT:
+    - Número de filas exportadas.
+'''
+def exportar_anterior(monedero, archivo):
+    datos_excel = []
+    for tx in monedero.transacciones_confirmadas:
+        datos_excel.append({"Hash": tx.hash, "Valor Neto (BTC)": tx.valor_neto, "Comisión": tx.comision,
+            "Bloque": tx.num_bloque, "Fecha": tx.fecha_confirmacion.strftime("%Y-%m-%d %H:%M"), "Confirmaciones": tx.num_confirmaciones,
+            "Emisores": formatear_participantes(tx.emisores), "Receptores": formatear_participantes(tx.receptores)})
+    df = pd.DataFrame(datos_excel)
+    df.to_excel(archivo, index=False)
+    return len(df)
+
+
+'''
+* FUNCIÓN: leer_filas
+* DESCRIPCIÓN: Lee las filas de un fichero exportado, sin la cabecera.
+* ARGS_IN:
+    - ruta: ruta del fichero.
+* ARGS_OUT:
+    - Lista de tuplas con los valores de cada fila.
+'''
+def leer_filas(ruta):
+    extension = os.path.splitext(ruta)[1]
+    if extension == ".csv":
+        with open(ruta, encoding="utf-8", newline="") as fichero:
+            return [tuple(fila) for fila in csv.reader(fichero)][1:]
+    if extension == ".jsonl":
+        with open(ruta, encoding="utf-8") as fichero:
+            return [tuple(json.loads(linea).values()) for linea in fichero]
+    if extension == ".parquet":
+        return list(zip(*pyarrow.parquet.read_table(ruta).to_pydict().values()))
+    libro = load_workbook(ruta, read_only=True)
+    filas = [tuple(fila) for hoja in libro.worksheets for fila in list(hoja.iter_rows(values_only=True))[1:]]
+    libro.close()
+    return filas
+
+
+'''
+* FUNCIÓN: medir
+* DESCRIPCIÓN: Mide el tiempo y el pico de memoria de una exportación.
+* ARGS_IN:
+    - funcion: función de exportación sin argumentos.
+* ARGS_OUT:
+    - Resultado de la función, tiempo en segundos y pico de memoria en bytes.
+'''
+def medir(funcion):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    tiempo = time.perf_counter() - inicio
+    _, pico_memoria = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, tiempo, pico_memoria
+
+
+if __name__ == "__main__":
+    monedero = MonederoBitcoin("1MonederoAnalizado", cargar_respuesta(respuesta_sintetica("1MonederoAnalizado", NUM_TRANSACCIONES)))
+    filas_esperadas = [tuple(str(valor) for valor in fila) for fila in filas_transacciones(monedero)]
+    resultados = [(f"http://url{i:06d}.onion/", tuple(f"1Monedero{i:06d}x{j}" for j in range(MONEDEROS_POR_URL))) for i in range(NUM_URLS)]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        print(f"Transacciones ({NUM_TRANSACCIONES} filas)")
+        print(f"{'Exportación':>22} | {'Tiempo (s)':>10} | {'Memoria (MB)':>12}")
+        ruta = os.path.join(directorio, "anterior.xlsx")
+        _, tiempo, memoria = medir(lambda: exportar_anterior(monedero, ruta))
+        print(f"{'pandas .xlsx':>22} | {tiempo:10.2f} | {memoria / 2 ** 20:12.1f}")
+        for extension in (".xlsx", ".csv", ".jsonl", ".parquet"):
+            ruta = os.path.join(directorio, "transacciones" + extension)
+            num_filas, tiempo, memoria = medir(lambda: exportar(ruta, COLUMNAS_TRANSACCIONES, filas_transacciones(monedero)))
+            assert num_filas == NUM_TRANSACCIONES
+            assert [tuple(str(valor) for valor in fila) for fila in leer_filas(ruta)] == filas_esperadas, f"Las filas de {extension} difieren"
+            print(f"{'bloques ' + extension:>22} | {tiempo:10.2f} | {memoria / 2 ** 20:12.1f}")
+
+        num_monederos = NUM_URLS * MONEDEROS_POR_URL
+        print(f"Resultados del rastreo ({NUM_URLS} URLs, {num_monederos} filas)")
+        for extension in (".xlsx", ".csv", ".jsonl", ".parquet"):
+            ruta = os.path.join(directorio, "resultados" + extension)
+            num_filas, tiempo, memoria = medir(lambda: exportar(ruta, COLUMNAS_RESULTADOS, filas_resultados(resultados)))
+            assert num_filas == num_monederos and leer_filas(ruta) == list(filas_resultados(resultados))
+            print(f"{'bloques ' + extension:>22} | {tiempo:10.2f} | {memoria / 2 ** 20:12.1f}")
@@ -0,0 +1,91 @@
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bitcoinlib.keys import Address
+from bitcoinlib.encoding import EncodingError
+from extractor_direcciones import encontrar_direcciones_bitcoin
+
+'''
+* DESCRIPCIÓN: Benchmark del motor de extracción de direcciones Bitcoin frente a la implementación anterior de
+               HiloCrawler (cuatro expresiones regulares y una copia del texto por expresión) sobre páginas
+               sintéticas de varios MB. Se comprueba además que ambos devuelven exactamente las mismas direcciones.
+'''
+
+REGEX_BITCOIN = [re.compile(r"\b[1][a-km-zA-HJ-NP-Z1-9]{25,34}\b"),
+                 re.compile(r"\b[3][a-km-zA-HJ-NP-Z1-9]{25,34}\b"),
+                 re.compile(r"\bbc1q[ac-hj-np-z02-9]{39,59}\b"),
+                 re.compile(r"\bbc1p[ac-hj-np-z02-9]{39,59}\b")]
+
+DIRECCIONES_VALIDAS = ["1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2", "3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy",
+                       "bc1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3qccfmv3",
+                       "bc1p5d7rjq7g6rdk2yhzks9smlaqtedr4dekq08ge8ztwac72sfr9rusxg3297"]
+DIRECCIONES_INVALIDAS = ["1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN3", "3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLz",
+                         "bc1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3qccfmv4"]
+
+
+'''
+* FUNCIÓN: encontrar_direcciones_bitcoin_anterior
+* DESCRIPCIÓN: Copia de la implementación anterior de HiloCrawler.encontrar_direcciones_bitcoin.
+* ARGS_IN:
+    - texto: Texto en el que buscar monederos.
+* ARGS_OUT:
+    - set con las direcciones de monederos Bitcoin encontrados en el texto.
+'''
+def encontrar_direcciones_bitcoin_anterior(texto):
+    set_direcciones_bitcoin_texto = set()
+    for regex in REGEX_BITCOIN:
+        set_direcciones_bitcoin_texto.update(regex.findall(texto.strip()))
+    if len(set_direcciones_bitcoin_texto) > 0:
+        for direccion_monedero in list(set_direcciones_bitcoin_texto):
+            try:
+                Address.parse(direccion_monedero)
+            except EncodingError:
+                set_direcciones_bitcoin_texto.remove(direccion_monedero)
+    return set_direcciones_bitcoin_texto
+
+
+'''
+* FUNCIÓN: pagina_sintetica
+* DESCRIPCIÓN: Genera el texto de una página sintética con palabras aleatorias, números y direcciones incrustadas.
+* ARGS_IN:
+    - num_bytes: tamaño aproximado del texto.
+    - semilla: semilla del generador aleatorio.
+* ARGS_OUT:
+    - texto de la página.
+'''
+def pagina_sintetica(num_bytes, semilla):
+    aleatorio = random.Random(semilla)
+    vocabulario = ["bitcoin", "market", "vendor", "price", "shipping", "escrow", "1337", "BTC", "0.0031", "order",
+                   "3x", "review", "pgp", "contact", "2024", "onion", "donate", "wallet", "bc1", "13"]
+    palabras = []
+    longitud = 0
+    while longitud < num_bytes:
+        if aleatorio.random() < 0.001:
+            palabra = aleatorio.choice(DIRECCIONES_VALIDAS + DIRECCIONES_INVALIDAS)
+        else:
+            palabra = aleatorio.choice(vocabulario)
+        palabras.append(palabra)
+        longitud += len(palabra) + 1
+    return " ".join(palabras)
+
+
+if __name__ == "__main__":
+    print(f"{'Tamaño (MB)':>12} | {'Anterior (ms)':>14} | {'Nuevo (ms)':>11} | {'Aceleración':>11}")
+    for num_mb in (1, 4, 8):
+        texto = pagina_sintetica(num_mb * 1024 * 1024, semilla=num_mb)
+
+        inicio = time.perf_counter()
+        resultado_anterior = encontrar_direcciones_bitcoin_anterior(texto)
+        tiempo_anterior = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        resultado_nuevo = encontrar_direcciones_bitcoin(texto)
+        tiempo_nuevo = time.perf_counter() - inicio
+
+        assert resultado_anterior == resultado_nuevo, "Los resultados difieren"
+        print(f"{num_mb:>12} | {tiempo_anterior * 1000:14.1f} | {tiempo_nuevo * 1000:11.1f} | {tiempo_anterior / tiempo_nuevo:10.1f}x")
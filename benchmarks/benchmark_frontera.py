@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from frontera import FronteraURLs
+
+'''
+* DESCRIPCIÓN: Microbenchmark del coste por página de la frontera de rastreo. Para distintos tamaños de frontera
+               se simula la visita de páginas: extracción de la siguiente URL y encolado de sus enlaces (la mitad
+               de ellos ya vistos). Se compara la FronteraURLs con la implementación anterior basada en listas.
+'''
+
+NUM_PAGINAS = 2000
+ENLACES_POR_PAGINA = 20
+
+
+def url_sintetica(i):
+    return f"http://{i:056d}.onion/pagina/{i}"
+
+
+'''
+* FUNCIÓN: medir_frontera
+* DESCRIPCIÓN: Mide el tiempo medio por página de la FronteraURLs con una frontera del tamaño indicado.
+* ARGS_IN:
+    - num_urls: número de URLs pendientes en la frontera al inicio de la medición.
+* ARGS_OUT:
+    - microsegundos por página.
+'''
+def medir_frontera(num_urls):
+    frontera = FronteraURLs(url_sintetica(i) for i in range(num_urls))
+    siguiente_id = num_urls
+    inicio = time.perf_counter()
+    for _ in range(NUM_PAGINAS):
+        frontera.siguiente()
+        for j in range(ENLACES_POR_PAGINA):
+            if j % 2:
+                frontera.agregar(url_sintetica(siguiente_id))
+                siguiente_id += 1
+            else:
+                frontera.agregar(url_sintetica(siguiente_id - j - 1))
+    return (time.perf_counter() - inicio) / NUM_PAGINAS * 1e6
+
+
+'''
+* FUNCIÓN: medir_lista
+* DESCRIPCIÓN: Mide el tiempo medio por página de la implementación anterior (lista + set de visitadas).
+* ARGS_IN:
+    - num_urls: número de URLs pendientes en la frontera al inicio de la medición.
+* ARGS_OUT:
+    - microsegundos por página.
+'''
+def medir_lista(num_urls, num_paginas=200):
+    lista_urls_a_visitar = [url_sintetica(i) for i in range(num_urls)]
+    set_urls_visitadas = set()
+    siguiente_id = num_urls
+    inicio = time.perf_counter()
+    for _ in range(num_paginas):
+        set_urls_visitadas.add(lista_urls_a_visitar.pop(0))
+        for j in range(ENLACES_POR_PAGINA):
+            if j % 2:
+                enlace = url_sintetica(siguiente_id)
+                siguiente_id += 1
+            else:
+                enlace = url_sintetica(siguiente_id - j - 1)
+            if enlace not in set_urls_visitadas and enlace not in lista_urls_a_visitar:
+                lista_urls_a_visitar.append(enlace)
+    return (time.perf_counter() - inicio) / num_paginas * 1e6
+
+
+if __name__ == "__main__":
+    print(f"{'Tamaño frontera':>16} | {'FronteraURLs (us/pág)':>22} | {'Lista (us/pág)':>15}")
+    for num_urls in (1_000, 10_000, 100_000, 1_000_000):
+        # La implementación con listas se omite para el tamaño máximo por su coste cuadrático
+        tiempo_lista = f"{medir_lista(num_urls):15.1f}" if num_urls <= 100_000 else f"{'-':>15}"
+        print(f"{num_urls:>16} | {medir_frontera(num_urls):22.1f} | {tiempo_lista}")
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from frontera import FronteraURLs, FronteraPrioridad
+from validador_direcciones import ALFABETO_BASE58
+from benchmark_duplicados import CrawlerSimulado, host, VOCABULARIO
+
+'''
+* DESCRIPCIÓN: Benchmark de la frontera con prioridad. Se rastrea, sin red, un grafo de enlaces sintético con
+               muchos servicios con pocos monederos (foros, directorios) y unos pocos servicios de pago o donaciones
+               con muchos, hasta encontrar un número objetivo de monederos, con la cola FIFO y con la frontera con
+               prioridad. Se comparan las descargas necesarias para cada objetivo con varias semillas y se mide el
+               coste por URL de ambas fronteras.
+'''
+
+NUM_SERVICIOS = 150
+FRACCION_SERVICIOS_PAGO = 0.08
+MIN_PAGINAS_SERVICIO = 10
+MAX_PAGINAS_SERVICIO = 150
+ENLACES_INTERNOS = 4
+ENLACES_EXTERNOS = 2
+LISTA_OBJETIVOS = [50, 100, 200]
+NUM_SEMILLAS = 5
+NUM_URLS_COSTE = 200000
+
+# Probabilidad de que una página tenga monederos, según el tipo de servicio y si su ruta indica pagos o donaciones
+PROBABILIDAD_MONEDEROS = {(True, True): 0.7, (True, False): 0.1, (False, True): 0.2, (False, False): 0.01}
+# Fracción de páginas cuya ruta indica pagos o donaciones, según el tipo de servicio
+FRACCION_RUTAS_PAGO = {True: 0.3, False: 0.03}
+RUTAS_PAGO = ["donate", "checkout", "pay", "wallet", "order"]
+
+
+'''
+* FUNCIÓN: direccion_sintetica
+* DESCRIPCIÓN: Genera una dirección Bitcoin P2PKH aleatoria con una suma de control válida.
+* ARGS_IN:
+    - generador: generador aleatorio.
+* ARGS_OUT:
+    - Dirección Bitcoin.
+'''
+def direccion_sintetica(generador):
+    datos = b'\x00' + generador.randbytes(20)
+    datos += hashlib.sha256(hashlib.sha256(datos).digest()).digest()[:4]
+    valor = int.from_bytes(datos, 'big')
+    direccion = ""
+    while valor:
+        valor, resto = divmod(valor, 58)
+        direccion = ALFABETO_BASE58[resto] + direccion
+    return "1" * (len(datos) - len(datos.lstrip(b'\x00'))) + direccion
+
+
+'''
+* FUNCIÓN: crear_web
+* DESCRIPCIÓN: Genera el grafo de enlaces sintético. Cada página enlaza a páginas de su servicio y a páginas de otros
+               servicios elegidos al azar, de modo que los servicios de pago no están más cerca de la URL inicial que
+               el resto.
+* ARGS_IN:
+    - semilla: semilla del generador aleatorio.
+* ARGS_OUT:
+    - Diccionario. Clave: URL. Valor: HTML de la página.
+    - Número total de monederos de la web.
+'''
+def crear_web(semilla=0):
+    generador = random.Random(semilla)
+    lista_servicios = []
+    for servicio in range(NUM_SERVICIOS):
+        # El servicio 0, el de la URL inicial, nunca es de pago
+        es_pago = servicio > 0 and generador.random() < FRACCION_SERVICIOS_PAGO
+        lista_rutas = []
+        for pagina in range(generador.randint(MIN_PAGINAS_SERVICIO, MAX_PAGINAS_SERVICIO)):
+            if pagina and generador.random() < FRACCION_RUTAS_PAGO[es_pago]:
+                lista_rutas.append((f"/{generador.choice(RUTAS_PAGO)}/{pagina}", True))
+            else:
+                lista_rutas.append((f"/p{pagina}", False))
+        lista_servicios.append((host(semilla * NUM_SERVICIOS + servicio), es_pago, lista_rutas))
+
+    diccionario_paginas = {}
+    num_monederos = 0
+    for host_servicio, es_pago, lista_rutas in lista_servicios:
+        for ruta, ruta_pago in lista_rutas:
+            enlaces = [ruta_enlace for ruta_enlace, _ in generador.choices(lista_rutas, k=ENLACES_INTERNOS)]
+            for _ in range(ENLACES_EXTERNOS):
+                host_externo, _, lista_rutas_externas = generador.choice(lista_servicios)
+                enlaces.append(f"http://{host_externo}{generador.choice(lista_rutas_externas[:5])[0]}")
+            lista_direcciones = []
+            if generador.random() < PROBABILIDAD_MONEDEROS[(es_pago, ruta_pago)]:
+                lista_direcciones = [direccion_sintetica(generador) for _ in range(generador.randint(1, 2))]
+                num_monederos += len(lista_direcciones)
+            texto = ' '.join(generador.choices(VOCABULARIO, k=60) + lista_direcciones)
+            html_enlaces = ''.join(f'<a href="{enlace}">enlace</a>' for enlace in enlaces)
+            diccionario_paginas[f"http://{host_servicio}{ruta}"] = f"<html><body><p>{texto}</p>{html_enlaces}</body></html>"
+    return diccionario_paginas, num_monederos
+
+
+'''
+* CLASE: CrawlerObjetivo
+* DESCRIPCIÓN: CrawlerSimulado que finaliza al encontrar el número de monederos indicado. Las respuestas no retrasan
+               a su host, para que el orden de las descargas dependa solo de la frontera.
+'''
+class CrawlerObjetivo(CrawlerSimulado):
+    def __init__(self, diccionario_paginas, url_inicial, num_min_monederos, priorizar_enlaces):
+        super().__init__(diccionario_paginas, url_inicial, True, priorizar_enlaces=priorizar_enlaces)
+        self.num_min_monederos = num_min_monederos
+
+    def obtener_html(self, url):
+        self.lista_descargas.append(url)
+        self.planificador.registrar_resultado(url, 0.0, True)
+        return self.diccionario_paginas.get(url)
+
+
+'''
+* FUNCIÓN: medir_coste
+* DESCRIPCIÓN: Mide el tiempo medio de encolar y extraer una URL de una frontera, actualizando la prioridad de su
+               servicio tras cada extracción como hace el crawler.
+* ARGS_IN:
+    - clase_frontera: FronteraURLs o FronteraPrioridad.
+    - lista_urls: URLs a encolar.
+    - lista_prioridades: prioridad de cada URL.
+* ARGS_OUT:
+    - Microsegundos por URL.
+'''
+def medir_coste(clase_frontera, lista_urls, lista_prioridades):
+    frontera = clase_frontera()
+    inicio = time.perf_counter()
+    for url, prioridad in zip(lista_urls, lista_prioridades):
+        frontera.agregar(url, prioridad)
+    for indice in range(len(lista_urls)):
+        url = frontera.siguiente()
+        frontera.actualizar_servicio(url[7:69], indice % 7)
+    return (time.perf_counter() - inicio) / len(lista_urls) * 1e6
+
+
+if __name__ == "__main__":
+    print(f"{'Semilla':>7} | {'Páginas':>7} | {'Monederos':>9} | {'Objetivo':>8} | {'Descargas FIFO':>14} | "
+          f"{'Descargas prioridad':>19} | {'Reducción':>9}")
+    diccionario_totales = {objetivo: [0, 0] for objetivo in LISTA_OBJETIVOS}
+    for semilla in range(NUM_SEMILLAS):
+        diccionario_paginas, num_monederos = crear_web(semilla)
+        url_inicial = f"http://{host(semilla * NUM_SERVICIOS)}/p0"
+        for objetivo in LISTA_OBJETIVOS:
+            lista_descargas = []
+            for priorizar_enlaces in (False, True):
+                crawler = CrawlerObjetivo(diccionario_paginas, url_inicial, objetivo, priorizar_enlaces)
+                crawler.run()
+                assert len(crawler.set_direcciones_bitcoin_encontradas) >= objetivo, "No se ha alcanzado el objetivo"
+                lista_descargas.append(len(crawler.lista_descargas))
+            diccionario_totales[objetivo][0] += lista_descargas[0]
+            diccionario_totales[objetivo][1] += lista_descargas[1]
+            print(f"{semilla:>7} | {len(diccionario_paginas):>7} | {num_monederos:>9} | {objetivo:>8} | "
+                  f"{lista_descargas[0]:>14} | {lista_descargas[1]:>19} | {1 - lista_descargas[1] / lista_descargas[0]:>9.0%}")
+    for objetivo, (total_fifo, total_prioridad) in diccionario_totales.items():
+        print(f"{'Total':>7} | {'':>7} | {'':>9} | {objetivo:>8} | {total_fifo:>14} | {total_prioridad:>19} | "
+              f"{1 - total_prioridad / total_fifo:>9.0%}")
+
+    generador = random.Random(0)
+    lista_urls = [f"http://{host(generador.randrange(1000))}/p{indice}" for indice in range(NUM_URLS_COSTE)]
+    lista_prioridades = [generador.uniform(-5, 5) for _ in range(NUM_URLS_COSTE)]
+    for clase_frontera in (FronteraURLs, FronteraPrioridad):
+        print(f"{clase_frontera.__name__}: {medir_coste(clase_frontera, lista_urls, lista_prioridades):.2f} µs por URL")
@@ -0,0 +1,124 @@
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from indice_monederos import IndiceMonederos
+
+'''
+* DESCRIPCIÓN: Benchmark del índice local de monederos. Se genera un volcado sintético de transacciones en formato
+               Blockcypher, se mide su carga masiva y el tiempo de consulta de miles de direcciones (en lote y una a
+               una), y se comprueba que balances, totales y transacciones coinciden con los calculados directamente
+               sobre el volcado. También se comprueba la carga de un bloque de Bitcoin Core (getblock con
+               verbosidad 3).
+'''
+
+NUM_TRANSACCIONES = 100000
+NUM_DIRECCIONES = 20000
+NUM_CONSULTAS = 5000
+
+
+'''
+* FUNCIÓN: volcado_sintetico
+* DESCRIPCIÓN: Genera un volcado JSON Lines de transacciones de Blockcypher y los valores esperados por dirección.
+* ARGS_IN:
+    - semilla: semilla del generador aleatorio.
+* ARGS_OUT:
+    - Texto del volcado.
+    - Diccionario de valores esperados. Clave: dirección. Valor: [total recibido, total enviado, set de hashes].
+'''
+def volcado_sintetico(semilla=0):
+    generador = random.Random(semilla)
+    lista_direcciones = [f"1Dir{i:06d}" for i in range(NUM_DIRECCIONES)]
+    diccionario_esperado = {direccion: [0, 0, set()] for direccion in lista_direcciones}
+    lista_lineas = []
+    for i in range(NUM_TRANSACCIONES):
+        hash_tx = f"{i:064x}"
+        entradas = [{"addresses": [generador.choice(lista_direcciones)], "output_value": generador.randint(1000, 10 ** 8)}
+                    for _ in range(generador.randint(1, 3))]
+        salidas = [{"addresses": [generador.choice(lista_direcciones)], "value": generador.randint(1000, 10 ** 8)}
+                   for _ in range(generador.randint(1, 3))]
+        # Salidas sin dirección (OP_RETURN) y entradas multifirma
+        if generador.random() < 0.05:
+            salidas.append({"addresses": None, "value": 0})
+        if generador.random() < 0.05:
+            entradas[0]["addresses"].append(generador.choice(lista_direcciones))
+        for entrada in entradas:
+            for direccion in set(entrada["addresses"]):
+                diccionario_esperado[direccion][1] += entrada["output_value"]
+                diccionario_esperado[direccion][2].add(hash_tx)
+        for salida in salidas:
+            for direccion in set(salida["addresses"] or []):
+                diccionario_esperado[direccion][0] += salida["value"]
+                diccionario_esperado[direccion][2].add(hash_tx)
+        lista_lineas.append(json.dumps({"hash": hash_tx, "block_height": 700000 + i // 2000,
+                                        "confirmed": "2022-01-01T00:00:00Z", "received": "2022-01-01T00:00:00Z",
+                                        "fees": 500, "inputs": entradas, "outputs": salidas}))
+    return "\n".join(lista_lineas), diccionario_esperado
+
+
+'''
+* FUNCIÓN: comprobar_bloque_bitcoin_core
+* DESCRIPCIÓN: Carga un bloque con el formato de "bitcoin-cli getblock <hash> 3" y comprueba los datos obtenidos.
+* ARGS_IN:
+    - indice: objeto IndiceMonederos.
+* ARGS_OUT:
+    - N/A
+'''
+def comprobar_bloque_bitcoin_core(indice):
+    bloque = {"height": 900000, "time": 1700000000, "tx": [
+        {"txid": "cb" * 32, "vin": [{"coinbase": "03"}],
+         "vout": [{"n": 0, "value": 6.25, "scriptPubKey": {"address": "bc1qminero"}}]},
+        {"txid": "ab" * 32, "vin": [{"prevout": {"value": 1.5, "scriptPubKey": {"address": "bc1qminero"}}}],
+         "vout": [{"n": 0, "value": 1.0, "scriptPubKey": {"address": "bc1qdestino"}},
+                  {"n": 1, "value": 0.4999, "scriptPubKey": {"address": "bc1qminero"}},
+                  {"n": 2, "value": 0.0, "scriptPubKey": {"type": "nulldata"}}]}]}
+    assert indice.cargar_volcado(io.StringIO(json.dumps(bloque))) == 2
+    datos = indice.obtener_monedero("bc1qminero")
+    assert datos["n_tx"] == 2 and datos["total_received"] == 674990000 and datos["total_sent"] == 150000000
+    assert datos["txs"][0]["confirmations"] == 1 and datos["txs"][0]["fees"] in (0, 10000)
+    assert indice.obtener_monedero("bc1qdestino")["balance"] == 100000000
+
+
+if __name__ == "__main__":
+    volcado, diccionario_esperado = volcado_sintetico()
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "indice.db")
+        indice = IndiceMonederos(ruta)
+
+        inicio = time.perf_counter()
+        assert indice.cargar_volcado(io.StringIO(volcado)) == NUM_TRANSACCIONES
+        tiempo_carga = time.perf_counter() - inicio
+        # Una segunda carga del mismo volcado no duplica datos
+        indice.cargar_volcado(io.StringIO(volcado))
+
+        lista_consultas = random.Random(1).sample(sorted(diccionario_esperado), NUM_CONSULTAS) + ["1NoIndexada"]
+        inicio = time.perf_counter()
+        diccionario_datos, _ = indice.obtener_monederos(lista_consultas)
+        tiempo_lote = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for direccion in lista_consultas[:1000]:
+            indice.obtener_monedero(direccion)
+        tiempo_individual = (time.perf_counter() - inicio) / 1000
+
+        for direccion in lista_consultas[:-1]:
+            total_recibido, total_enviado, set_hashes = diccionario_esperado[direccion]
+            datos = diccionario_datos[direccion]
+            assert datos["total_received"] == total_recibido and datos["total_sent"] == total_enviado
+            assert datos["balance"] == total_recibido - total_enviado
+            assert {tx["hash"] for tx in datos["txs"]} == set_hashes and datos["n_tx"] == len(set_hashes)
+        assert diccionario_datos["1NoIndexada"]["n_tx"] == 0 and diccionario_datos["1NoIndexada"]["txs"] == []
+
+        comprobar_bloque_bitcoin_core(indice)
+        indice.cerrar()
+        tamano_mb = os.path.getsize(ruta) / 2 ** 20
+
+    print(f"Carga: {NUM_TRANSACCIONES} transacciones en {tiempo_carga:.2f} s ({NUM_TRANSACCIONES / tiempo_carga:.0f} tx/s), índice de {tamano_mb:.1f} MB")
+    print(f"Consulta en lote de {len(lista_consultas)} direcciones: {tiempo_lote * 1000:.0f} ms | Consulta individual: {tiempo_individual * 1000:.2f} ms")
+    print("Resultados correctos")
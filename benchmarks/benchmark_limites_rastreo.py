@@ -0,0 +1,141 @@
+import os
+import random
+import sys
+import time
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from analizador_html import extraer_texto_y_enlaces
+from extractor_direcciones import encontrar_direcciones_bitcoin
+from huellas_contenido import calcular_huella
+from normalizacion_urls import normalizar_url, servicio_url
+from benchmark_duplicados import CrawlerSimulado, host, VOCABULARIO
+
+'''
+* DESCRIPCIÓN: Benchmark de la normalización de URLs y de los límites del rastreo. Se rastrea, sin red y con un
+               número fijo de descargas, una web sintética de servicios pequeños y un servicio muy grande, cuyos
+               enlaces incluyen variantes de la misma URL (fragmentos, parámetros de seguimiento, mayúsculas y
+               puerto por defecto) y enlaces a la web convencional que contienen ".onion" en la query string. Se
+               compara el filtro anterior de enlaces con la normalización, sin límites y con un número máximo de
+               páginas por servicio, contando las descargas repetidas o inútiles y las páginas de los servicios
+               pequeños cubiertas.
+'''
+
+NUM_SERVICIOS_PEQUENOS = 20
+PAGINAS_SERVICIO_PEQUENO = 20
+PAGINAS_SERVICIO_GRANDE = 5000
+MAX_DESCARGAS = 800
+MAX_PAGINAS_SERVICIO = 40
+
+
+'''
+* FUNCIÓN: crear_web
+* DESCRIPCIÓN: Genera el contenido de la web sintética, indexado por URL canónica.
+* ARGS_IN:
+    - semilla: semilla del generador aleatorio.
+* ARGS_OUT:
+    - Diccionario. Clave: URL canónica. Valor: HTML de la página.
+    - set con los hosts de los servicios pequeños.
+'''
+def crear_web(semilla=0):
+    generador = random.Random(semilla)
+    host_grande = host(10 ** 6)
+    diccionario_paginas = {}
+    for servicio in range(NUM_SERVICIOS_PEQUENOS):
+        host_servicio = host(servicio)
+        for pagina in range(PAGINAS_SERVICIO_PEQUENO):
+            siguiente = (pagina + 1) % PAGINAS_SERVICIO_PEQUENO
+            # Variantes de los enlaces a la página siguiente que apuntan al mismo contenido
+            enlaces = [f"/p{siguiente}", f"/p{siguiente}#comentarios", f"/p{siguiente}?utm_source=foro",
+                       f"HTTP://{host_servicio.upper()}:80/p{siguiente}", f"http://buscador.com/?q={host_servicio}",
+                       f"http://{host_grande}/p{generador.randrange(PAGINAS_SERVICIO_GRANDE)}"]
+            # Cada servicio pequeño solo se enlaza desde la última página del anterior
+            if pagina == PAGINAS_SERVICIO_PEQUENO - 1:
+                enlaces.append(f"http://{host((servicio + 1) % NUM_SERVICIOS_PEQUENOS)}/p0")
+            diccionario_paginas[f"http://{host_servicio}/p{pagina}"] = crear_pagina(generador, enlaces)
+    for pagina in range(PAGINAS_SERVICIO_GRANDE):
+        enlaces = [f"/p{generador.randrange(PAGINAS_SERVICIO_GRANDE)}" for _ in range(4)]
+        diccionario_paginas[f"http://{host_grande}/p{pagina}"] = crear_pagina(generador, enlaces)
+    return diccionario_paginas, {host(servicio) for servicio in range(NUM_SERVICIOS_PEQUENOS)}
+
+
+'''
+* FUNCIÓN: crear_pagina
+* DESCRIPCIÓN: Genera el HTML de una página con texto aleatorio y los enlaces indicados.
+* ARGS_IN:
+    - generador: generador aleatorio.
+    - enlaces: lista de enlaces de la página.
+* ARGS_OUT:
+    - HTML de la página.
+'''
+def crear_pagina(generador, enlaces):
+    texto = ' '.join(generador.choices(VOCABULARIO, k=100))
+    html_enlaces = ''.join(f'<a href="{enlace}">enlace</a>' for enlace in enlaces)
+    return f"<html><body><p>{texto}</p>{html_enlaces}</body></html>"
+
+
+'''
+* FUNCIÓN: analizar_pagina_anterior
+* DESCRIPCIÓN: Copia del análisis de páginas anterior, que aceptaba cualquier enlace que contuviera ".onion".
+* ARGS_IN:
+    - contenido: HTML de la página.
+    - url_base: URL de la página.
+* ARGS_OUT:
+    - set con las direcciones, set con los enlaces y huella de la página.
+'''
+def analizar_pagina_anterior(contenido, url_base):
+    texto, lista_hrefs = extraer_texto_y_enlaces(contenido)
+    set_enlaces = {url for url in (urljoin(url_base, href) for href in lista_hrefs) if ".onion" in url}
+    return encontrar_direcciones_bitcoin(texto), set_enlaces, calcular_huella(texto)
+
+
+'''
+* CLASE: CrawlerLimitado
+* DESCRIPCIÓN: CrawlerSimulado que se detiene tras MAX_DESCARGAS descargas. El servidor sintético ignora el
+               fragmento, los parámetros de seguimiento y las mayúsculas del host, como un servidor real.
+'''
+class CrawlerLimitado(CrawlerSimulado):
+    def __init__(self, diccionario_paginas, url_inicial, filtro_anterior, **opciones):
+        super().__init__(diccionario_paginas, url_inicial, True)
+        self.max_paginas_servicio = opciones.get("max_paginas_servicio")
+        self.profundidad_maxima = opciones.get("profundidad_maxima")
+        self.filtro_anterior = filtro_anterior
+
+    def obtener_html(self, url):
+        if len(self.lista_descargas) + 1 >= MAX_DESCARGAS:
+            self.evento_parada.set()
+        self.lista_descargas.append(url)
+        self.planificador.registrar_resultado(url, 0.001, True)
+        return self.diccionario_paginas.get(normalizar_url(url))
+
+    def procesar_y_extraer_enlaces(self, html, url_base):
+        if self.filtro_anterior:
+            return analizar_pagina_anterior(html, url_base)
+        return super().procesar_y_extraer_enlaces(html, url_base)
+
+
+if __name__ == "__main__":
+    diccionario_paginas, set_hosts_pequenos = crear_web()
+    url_inicial = f"http://{host(0)}/p0"
+    num_paginas_pequenas = NUM_SERVICIOS_PEQUENOS * PAGINAS_SERVICIO_PEQUENO
+    print(f"Web sintética: {len(diccionario_paginas)} páginas, {num_paginas_pequenas} en servicios pequeños. "
+          f"Rastreos de {MAX_DESCARGAS} descargas")
+
+    print(f"{'Rastreo':>32} | {'Descargas':>9} | {'Repetidas':>9} | {'Inútiles':>8} | {'Servicios pequeños':>18} | {'Servicio grande':>15} | {'Tiempo (s)':>10}")
+    for nombre, filtro_anterior, opciones in (("filtro anterior", True, {}), ("normalización", False, {}),
+                                              (f"normalización, {MAX_PAGINAS_SERVICIO} pág./servicio", False,
+                                               {"max_paginas_servicio": MAX_PAGINAS_SERVICIO})):
+        crawler = CrawlerLimitado(diccionario_paginas, url_inicial, filtro_anterior, **opciones)
+        inicio = time.perf_counter()
+        crawler.run()
+        tiempo = time.perf_counter() - inicio
+
+        lista_canonicas = [normalizar_url(url) for url in crawler.lista_descargas]
+        # Descargas de una página ya descargada con otra URL y descargas de URLs que no son de servicios ocultos
+        num_repetidas = len([url for url in lista_canonicas if url]) - len({url for url in lista_canonicas if url})
+        num_inutiles = lista_canonicas.count(None)
+        num_pequenas = len({url for url in lista_canonicas if url and servicio_url(url) in set_hosts_pequenos})
+        num_grande = len({url for url in lista_canonicas if url and servicio_url(url) not in set_hosts_pequenos})
+        print(f"{nombre:>32} | {len(crawler.lista_descargas):>9} | {num_repetidas:>9} | {num_inutiles:>8} | "
+              f"{num_pequenas:>10} / {num_paginas_pequenas:<5} | {num_grande:>15} | {tiempo:10.2f}")
@@ -0,0 +1,187 @@
+import gc
+import json
+import os
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from monedero_bitcoin import MonederoBitcoin, formatear_participantes
+
+'''
+* DESCRIPCIÓN: Benchmark de memoria del modelo de transacciones. Se compara el modelo anterior (objetos con
+               __dict__, emisores y receptores como listas de diccionarios con importes en BTC y los datos de la API
+               conservados en el monedero) con el modelo compacto de monedero_bitcoin para monederos sintéticos de
+               1.000 a 50.000 transacciones. Se mide la memoria retenida tras la conversión y el tiempo de
+               conversión, y se comprueba que las filas mostradas y exportadas coinciden.
+'''
+
+
+class TransaccionBitcoinAnterior():
+    def __init__(self, hash, valor_neto, comision, num_bloque, fecha_confirmacion, num_confirmaciones,
+                 tipo, emisores, receptores):
+        self.hash = hash
+        self.valor_neto = valor_neto
+        self.comision = comision
+        self.num_bloque = num_bloque
+        self.fecha_confirmacion = fecha_confirmacion
+        self.num_confirmaciones = num_confirmaciones
+        self.tipo = tipo
+        self.emisores = emisores
+        self.receptores = receptores
+
+
+class MonederoBitcoinAnterior():
+    def __init__(self, direccion, datosapi):
+        self.direccion = direccion
+        self.datosapi = datosapi
+        self.balance = self.datosapi["balance"]/100000000
+        self.total_recibido = self.datosapi["total_received"]/100000000
+        self.total_enviado = self.datosapi["total_sent"]/100000000
+        self.num_transacciones_confirmadas = self.datosapi["n_tx"]
+        self.balance_no_confirmado = self.datosapi["unconfirmed_balance"]/100000000
+        self.num_transacciones_no_confirmadas = self.datosapi["unconfirmed_n_tx"]
+        self.transacciones_confirmadas = []
+        if self.num_transacciones_confirmadas > 0:
+            for transaccion in self.datosapi["txs"]:
+                emisores = [{'direcciones': e['addresses'] or [], 'valor': e['output_value']/100000000} for e in transaccion["inputs"]]
+                receptores = [{'direcciones': r['addresses'] or [], 'valor': r['value']/100000000} for r in transaccion["outputs"]]
+                en_emisores = any(self.direccion in e['direcciones'] for e in emisores)
+                en_receptores = any(self.direccion in r['direcciones'] for r in receptores)
+                if en_emisores and en_receptores:
+                    tipo = "Emisor/Receptor"
+                elif en_emisores:
+                    tipo = "Emisor"
+                elif en_receptores:
+                    tipo = "Receptor"
+                else:
+                    tipo = "Revisar en la cadena"
+                self.transacciones_confirmadas.append(TransaccionBitcoinAnterior(hash = transaccion["hash"], valor_neto = transaccion["total"],
+                                                                                 comision = transaccion["fees"],
+                                                                                 num_bloque = transaccion["block_height"],
+                                                                                 fecha_confirmacion = transaccion["confirmed"],
+                                                                                 num_confirmaciones= transaccion["confirmations"],
+                                                                                 tipo = tipo, emisores = emisores, receptores = receptores))
+
+
+def formatear_anterior(participantes):
+    return ', '.join(f"{direccion}: {valor} BTC" for e in participantes for direccion, valor in zip(e['direcciones'], [e['valor']]))
+
+
+'''
+* FUNCIÓN: importes_mostrados
+* DESCRIPCIÓN: Extrae las direcciones e importes de un texto de participantes. El formato anterior mostraba el float
+               en BTC y el actual muestra siempre ocho decimales, así que se comparan los importes como Decimal.
+* ARGS_IN:
+    - texto: texto de participantes ("direccion: importe BTC, ...").
+* ARGS_OUT:
+    - Lista de pares (dirección, importe).
+'''
+def importes_mostrados(texto):
+    pares = [participante.rsplit(': ', 1) for participante in texto.split(', ')] if texto else []
+    return [(direccion, Decimal(importe.removesuffix(' BTC'))) for direccion, importe in pares]
+
+
+'''
+* FUNCIÓN: respuesta_sintetica
+* DESCRIPCIÓN: Genera la respuesta JSON de la API (addrs/full) de un monedero con el número de transacciones indicado.
+* ARGS_IN:
+    - direccion: dirección del monedero.
+    - num_transacciones: número de transacciones.
+    - semilla: semilla del generador aleatorio.
+* ARGS_OUT:
+    - Texto JSON de la respuesta.
+'''
+def respuesta_sintetica(direccion, num_transacciones, semilla=0):
+    generador = random.Random(semilla)
+    lista_contrapartes = [f"1Contraparte{generador.getrandbits(100):030x}" for _ in range(max(10, num_transacciones // 10))]
+    fecha = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    lista_txs = []
+    for i in range(num_transacciones):
+        entradas = [{"addresses": [generador.choice(lista_contrapartes)], "output_value": generador.randint(1000, 10 ** 9),
+                     "script_type": "pay-to-pubkey-hash"} for _ in range(generador.randint(1, 3))]
+        salidas = [{"addresses": [generador.choice(lista_contrapartes)], "value": generador.randint(1000, 10 ** 9),
+                    "script_type": "pay-to-pubkey-hash"} for _ in range(generador.randint(1, 3))]
+        (entradas if i % 2 else salidas)[0]["addresses"] = [direccion]
+        lista_txs.append({"hash": f"{generador.getrandbits(256):064x}", "block_height": 800000 - i, "total": generador.randint(1000, 10 ** 9),
+                          "fees": generador.randint(100, 10 ** 5), "confirmations": i + 1,
+                          "confirmed": (fecha - timedelta(minutes=10 * i)).isoformat(), "inputs": entradas, "outputs": salidas})
+    return json.dumps({"address": direccion, "balance": 12345, "total_received": 67890, "total_sent": 55545, "n_tx": num_transacciones,
+                       "unconfirmed_balance": 0, "unconfirmed_n_tx": 0, "txs": lista_txs})
+
+
+'''
+* FUNCIÓN: cargar_respuesta
+* DESCRIPCIÓN: Decodifica la respuesta de la API y convierte las fechas, como hace la librería de Blockcypher.
+* ARGS_IN:
+    - texto: texto JSON de la respuesta.
+* ARGS_OUT:
+    - Diccionario con los datos del monedero.
+'''
+def cargar_respuesta(texto):
+    datos = json.loads(texto)
+    for tx in datos["txs"]:
+        tx["confirmed"] = datetime.fromisoformat(tx["confirmed"])
+    return datos
+
+
+'''
+* FUNCIÓN: medir
+* DESCRIPCIÓN: Mide la memoria retenida por un monedero tras su conversión y el tiempo de conversión. Los datos de la
+               API solo siguen en memoria si el modelo los conserva.
+* ARGS_IN:
+    - clase: clase del monedero.
+    - direccion: dirección del monedero.
+    - texto: texto JSON de la respuesta.
+* ARGS_OUT:
+    - Objeto monedero, memoria retenida en bytes y tiempo de conversión en segundos.
+'''
+def medir(clase, direccion, texto):
+    datos = cargar_respuesta(texto)
+    inicio = time.perf_counter()
+    clase(direccion, datos)
+    tiempo = time.perf_counter() - inicio
+    del datos
+
+    gc.collect()
+    tracemalloc.start()
+    datos = cargar_respuesta(texto)
+    monedero = clase(direccion, datos)
+    del datos
+    gc.collect()
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return monedero, memoria, tiempo
+
+
+if __name__ == "__main__":
+    direccion = "1MonederoAnalizado"
+    print(f"{'Transacciones':>13} | {'Anterior (MB)':>13} | {'Compacto (MB)':>13} | {'Reducción':>9} | {'Anterior (ms)':>13} | {'Compacto (ms)':>13} | {'Pickle':>11}")
+    for num_transacciones in (1000, 10000, 50000):
+        texto = respuesta_sintetica(direccion, num_transacciones, semilla=num_transacciones)
+        anterior, memoria_anterior, tiempo_anterior = medir(MonederoBitcoinAnterior, direccion, texto)
+        compacto, memoria_compacto, tiempo_compacto = medir(MonederoBitcoin, direccion, texto)
+
+        for tx_anterior, tx_compacta in zip(anterior.transacciones_confirmadas, compacto.transacciones_confirmadas, strict=True):
+            assert (tx_anterior.hash, tx_anterior.valor_neto, tx_anterior.comision, tx_anterior.num_bloque, tx_anterior.num_confirmaciones, tx_anterior.tipo) == \
+                   (tx_compacta.hash, tx_compacta.valor_neto, tx_compacta.comision, tx_compacta.num_bloque, tx_compacta.num_confirmaciones, tx_compacta.tipo)
+            assert tx_anterior.fecha_confirmacion.strftime("%Y-%m-%d %H:%M") == tx_compacta.fecha_confirmacion.strftime("%Y-%m-%d %H:%M")
+            assert importes_mostrados(formatear_anterior(tx_anterior.emisores)) == importes_mostrados(formatear_participantes(tx_compacta.emisores))
+            assert importes_mostrados(formatear_anterior(tx_anterior.receptores)) == importes_mostrados(formatear_participantes(tx_compacta.receptores))
+
+        # Tamaño del monedero serializado y formato JSON de la caché en disco
+        copia = MonederoBitcoin.desde_diccionario(json.loads(json.dumps(compacto.a_diccionario())))
+        assert [tx.hash for tx in copia.transacciones_confirmadas] == [tx.hash for tx in compacto.transacciones_confirmadas]
+        tamano_pickle_anterior = len(pickle.dumps(anterior))
+        tamano_pickle_compacto = len(pickle.dumps(compacto))
+        assert len(pickle.loads(pickle.dumps(compacto)).transacciones_confirmadas) == num_transacciones
+
+        print(f"{num_transacciones:>13} | {memoria_anterior / 2 ** 20:13.1f} | {memoria_compacto / 2 ** 20:13.1f} | "
+              f"{memoria_anterior / memoria_compacto:8.1f}x | {tiempo_anterior * 1000:13.0f} | {tiempo_compacto * 1000:13.0f} | "
+              f"{tamano_pickle_anterior / tamano_pickle_compacto:10.1f}x")
+        del anterior, compacto
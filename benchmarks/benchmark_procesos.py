@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from analisis_paginas import analizar_pagina
+from benchmark_analizador import pagina_sintetica, URL_BASE
+
+'''
+* DESCRIPCIÓN: Benchmark de la etapa de análisis de páginas en procesos independientes. Se mide el rendimiento
+               (páginas y MB por segundo) del análisis en el propio hilo y con conjuntos de 1 a N procesos, con la
+               misma contrapresión que HiloCrawler (como máximo dos páginas pendientes por proceso), y se comprueba
+               que los resultados coinciden. Las páginas se leen de un directorio de páginas guardadas (.html)
+               indicado como argumento o, si no se indica, se generan páginas sintéticas de 16 KB a 1 MB.
+'''
+
+
+'''
+* FUNCIÓN: cargar_corpus
+* DESCRIPCIÓN: Lee las páginas guardadas de un directorio o genera un corpus sintético.
+* ARGS_IN:
+    - directorio: directorio con ficheros .html. None, para generar el corpus.
+* ARGS_OUT:
+    - Lista de páginas en bytes.
+'''
+def cargar_corpus(directorio=None):
+    if directorio:
+        lista_paginas = []
+        for nombre in sorted(os.listdir(directorio)):
+            if nombre.endswith((".html", ".htm")):
+                with open(os.path.join(directorio, nombre), "rb") as fichero:
+                    lista_paginas.append(fichero.read())
+        return lista_paginas
+    tamanos_kb = (16, 64, 256, 1024)
+    return [pagina_sintetica(tamanos_kb[i % len(tamanos_kb)] * 1024, semilla=i).encode("utf-8") for i in range(64)]
+
+
+'''
+* FUNCIÓN: analizar_en_procesos
+* DESCRIPCIÓN: Analiza el corpus en un conjunto de procesos con un número acotado de páginas pendientes.
+* ARGS_IN:
+    - lista_paginas: lista de páginas en bytes.
+    - num_procesos: número de procesos de análisis.
+* ARGS_OUT:
+    - Lista de resultados en el orden del corpus.
+'''
+def analizar_en_procesos(lista_paginas, num_procesos):
+    max_pendientes = 2 * num_procesos
+    lista_resultados = [None] * len(lista_paginas)
+    with ProcessPoolExecutor(max_workers=num_procesos, mp_context=multiprocessing.get_context("spawn")) as ejecutor:
+        # Arranque de los procesos fuera de la medición
+        list(ejecutor.map(analizar_pagina, [b""] * num_procesos, [URL_BASE] * num_procesos))
+
+        inicio = time.perf_counter()
+        diccionario_tareas_indice = {}
+        for indice, pagina in enumerate(lista_paginas):
+            if len(diccionario_tareas_indice) >= max_pendientes:
+                tareas_finalizadas, _ = wait(diccionario_tareas_indice, return_when=FIRST_COMPLETED)
+                for tarea in tareas_finalizadas:
+                    lista_resultados[diccionario_tareas_indice.pop(tarea)] = tarea.result()
+            diccionario_tareas_indice[ejecutor.submit(analizar_pagina, pagina, URL_BASE)] = indice
+        for tarea in diccionario_tareas_indice:
+            lista_resultados[diccionario_tareas_indice[tarea]] = tarea.result()
+        tiempo = time.perf_counter() - inicio
+    return lista_resultados, tiempo
+
+
+if __name__ == "__main__":
+    lista_paginas = cargar_corpus(sys.argv[1] if len(sys.argv) > 1 else None)
+    num_mb = sum(len(pagina) for pagina in lista_paginas) / 2 ** 20
+    print(f"Corpus: {len(lista_paginas)} páginas, {num_mb:.1f} MB, {os.cpu_count()} núcleos")
+
+    inicio = time.perf_counter()
+    lista_resultados_hilo = [analizar_pagina(pagina, URL_BASE) for pagina in lista_paginas]
+    tiempo = time.perf_counter() - inicio
+
+    print(f"{'Procesos':>9} | {'Páginas/s':>10} | {'MB/s':>7} | {'Aceleración':>11}")
+    print(f"{'hilo':>9} | {len(lista_paginas) / tiempo:10.1f} | {num_mb / tiempo:7.2f} | {1.0:10.1f}x")
+    tiempo_hilo = tiempo
+
+    # Potencias de dos hasta el número de núcleos, incluido este
+    lista_num_procesos = sorted({2 ** i for i in range(os.cpu_count().bit_length())} | {os.cpu_count()})
+    for num_procesos in lista_num_procesos:
+        lista_resultados, tiempo = analizar_en_procesos(lista_paginas, num_procesos)
+        assert lista_resultados == lista_resultados_hilo, "Los resultados difieren"
+        print(f"{num_procesos:>9} | {len(lista_paginas) / tiempo:10.1f} | {num_mb / tiempo:7.2f} | {tiempo_hilo / tiempo:10.1f}x")
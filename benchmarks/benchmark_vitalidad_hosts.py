@@ -0,0 +1,215 @@
+import os
+import queue
+import random
+import sys
+import tempfile
+import time
+from threading import Event, Lock
+from urllib.parse import urlsplit
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from crawler import HiloCrawler
+from vitalidad_hosts import CacheVitalidadHosts, TIMEOUT_MINIMO, TIMEOUT_MAXIMO
+from benchmark_duplicados import host, VOCABULARIO
+
+'''
+* DESCRIPCIÓN: Benchmark de los tiempos de espera adaptativos y la caché de vitalidad de los hosts. Se rastrea una
+               web sintética en la que la mayoría de los servicios enlazados están caídos, a través de una red TOR
+               simulada con latencias a escala (ESCALA segundos reales por segundo simulado): los servicios activos
+               responden con una latencia propia, mayor en el primer contacto, y los caídos agotan el tiempo de espera
+               o fallan tras unos segundos. Se compara el tiempo de espera fijo anterior con los tiempos adaptativos y
+               la caché, y se repite el rastreo con la caché guardada en disco por el primero.
+'''
+
+ESCALA = 0.001
+NUM_SERVICIOS = 200
+FRACCION_SERVICIOS_CAIDOS = 0.7
+FRACCION_SERVICIOS_LENTOS = 0.1
+PAGINAS_POR_SERVICIO = 15
+# Páginas de cada servicio enlazadas desde otros servicios
+PAGINAS_ENLAZADAS = 5
+ENLACES_INTERNOS = 3
+ENLACES_EXTERNOS = 3
+# Fracción de servicios caídos cuyas peticiones fallan tras unos segundos en lugar de agotar el tiempo de espera
+FRACCION_FALLO_RAPIDO = 0.5
+NUM_PETICIONES_CONCURRENTES = 8
+
+
+'''
+* FUNCIÓN: crear_web
+* DESCRIPCIÓN: Genera la web sintética y la latencia base de cada servicio activo.
+* ARGS_IN:
+    - semilla: semilla del generador aleatorio.
+* ARGS_OUT:
+    - Diccionario. Clave: URL. Valor: HTML de la página. Solo contiene las páginas de los servicios activos.
+    - Diccionario. Clave: host. Valor: latencia base en segundos simulados. None, si el servicio está caído.
+'''
+def crear_web(semilla=0):
+    generador = random.Random(semilla)
+    lista_hosts = [host(servicio) for servicio in range(NUM_SERVICIOS)]
+    diccionario_host_latencia = {}
+    for indice, host_servicio in enumerate(lista_hosts):
+        # El servicio 0, el de la URL inicial, está activo
+        if indice and generador.random() < FRACCION_SERVICIOS_CAIDOS:
+            diccionario_host_latencia[host_servicio] = None
+        elif generador.random() < FRACCION_SERVICIOS_LENTOS:
+            diccionario_host_latencia[host_servicio] = generador.uniform(6.0, 10.0)
+        else:
+            diccionario_host_latencia[host_servicio] = generador.uniform(1.0, 4.0)
+
+    diccionario_paginas = {}
+    for host_servicio, latencia in diccionario_host_latencia.items():
+        if latencia is None:
+            continue
+        for pagina in range(PAGINAS_POR_SERVICIO):
+            enlaces = [f"/p{generador.randrange(PAGINAS_POR_SERVICIO)}" for _ in range(ENLACES_INTERNOS)]
+            enlaces += [f"http://{generador.choice(lista_hosts)}/p{generador.randrange(PAGINAS_ENLAZADAS)}"
+                        for _ in range(ENLACES_EXTERNOS)]
+            texto = ' '.join(generador.choices(VOCABULARIO, k=60))
+            html_enlaces = ''.join(f'<a href="{enlace}">enlace</a>' for enlace in enlaces)
+            diccionario_paginas[f"http://{host_servicio}/p{pagina}"] = f"<html><body><p>{texto}</p>{html_enlaces}</body></html>"
+    return diccionario_paginas, diccionario_host_latencia
+
+
+'''
+* CLASE: RespuestaSimulada
+* DESCRIPCIÓN: Respuesta HTTP en modo streaming con el HTML de una página.
+'''
+class RespuestaSimulada():
+    def __init__(self, html):
+        self.status_code = 200
+        self.headers = {"Content-Type": "text/html"}
+        self.contenido = html.encode()
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for inicio in range(0, len(self.contenido), chunk_size):
+            yield self.contenido[inicio:inicio + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+
+'''
+* CLASE: RedSimulada
+* DESCRIPCIÓN: Sustituto del pool de sesiones que simula las peticiones a través de TOR con esperas a escala y
+               acumula el tiempo simulado empleado en peticiones correctas y fallidas.
+'''
+class RedSimulada():
+    def __init__(self, diccionario_paginas, diccionario_host_latencia):
+        self.diccionario_paginas = diccionario_paginas
+        self.diccionario_host_latencia = diccionario_host_latencia
+        self.set_hosts_contactados = set()
+        self.cerrojo = Lock()
+        self.lista_descargas = []
+        self.num_fallos = 0
+        self.tiempo_fallos = 0.0
+        self.tiempo_correctas = 0.0
+
+    def obtener_sesion(self, url, proxies):
+        return self
+
+    def estadisticas(self):
+        return {"aciertos": 0, "fallos": 0, "expulsiones": 0, "sesiones_abiertas": 0}
+
+    def cerrar(self):
+        pass
+
+    def get(self, url, timeout, stream):
+        host_url = urlsplit(url).netloc
+        generador = random.Random(url)
+        latencia_base = self.diccionario_host_latencia[host_url]
+        with self.cerrojo:
+            primer_contacto = host_url not in self.set_hosts_contactados
+            self.set_hosts_contactados.add(host_url)
+
+        if latencia_base is None:
+            # Servicio caído: el descriptor no se encuentra tras unos segundos o la conexión no llega a establecerse
+            fallo_rapido = random.Random(host_url).random() < FRACCION_FALLO_RAPIDO
+            latencia = generador.uniform(1.0, 5.0) if fallo_rapido else float("inf")
+        else:
+            # El primer contacto incluye el establecimiento del circuito hasta el servicio oculto
+            latencia = latencia_base * generador.lognormvariate(0.0, 0.3) + (generador.uniform(2.0, 6.0) if primer_contacto else 0.0)
+
+        tiempo = min(latencia, timeout / ESCALA)
+        time.sleep(tiempo * ESCALA)
+        with self.cerrojo:
+            if latencia_base is None or latencia > timeout / ESCALA:
+                self.num_fallos += 1
+                self.tiempo_fallos += tiempo
+            else:
+                self.tiempo_correctas += tiempo
+                self.lista_descargas.append(url)
+        if latencia > timeout / ESCALA:
+            raise requests.exceptions.ConnectTimeout(f"Tiempo de espera agotado: {url}")
+        if latencia_base is None:
+            raise requests.exceptions.ConnectionError(f"Servicio oculto no encontrado: {url}")
+        return RespuestaSimulada(self.diccionario_paginas[url])
+
+
+'''
+* CLASE: VitalidadFija
+* DESCRIPCIÓN: Caché de vitalidad que reproduce el comportamiento anterior: tiempo de espera fijo y ningún host caído.
+'''
+class VitalidadFija(CacheVitalidadHosts):
+    def timeout(self, host):
+        return TIMEOUT_MAXIMO * ESCALA
+
+    def registrar_fallo(self, host):
+        return False
+
+
+'''
+* CLASE: CrawlerTorSimulado
+* DESCRIPCIÓN: HiloCrawler que descarga las páginas a través de la red simulada.
+'''
+class CrawlerTorSimulado(HiloCrawler):
+    def __init__(self, red, url_inicial, vitalidad_hosts):
+        super().__init__([url_inicial], 10 ** 9, queue.Queue(), Event(),
+                         num_peticiones_concurrentes=NUM_PETICIONES_CONCURRENTES)
+        self.pool_sesiones = red
+        self.vitalidad_hosts = vitalidad_hosts
+        self.planificador.vitalidad_hosts = vitalidad_hosts
+        self.planificador.retardo_minimo = 0.0
+
+    def verificar_conexion_tor(self):
+        pass
+
+
+if __name__ == "__main__":
+    diccionario_paginas, diccionario_host_latencia = crear_web()
+    url_inicial = f"http://{host(0)}/p0"
+    num_caidos = list(diccionario_host_latencia.values()).count(None)
+    print(f"Web sintética: {len(diccionario_host_latencia)} servicios, {num_caidos} caídos, {len(diccionario_paginas)} páginas "
+          f"activas. {NUM_PETICIONES_CONCURRENTES} peticiones simultáneas; tiempos en segundos simulados")
+
+    print(f"{'Rastreo':>28} | {'Descargas':>9} | {'Fallos':>6} | {'Descartadas':>11} | {'Tiempo en fallos':>16} | "
+          f"{'Tiempo total':>12}")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_cache = os.path.join(directorio, "hosts.db")
+        # El segundo rastreo con caché la abre después de que el primero la haya guardado
+        for nombre, clase_vitalidad, ruta in (("timeout fijo", VitalidadFija, None),
+                                              ("adaptativo y caché", CacheVitalidadHosts, ruta_cache),
+                                              ("caché guardada en disco", CacheVitalidadHosts, ruta_cache)):
+            vitalidad_hosts = clase_vitalidad(ruta, TIMEOUT_MINIMO * ESCALA, TIMEOUT_MAXIMO * ESCALA)
+            red = RedSimulada(diccionario_paginas, diccionario_host_latencia)
+            crawler = CrawlerTorSimulado(red, url_inicial, vitalidad_hosts)
+            inicio = time.perf_counter()
+            crawler.run()
+            tiempo = (time.perf_counter() - inicio) / ESCALA
+            estadisticas = None
+            while not crawler.cola_comunicacion.empty():
+                comando, datos = crawler.cola_comunicacion.get()
+                if comando == "estadisticas":
+                    estadisticas = datos
+            num_descargas = len(set(red.lista_descargas))
+            print(f"{nombre:>28} | {num_descargas:>4} / {len(diccionario_paginas):<4}| {red.num_fallos:>6} | "
+                  f"{estadisticas['urls_hosts_caidos']:>11} | {red.tiempo_fallos:>16.0f} | {tiempo:>12.0f}")
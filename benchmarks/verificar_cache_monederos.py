@@ -0,0 +1,74 @@
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from cache_monederos import CacheMonederos
+
+'''
+* DESCRIPCIÓN: Comprueba que la caché de monederos descarga una sola vez un monedero pedido desde varios hilos a la
+               vez (como una carga interactiva de un monedero que se está precargando), que los errores de esa
+               descarga llegan a todos los que la esperan y que los datos en disco sobreviven al tiempo de vida en
+               memoria hasta que caduca el de disco.
+'''
+
+NUM_HILOS = 8
+LATENCIA_DESCARGA = 0.2
+
+
+'''
+* CLASE: DescargaContada
+* DESCRIPCIÓN: Función de descarga lenta que cuenta las llamadas recibidas por dirección.
+'''
+class DescargaContada():
+    def __init__(self, error=None):
+        self.error = error
+        self.diccionario_llamadas = {}
+        self.cerrojo = Lock()
+
+    def __call__(self, direccion):
+        with self.cerrojo:
+            self.diccionario_llamadas[direccion] = self.diccionario_llamadas.get(direccion, 0) + 1
+        time.sleep(LATENCIA_DESCARGA)
+        if self.error:
+            raise self.error
+        return {"address": direccion, "n_tx": 1}
+
+
+if __name__ == "__main__":
+    # Peticiones simultáneas del mismo monedero
+    cache = CacheMonederos()
+    descarga = DescargaContada()
+    with ThreadPoolExecutor(NUM_HILOS) as ejecutor:
+        lista_datos = list(ejecutor.map(lambda direccion: cache.obtener(direccion, descarga), ["1A"] * NUM_HILOS + ["1B"] * 2))
+    assert descarga.diccionario_llamadas == {"1A": 1, "1B": 1}, descarga.diccionario_llamadas
+    assert all(datos["address"] == "1A" for datos in lista_datos[:NUM_HILOS])
+    assert not cache.diccionario_descargas
+
+    # Un error de la descarga compartida llega a todos los hilos y no queda registrado como descarga en curso
+    descarga_fallida = DescargaContada(error=ConnectionError("API no disponible"))
+    with ThreadPoolExecutor(NUM_HILOS) as ejecutor:
+        lista_futuros = [ejecutor.submit(cache.obtener, "1C", descarga_fallida) for _ in range(NUM_HILOS)]
+    assert all(isinstance(futuro.exception(), ConnectionError) for futuro in lista_futuros)
+    assert descarga_fallida.diccionario_llamadas == {"1C": 1}, descarga_fallida.diccionario_llamadas
+    assert not cache.diccionario_descargas
+    assert cache.obtener("1C", descarga)["address"] == "1C"
+
+    # Tiempo de vida en disco más largo que en memoria
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "cache.sqlite3")
+        cache = CacheMonederos(tiempo_vida=0.1, ruta_disco=ruta, tiempo_vida_disco=1.0)
+        cache.obtener("1D", descarga)
+        cache.cerrar()
+        time.sleep(0.2)
+        cache = CacheMonederos(tiempo_vida=0.1, ruta_disco=ruta, tiempo_vida_disco=1.0)
+        assert cache.consultar("1D") is not None, "Datos en disco expulsados con el tiempo de vida en memoria"
+        time.sleep(1.0)
+        assert cache.consultar("1D") is None, "Datos en disco no caducados"
+        cache.cerrar()
+
+    print("Descargas simultáneas compartidas y tiempos de vida de memoria y disco correctos")
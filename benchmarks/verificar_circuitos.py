@@ -0,0 +1,159 @@
+import os
+import queue
+import socket
+import socketserver
+import sys
+import time
+from threading import Event, Thread
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from circuitos import PoolCircuitos
+from crawler import HiloCrawler
+
+'''
+* DESCRIPCIÓN: Comprueba PoolCircuitos y su uso desde HiloCrawler.obtener_html contra servidores SOCKS5 locales que
+               imitan a TOR: uno rápido, uno lento y un endpoint cerrado (proxy caído). Los hosts cuyo nombre empieza
+               por "caido" se responden con el código SOCKS 0x04 (host inalcanzable), como un servicio oculto caído.
+               Se verifica que los hosts nuevos se reparten entre los circuitos antes de la primera respuesta, que el
+               circuito lento deja de recibir hosts nuevos, que el endpoint caído deja de recibirlos tras sus fallos y
+               que sus hosts se reasignan a otro circuito, y que los servicios ocultos caídos no penalizan al circuito.
+'''
+
+RETARDO_LENTO = 0.3
+HTML_RESPUESTA = b"<html><body><p>pagina</p></body></html>"
+
+
+'''
+* CLASE: ManejadorSocks
+* DESCRIPCIÓN: Servidor SOCKS5 mínimo (sin autenticación o con usuario y contraseña) que, en lugar de conectar con
+               el destino, responde él mismo a la petición HTTP tras el retardo del servidor.
+'''
+class ManejadorSocks(socketserver.BaseRequestHandler):
+    def handle(self):
+        conexion = self.request
+        _, num_metodos = conexion.recv(2)
+        metodos = conexion.recv(num_metodos)
+        if 2 in metodos:
+            conexion.sendall(b"\x05\x02")
+            _, longitud_usuario = conexion.recv(2)
+            conexion.recv(longitud_usuario)
+            conexion.recv(conexion.recv(1)[0])
+            conexion.sendall(b"\x01\x00")
+        else:
+            conexion.sendall(b"\x05\x00")
+
+        _, _, _, tipo_direccion = conexion.recv(4)
+        host = conexion.recv(conexion.recv(1)[0]).decode() if tipo_direccion == 3 else ""
+        conexion.recv(2)
+        if host.startswith("caido"):
+            conexion.sendall(b"\x05\x04\x00\x01" + b"\x00" * 6)
+            return
+        conexion.sendall(b"\x05\x00\x00\x01" + b"\x00" * 6)
+
+        peticion = b""
+        while b"\r\n\r\n" not in peticion:
+            fragmento = conexion.recv(4096)
+            if not fragmento:
+                return
+            peticion += fragmento
+        time.sleep(self.server.retardo)
+        conexion.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nConnection: close\r\n"
+                         + f"Content-Length: {len(HTML_RESPUESTA)}\r\n\r\n".encode() + HTML_RESPUESTA)
+
+
+'''
+* FUNCIÓN: iniciar_servidor
+* DESCRIPCIÓN: Inicia en segundo plano un servidor SOCKS5 local.
+* ARGS_IN:
+    - retardo: segundos de espera antes de cada respuesta HTTP.
+* ARGS_OUT:
+    - Servidor iniciado.
+'''
+def iniciar_servidor(retardo):
+    servidor = socketserver.ThreadingTCPServer(("127.0.0.1", 0), ManejadorSocks)
+    servidor.daemon_threads = True
+    servidor.retardo = retardo
+    Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+'''
+* FUNCIÓN: puerto_cerrado
+* DESCRIPCIÓN: Obtiene un puerto local en el que no escucha ningún servidor.
+* ARGS_IN:
+    - N/A
+* ARGS_OUT:
+    - Número de puerto.
+'''
+def puerto_cerrado():
+    with socket.socket() as conexion:
+        conexion.bind(("127.0.0.1", 0))
+        return conexion.getsockname()[1]
+
+
+'''
+* FUNCIÓN: circuito_de
+* DESCRIPCIÓN: Devuelve el índice del circuito asignado a un host.
+* ARGS_IN:
+    - pool: PoolCircuitos.
+    - host: host asignado.
+* ARGS_OUT:
+    - Índice del circuito en el pool.
+'''
+def circuito_de(pool, host):
+    return pool.circuitos.index(pool.diccionario_host_circuito[host])
+
+
+if __name__ == "__main__":
+    servidor_rapido = iniciar_servidor(0.0)
+    servidor_lento = iniciar_servidor(RETARDO_LENTO)
+    endpoint_caido = f"127.0.0.1:{puerto_cerrado()}"
+    lista_endpoints = [f"127.0.0.1:{servidor_rapido.server_address[1]}", f"127.0.0.1:{servidor_lento.server_address[1]}",
+                       endpoint_caido]
+
+    # Reparto antes de la primera respuesta: los costes no empatan a cero
+    pool = PoolCircuitos(lista_endpoints)
+    for i in range(6):
+        pool.asignar(f"inicial{i}.onion")
+    assert [c.num_hosts for c in pool.circuitos] == [2, 2, 2], [c.num_hosts for c in pool.circuitos]
+
+    crawler = HiloCrawler([], 1, queue.Queue(), Event(), endpoints_socks=tuple(lista_endpoints))
+    pool = crawler.pool_circuitos
+    # Primer host de cada circuito, asignados antes de la primera respuesta: el circuito caído acumula fallos y los
+    # otros dos, latencias
+    for i in range(3):
+        pool.asignar(f"activo{i}.onion")
+    for i in range(3):
+        assert crawler.obtener_html(f"http://activo{i}.onion/") in (None, HTML_RESPUESTA)
+    indice_caido = circuito_de(pool, "activo2.onion")
+    assert lista_endpoints[indice_caido] == endpoint_caido
+    circuito_caido = pool.circuitos[indice_caido]
+    assert circuito_caido.num_fallos == 1, circuito_caido.num_fallos
+
+    # Tras superar el umbral de fallos, el host del circuito caído se reasigna a otro circuito. El proxy caído no
+    # hace caer al host
+    assert crawler.obtener_html("http://activo2.onion/") is None
+    assert crawler.obtener_html("http://activo2.onion/") == HTML_RESPUESTA
+    assert circuito_de(pool, "activo2.onion") != indice_caido
+    assert not crawler.vitalidad_hosts.host_caido("activo2.onion")
+
+    # Los hosts nuevos evitan el circuito caído y, mayoritariamente, el lento
+    for i in range(3, 9):
+        assert crawler.obtener_html(f"http://activo{i}.onion/") == HTML_RESPUESTA
+    lista_asignados = [circuito_de(pool, f"activo{i}.onion") for i in range(3, 9)]
+    assert indice_caido not in lista_asignados, lista_asignados
+    assert lista_asignados.count(0) > lista_asignados.count(1), lista_asignados
+
+    # Los servicios ocultos caídos (respuesta SOCKS 0x04) no penalizan a ningún circuito, pero sí hacen caer al host
+    lista_fallos = [c.num_fallos for c in pool.circuitos]
+    for i in range(5):
+        assert crawler.obtener_html(f"http://caido{i}.onion/") is None
+        assert crawler.vitalidad_hosts.host_caido(f"caido{i}.onion")
+    assert [c.num_fallos for c in pool.circuitos] == lista_fallos, pool.estadisticas()
+
+    servidor_rapido.shutdown()
+    servidor_lento.shutdown()
+    for estadistica in pool.estadisticas():
+        print(estadistica)
+    print("Reparto inicial, desvío del circuito lento y del endpoint caído y servicios caídos: correctos")
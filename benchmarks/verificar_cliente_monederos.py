@@ -0,0 +1,268 @@
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from cache_monederos import CacheMonederos
+from cliente_monederos import ClienteMonederos, LimitadorTasa, MAX_TXS_POR_PAGINA
+
+'''
+* DESCRIPCIÓN: Comprueba ClienteMonederos contra un servidor HTTP local que imita el endpoint addrs/full de
+               Blockcypher (paginación con "before" y "hasMore", latencia fija y respuestas 429 aleatorias). Se
+               verifica que se obtiene el historial completo de cada dirección aunque un bloque quede repartido
+               entre dos páginas o no quepa en una o la primera página solo contenga transacciones sin confirmar,
+               que el historial se marca como incompleto si un bloque supera el máximo de transacciones de la API,
+               que no se supera el límite de peticiones por segundo, la aceleración de las consultas en paralelo
+               frente a las secuenciales, la precarga de los monederos en una caché y que una consulta del usuario
+               no espera a las peticiones de la precarga.
+'''
+
+NUM_DIRECCIONES = 24
+TXS_POR_PAGINA = 10
+LATENCIA_SERVIDOR = 0.05
+PROBABILIDAD_429 = 0.05
+PETICIONES_POR_SEGUNDO = 40.0
+
+
+'''
+* FUNCIÓN: historial_sintetico
+* DESCRIPCIÓN: Genera el historial de una dirección, ordenado de la transacción más reciente a la más antigua. Varios
+               bloques contienen más de una transacción para forzar bloques repartidos entre páginas.
+* ARGS_IN:
+    - direccion: dirección del monedero.
+    - semilla: semilla del generador aleatorio.
+    - txs_bloque_grande: número de transacciones de un bloque intermedio del historial (Opcional).
+    - txs_no_confirmadas: número de transacciones sin confirmar al principio del historial (Opcional).
+* ARGS_OUT:
+    - Lista de transacciones con el formato de Blockcypher.
+'''
+def historial_sintetico(direccion, semilla, txs_bloque_grande=0, txs_no_confirmadas=0):
+    generador = random.Random(semilla)
+    lista_alturas = []
+    altura = 800000
+    for _ in range(generador.randint(0, 8 * TXS_POR_PAGINA)):
+        if generador.random() < 0.6:
+            altura -= generador.randint(1, 500)
+        lista_alturas.append(altura)
+    if txs_bloque_grande:
+        # Bloque propio a mitad del historial; los bloques anteriores se desplazan para dejarle hueco
+        mitad = len(lista_alturas) // 2
+        altura_bloque = (lista_alturas[mitad - 1] if mitad else 800000) - 1000
+        lista_alturas = lista_alturas[:mitad] + [altura_bloque] * txs_bloque_grande + [a - 2000 for a in lista_alturas[mitad:]]
+
+    lista_alturas = [-1] * txs_no_confirmadas + lista_alturas
+
+    lista_txs = []
+    for i, altura in enumerate(lista_alturas):
+        lista_txs.append({"hash": f"{direccion}-{i:04d}", "block_height": altura, "confirmed": "2023-05-01T12:00:00Z",
+                          "received": "2023-05-01T11:59:00Z", "fees": 1000, "confirmations": 10,
+                          "inputs": [{"addresses": [direccion], "output_value": 5000}],
+                          "outputs": [{"addresses": ["1Destino"], "value": 4000}]})
+    return lista_txs
+
+
+'''
+* CLASE: ServidorBlockcypher
+* DESCRIPCIÓN: Manejador HTTP que imita el endpoint addrs/full de Blockcypher y registra el instante de cada petición.
+'''
+class ServidorBlockcypher(BaseHTTPRequestHandler):
+    diccionario_historiales = {}
+    lista_instantes = []
+    cerrojo = Lock()
+
+    def do_GET(self):
+        with self.cerrojo:
+            self.lista_instantes.append(time.monotonic())
+        time.sleep(LATENCIA_SERVIDOR)
+        if random.random() < PROBABILIDAD_429:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        ruta = urlparse(self.path)
+        direccion = ruta.path.split('/')[-2]
+        parametros = parse_qs(ruta.query)
+        limite = min(int(parametros["limit"][0]), MAX_TXS_POR_PAGINA)
+        antes_de_bloque = int(parametros["before"][0]) if "before" in parametros else None
+        despues_de_bloque = int(parametros["after"][0]) if "after" in parametros else None
+        # Con cursores, la API solo devuelve transacciones confirmadas
+        lista_txs = [tx for tx in self.diccionario_historiales[direccion]
+                     if (antes_de_bloque is None and despues_de_bloque is None or tx["block_height"] >= 0)
+                     and (antes_de_bloque is None or tx["block_height"] < antes_de_bloque)
+                     and (despues_de_bloque is None or tx["block_height"] > despues_de_bloque)]
+        cuerpo = {"address": direccion, "balance": 0, "total_received": 0, "total_sent": 0,
+                  "n_tx": len(self.diccionario_historiales[direccion]), "unconfirmed_balance": 0, "unconfirmed_n_tx": 0,
+                  "txs": lista_txs[:limite], "hasMore": len(lista_txs) > limite}
+        datos = json.dumps(cuerpo).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, *args):
+        pass
+
+
+'''
+* FUNCIÓN: comprobar_historiales
+* DESCRIPCIÓN: Comprueba que los datos obtenidos contienen el historial completo y sin repeticiones de cada dirección.
+* ARGS_IN:
+    - diccionario_datos: datos obtenidos. Clave: dirección. Valor: datos del monedero.
+    - lista_direcciones: direcciones consultadas.
+* ARGS_OUT:
+    - N/A
+'''
+def comprobar_historiales(diccionario_datos, lista_direcciones):
+    assert set(diccionario_datos) == set(lista_direcciones), "Faltan direcciones"
+    for direccion, datos in diccionario_datos.items():
+        lista_hashes = [tx["hash"] for tx in datos["txs"]]
+        esperados = [tx["hash"] for tx in ServidorBlockcypher.diccionario_historiales[direccion]]
+        assert len(lista_hashes) == len(set(lista_hashes)), f"Transacciones repetidas en {direccion}"
+        assert sorted(lista_hashes) == sorted(esperados), f"Historial incompleto en {direccion}"
+        assert not datos["hasMore"]
+
+
+'''
+* CLASE: LimitadorRegistrado
+* DESCRIPCIÓN: Limitador de peticiones que registra el instante en que concede cada ficha. Los instantes de llegada
+               al servidor varían con la latencia de cada petición; los de concesión miden el propio limitador.
+'''
+class LimitadorRegistrado(LimitadorTasa):
+    def __init__(self, peticiones_por_segundo):
+        super().__init__(peticiones_por_segundo)
+        self.lista_instantes = []
+
+    def esperar(self, prioritaria=True):
+        super().esperar(prioritaria)
+        with self.cerrojo:
+            self.lista_instantes.append(time.monotonic())
+
+
+'''
+* FUNCIÓN: tasa_maxima
+* DESCRIPCIÓN: Calcula el número máximo de peticiones registradas en cualquier ventana de un segundo.
+* ARGS_IN:
+    - lista_instantes: instantes de las peticiones.
+* ARGS_OUT:
+    - Número máximo de peticiones en un segundo.
+'''
+def tasa_maxima(lista_instantes):
+    lista_instantes = sorted(lista_instantes)
+    maximo, inicio = 0, 0
+    for fin, instante in enumerate(lista_instantes):
+        while instante - lista_instantes[inicio] >= 1.0:
+            inicio += 1
+        maximo = max(maximo, fin - inicio + 1)
+    return maximo
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    lista_direcciones = [f"1Direccion{i:03d}" for i in range(NUM_DIRECCIONES)]
+    ServidorBlockcypher.diccionario_historiales = {direccion: historial_sintetico(direccion, i) for i, direccion in enumerate(lista_direcciones)}
+    # Un bloque con más transacciones que una página, pero que cabe en el máximo de la API, y otro que no cabe
+    direccion_bloque_grande, direccion_bloque_excesivo = "1BloqueGrande", "1BloqueExcesivo"
+    ServidorBlockcypher.diccionario_historiales[direccion_bloque_grande] = historial_sintetico(
+        direccion_bloque_grande, NUM_DIRECCIONES, 3 * TXS_POR_PAGINA)
+    ServidorBlockcypher.diccionario_historiales[direccion_bloque_excesivo] = historial_sintetico(
+        direccion_bloque_excesivo, NUM_DIRECCIONES + 1, MAX_TXS_POR_PAGINA + 10)
+    # Más transacciones sin confirmar de las que caben en la primera página
+    direccion_no_confirmadas = "1NoConfirmadas"
+    ServidorBlockcypher.diccionario_historiales[direccion_no_confirmadas] = historial_sintetico(
+        direccion_no_confirmadas, NUM_DIRECCIONES + 2, txs_no_confirmadas=2 * TXS_POR_PAGINA)
+    # Direcciones de la comprobación de prioridad frente a la precarga
+    lista_direcciones_precarga = [f"1Precarga{i:03d}" for i in range(NUM_DIRECCIONES)]
+    for i, direccion in enumerate(lista_direcciones_precarga):
+        ServidorBlockcypher.diccionario_historiales[direccion] = historial_sintetico(direccion, 2 * NUM_DIRECCIONES + i)
+    # Semilla con un historial de ocho páginas
+    ServidorBlockcypher.diccionario_historiales["1Usuario"] = historial_sintetico("1Usuario", 53)
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ServidorBlockcypher)
+    Thread(target=servidor.serve_forever, daemon=True).start()
+    url_base = f"http://127.0.0.1:{servidor.server_address[1]}/v1/btc/main"
+
+    # Consultas secuenciales
+    cliente = ClienteMonederos(url_base, peticiones_por_segundo=PETICIONES_POR_SEGUNDO, txs_por_pagina=TXS_POR_PAGINA)
+    inicio = time.perf_counter()
+    diccionario_secuencial = {direccion: cliente.obtener_monedero(direccion) for direccion in lista_direcciones}
+    tiempo_secuencial = time.perf_counter() - inicio
+    comprobar_historiales(diccionario_secuencial, lista_direcciones)
+    num_peticiones = len(ServidorBlockcypher.lista_instantes)
+
+    # Consultas en paralelo
+    ServidorBlockcypher.lista_instantes.clear()
+    cliente = ClienteMonederos(url_base, peticiones_por_segundo=PETICIONES_POR_SEGUNDO, max_hilos=8, txs_por_pagina=TXS_POR_PAGINA)
+    cliente.limitador = LimitadorRegistrado(PETICIONES_POR_SEGUNDO)
+    inicio = time.perf_counter()
+    diccionario_paralelo, diccionario_errores = cliente.obtener_monederos(lista_direcciones)
+    tiempo_paralelo = time.perf_counter() - inicio
+    assert not diccionario_errores, diccionario_errores
+    comprobar_historiales(diccionario_paralelo, lista_direcciones)
+    maximo = tasa_maxima(cliente.limitador.lista_instantes)
+    assert maximo <= PETICIONES_POR_SEGUNDO, f"Límite de peticiones superado: {maximo}/s"
+    maximo_servidor = tasa_maxima(ServidorBlockcypher.lista_instantes)
+
+    # Bloques que no caben en una página
+    for txs_por_pagina in (TXS_POR_PAGINA, MAX_TXS_POR_PAGINA):
+        cliente = ClienteMonederos(url_base, peticiones_por_segundo=PETICIONES_POR_SEGUNDO, txs_por_pagina=txs_por_pagina)
+        datos = cliente.obtener_monedero(direccion_bloque_grande)
+        historial = ServidorBlockcypher.diccionario_historiales[direccion_bloque_grande]
+        assert sorted(tx["hash"] for tx in datos["txs"]) == sorted(tx["hash"] for tx in historial), "Bloque grande truncado"
+        assert not datos["hasMore"]
+        datos = cliente.obtener_monedero(direccion_bloque_excesivo)
+        historial = ServidorBlockcypher.diccionario_historiales[direccion_bloque_excesivo]
+        altura_minima = min(tx["block_height"] for tx in historial)
+        assert altura_minima < historial[len(historial) // 2]["block_height"]
+        assert datos["hasMore"], "Historial truncado sin marcar"
+        assert altura_minima in {tx["block_height"] for tx in datos["txs"]}, "Bloques anteriores al excesivo omitidos"
+        # Las transacciones sin confirmar posteriores a la primera página no son accesibles con cursores, pero el
+        # historial confirmado debe estar completo
+        datos = cliente.obtener_monedero(direccion_no_confirmadas)
+        historial = ServidorBlockcypher.diccionario_historiales[direccion_no_confirmadas]
+        set_hashes = {tx["hash"] for tx in datos["txs"]}
+        assert len(set_hashes) == len(datos["txs"])
+        assert {tx["hash"] for tx in historial if tx["block_height"] >= 0} <= set_hashes, "Historial confirmado omitido"
+        assert not datos["hasMore"]
+
+    # Precarga en una caché
+    cache = CacheMonederos(max_entradas=NUM_DIRECCIONES)
+    wait(cliente.precargar(lista_direcciones + lista_direcciones[:5], cache))
+    comprobar_historiales({direccion: cache.consultar(direccion) for direccion in lista_direcciones}, lista_direcciones)
+    cliente.cerrar()
+
+    # Consulta del usuario durante la precarga: sus peticiones se atienden antes que las de la precarga, también
+    # las de una dirección que la precarga ya está descargando
+    cliente = ClienteMonederos(url_base, peticiones_por_segundo=PETICIONES_POR_SEGUNDO, max_hilos=8, txs_por_pagina=TXS_POR_PAGINA)
+    num_paginas_usuario = -(-len(ServidorBlockcypher.diccionario_historiales["1Usuario"]) // TXS_POR_PAGINA)
+    tiempo_maximo_usuario = 2 * num_paginas_usuario * (1 / PETICIONES_POR_SEGUNDO + LATENCIA_SERVIDOR)
+    cache = CacheMonederos(max_entradas=2 * NUM_DIRECCIONES)
+    lista_tareas = cliente.precargar(lista_direcciones_precarga, cache)
+    time.sleep(0.5)
+    inicio = time.perf_counter()
+    cliente.priorizar("1Usuario")
+    comprobar_historiales({"1Usuario": cache.obtener("1Usuario", cliente.obtener_monedero)}, ["1Usuario"])
+    tiempo_usuario = time.perf_counter() - inicio
+    assert tiempo_usuario < tiempo_maximo_usuario, f"Consulta del usuario retrasada por la precarga: {tiempo_usuario:.2f} s"
+    direccion_en_curso = next(d for d, t in zip(lista_direcciones_precarga, lista_tareas) if t.running())
+    cliente.priorizar(direccion_en_curso)
+    cache.obtener(direccion_en_curso, cliente.obtener_monedero)
+    assert lista_tareas[lista_direcciones_precarga.index(direccion_en_curso)].done()
+    wait(lista_tareas)
+    cliente.cerrar()
+    servidor.shutdown()
+
+    print(f"{NUM_DIRECCIONES} direcciones, {num_peticiones} peticiones (incluidos reintentos tras 429)")
+    print(f"Secuencial: {tiempo_secuencial:.2f} s | Paralelo (8 hilos): {tiempo_paralelo:.2f} s | "
+          f"Aceleración: {tiempo_secuencial / tiempo_paralelo:.1f}x | Máximo: {maximo} peticiones/s (límite {PETICIONES_POR_SEGUNDO:.0f}, "
+          f"{maximo_servidor} a la llegada al servidor)")
+    print(f"Consulta del usuario durante la precarga: {tiempo_usuario:.2f} s ({num_paginas_usuario} páginas)")
+    print("Historiales completos y precarga correcta")
@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from arbol_paginado import IndiceBusqueda
+
+'''
+* DESCRIPCIÓN: Comprueba que el índice de búsqueda de las ventanas de resultados y transacciones devuelve todos los
+               elementos cuya clave contiene el texto buscado, también cuando el texto es una dirección completa de
+               un elemento que aparece como subcadena de la dirección o del hash de otro.
+'''
+
+
+if __name__ == "__main__":
+    direccion_corta = "1BoatSLRHtKNngkdXEeobR76b53LETtpyT"
+    direccion_larga = direccion_corta + "Xy"
+    hash_con_direccion = "ab" + direccion_corta.lower() + "cd"
+
+    indice = IndiceBusqueda()
+    indice.agregar("corta", ' '.join(["http://a.onion", direccion_corta]))
+    indice.agregar("larga", ' '.join(["http://b.onion", direccion_larga]))
+    indice.agregar("hash", ' '.join([hash_con_direccion, "entrada"]))
+    indice.agregar("otra", ' '.join(["http://c.onion", "3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy"]))
+
+    # Una dirección completa de un elemento también es subcadena de la clave de otros dos
+    assert indice.buscar(direccion_corta) == ["corta", "larga", "hash"]
+    assert indice.buscar(f"  {direccion_corta.upper()} ") == ["corta", "larga", "hash"]
+    assert indice.buscar(direccion_larga) == ["larga"]
+    assert [indice.coincide(posicion, direccion_corta) for posicion in range(len(indice))] == [True, True, True, False]
+
+    # Los monederos añadidos tras indexar un elemento también se encuentran
+    indice.actualizar(3, direccion_corta)
+    assert indice.buscar(direccion_corta) == ["corta", "larga", "hash", "otra"]
+    assert indice.buscar("") == ["corta", "larga", "hash", "otra"]
+    assert indice.buscar("noexiste") == []
+    print("Búsqueda de direcciones contenidas en otras: correcta")
@@ -0,0 +1,146 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from frontera import FronteraURLs, FronteraPrioridad
+from planificador import PlanificadorHosts
+from benchmark_duplicados import host
+
+'''
+* DESCRIPCIÓN: Comprueba el orden en que el planificador de hosts extrae las URLs de la frontera con prioridad
+               cuando los hosts tienen un ritmo de peticiones limitado: las URLs de cada host salen en orden de
+               prioridad y no en orden de llegada, ninguna URL se aparca fuera de la frontera, en cada ronda los
+               hosts listos se despachan por la prioridad de su servicio y un cambio de esa prioridad durante el
+               rastreo se aplica a las URLs pendientes. También se comprueba que con la cola FIFO todas las URLs se
+               despachan respetando el retardo de cada host.
+'''
+
+RETARDO = 0.05
+NUM_URLS_HOST = 20
+# Prioridad inicial de cada servicio y prioridad del último tras el cambio
+LISTA_PRIORIDADES_SERVICIO = [10.0, 5.0, 0.0]
+PRIORIDAD_CAMBIADA = 20.0
+# Número de URLs despachadas antes de cambiar la prioridad del último servicio
+NUM_URLS_CAMBIO = 15
+
+
+'''
+* FUNCIÓN: crear_frontera
+* DESCRIPCIÓN: Crea una frontera con NUM_URLS_HOST URLs por host, encoladas en orden aleatorio con prioridades
+               propias distintas.
+* ARGS_IN:
+    - clase_frontera: FronteraURLs o FronteraPrioridad.
+    - lista_hosts: hosts de las URLs.
+    - semilla: semilla del generador aleatorio.
+* ARGS_OUT:
+    - Frontera creada.
+    - Diccionario con la prioridad propia de cada URL. Clave: URL. Valor: prioridad.
+'''
+def crear_frontera(clase_frontera, lista_hosts, semilla):
+    generador = random.Random(semilla)
+    frontera = clase_frontera()
+    for nombre_host, prioridad in zip(lista_hosts, LISTA_PRIORIDADES_SERVICIO):
+        frontera.actualizar_servicio(nombre_host, prioridad)
+    diccionario_url_prioridad = {f"http://{nombre_host}/pagina{i}": float(i) for nombre_host in lista_hosts
+                                 for i in range(NUM_URLS_HOST)}
+    lista_urls = list(diccionario_url_prioridad)
+    generador.shuffle(lista_urls)
+    for url in lista_urls:
+        frontera.agregar(url, diccionario_url_prioridad[url])
+    return frontera, diccionario_url_prioridad
+
+
+'''
+* FUNCIÓN: rastrear
+* DESCRIPCIÓN: Despacha todas las URLs de la frontera con descargas instantáneas, como el bucle secuencial del
+               crawler, y cambia la prioridad del último servicio tras NUM_URLS_CAMBIO URLs.
+* ARGS_IN:
+    - frontera: frontera de rastreo.
+    - lista_hosts: hosts de las URLs.
+* ARGS_OUT:
+    - Lista de tuplas (instante, ronda, URL) de las URLs despachadas. Una ronda termina cuando ningún host está listo.
+    - Número máximo de URLs aparcadas en el planificador.
+'''
+def rastrear(frontera, lista_hosts):
+    planificador = PlanificadorHosts(retardo_minimo=RETARDO, retardo_maximo=RETARDO)
+    lista_despachos = []
+    ronda = 0
+    max_aparcadas = 0
+    while len(frontera) or planificador.num_aparcadas:
+        url, espera = planificador.siguiente(frontera)
+        max_aparcadas = max(max_aparcadas, planificador.num_aparcadas)
+        if url is None:
+            ronda += 1
+            time.sleep(espera if espera is not None else 0.01)
+            continue
+        lista_despachos.append((time.monotonic(), ronda, url))
+        planificador.registrar_resultado(url, 0.0, True)
+        if len(lista_despachos) == NUM_URLS_CAMBIO:
+            frontera.actualizar_servicio(lista_hosts[-1], PRIORIDAD_CAMBIADA)
+    return lista_despachos, max_aparcadas
+
+
+'''
+* FUNCIÓN: comprobar_retardos
+* DESCRIPCIÓN: Comprueba que se han despachado todas las URLs y que entre dos visitas a un host pasa su retardo.
+* ARGS_IN:
+    - lista_despachos: lista de tuplas (instante, ronda, URL).
+    - diccionario_url_prioridad: prioridad propia de cada URL.
+* ARGS_OUT:
+    - Diccionario con las URLs de cada host en orden de despacho. Clave: host. Valor: lista de URLs.
+'''
+def comprobar_retardos(lista_despachos, diccionario_url_prioridad):
+    assert sorted(url for _, _, url in lista_despachos) == sorted(diccionario_url_prioridad), "URLs sin despachar"
+    diccionario_host_instantes = {}
+    diccionario_host_urls = {}
+    for instante, _, url in lista_despachos:
+        nombre_host = url.split('/')[2]
+        diccionario_host_instantes.setdefault(nombre_host, []).append(instante)
+        diccionario_host_urls.setdefault(nombre_host, []).append(url)
+    for lista_instantes in diccionario_host_instantes.values():
+        assert min(b - a for a, b in zip(lista_instantes, lista_instantes[1:])) >= RETARDO, "Retardo de host incumplido"
+    return diccionario_host_urls
+
+
+if __name__ == "__main__":
+    lista_hosts = [host(i) for i in range(len(LISTA_PRIORIDADES_SERVICIO))]
+
+    # Frontera con prioridad
+    frontera, diccionario_url_prioridad = crear_frontera(FronteraPrioridad, lista_hosts, semilla=0)
+    inicio = time.perf_counter()
+    lista_despachos, max_aparcadas = rastrear(frontera, lista_hosts)
+    tiempo = time.perf_counter() - inicio
+    diccionario_host_urls = comprobar_retardos(lista_despachos, diccionario_url_prioridad)
+    assert max_aparcadas == 0, f"{max_aparcadas} URLs aparcadas fuera de la frontera con prioridad"
+    for nombre_host, lista_urls in diccionario_host_urls.items():
+        lista_prioridades = [diccionario_url_prioridad[url] for url in lista_urls]
+        assert lista_prioridades == sorted(lista_prioridades, reverse=True), f"URLs de {nombre_host} fuera de orden"
+
+    # En cada ronda, los hosts listos se despachan por la prioridad actual de su servicio
+    orden_inicial = {nombre_host: i for i, nombre_host in enumerate(lista_hosts)}
+    orden_cambiado = {nombre_host: (i + 1) % len(lista_hosts) for i, nombre_host in enumerate(lista_hosts)}
+    diccionario_ronda_hosts = {}
+    for posicion, (_, ronda, url) in enumerate(lista_despachos):
+        diccionario_ronda_hosts.setdefault(ronda, []).append((posicion, url.split('/')[2]))
+    num_rondas_comprobadas = 0
+    for lista_posiciones_hosts in diccionario_ronda_hosts.values():
+        if len(lista_posiciones_hosts) < len(lista_hosts):
+            continue
+        orden = orden_inicial if lista_posiciones_hosts[0][0] < NUM_URLS_CAMBIO else orden_cambiado
+        lista_ordenes = [orden[nombre_host] for _, nombre_host in lista_posiciones_hosts]
+        assert lista_ordenes == sorted(lista_ordenes), "Hosts de una ronda fuera del orden de prioridad de su servicio"
+        num_rondas_comprobadas += 1
+    assert num_rondas_comprobadas >= NUM_URLS_HOST // 2
+
+    # Cola FIFO: las URLs de los hosts que no están listos se aparcan
+    frontera_fifo, diccionario_url_prioridad = crear_frontera(FronteraURLs, lista_hosts, semilla=0)
+    lista_despachos_fifo, max_aparcadas_fifo = rastrear(frontera_fifo, lista_hosts)
+    comprobar_retardos(lista_despachos_fifo, diccionario_url_prioridad)
+    assert max_aparcadas_fifo > 0
+
+    print(f"{len(lista_despachos)} URLs de {len(lista_hosts)} hosts (retardo {RETARDO} s) en {tiempo:.2f} s, "
+          f"{num_rondas_comprobadas} rondas completas en orden de prioridad y ninguna URL aparcada")
+    print(f"Cola FIFO: {len(lista_despachos_fifo)} URLs, máximo {max_aparcadas_fifo} aparcadas")
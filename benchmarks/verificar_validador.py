@@ -0,0 +1,146 @@
+import hashlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bitcoinlib.keys import Address
+from bitcoinlib.encoding import EncodingError
+from extractor_direcciones import REGEX_CANDIDATOS
+from validador_direcciones import (ALFABETO_BASE58, ALFABETO_BECH32, CONSTANTE_BECH32, CONSTANTE_BECH32M,
+                                   direccion_valida, polimodulo_bech32)
+
+'''
+* DESCRIPCIÓN: Comprueba que el validador nativo de direcciones devuelve exactamente el mismo veredicto que
+               bitcoinlib.keys.Address.parse sobre un corpus de direcciones válidas, direcciones con un carácter
+               alterado y casos límite (ceros iniciales, longitudes no estándar, constantes Bech32 cruzadas), y
+               compara el tiempo de validación de ambos.
+'''
+
+
+def codificar_base58check(datos):
+    datos = datos + hashlib.sha256(hashlib.sha256(datos).digest()).digest()[:4]
+    valor = int.from_bytes(datos, 'big')
+    cadena = ""
+    while valor:
+        valor, resto = divmod(valor, 58)
+        cadena = ALFABETO_BASE58[resto] + cadena
+    return "1" * (len(datos) - len(datos.lstrip(b'\x00'))) + cadena
+
+
+def codificar_bech32(hrp, version, programa, constante):
+    datos = [version]
+    acumulador, num_bits = 0, 0
+    for byte in programa:
+        acumulador = (acumulador << 8) | byte
+        num_bits += 8
+        while num_bits >= 5:
+            num_bits -= 5
+            datos.append((acumulador >> num_bits) & 31)
+    if num_bits:
+        datos.append((acumulador << (5 - num_bits)) & 31)
+    hrp_expandido = [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp]
+    polimodulo = polimodulo_bech32(hrp_expandido + datos + [0] * 6) ^ constante
+    datos += [(polimodulo >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + "1" + "".join(ALFABETO_BECH32[d] for d in datos)
+
+
+'''
+* FUNCIÓN: generar_corpus
+* DESCRIPCIÓN: Genera el corpus de direcciones de la comprobación.
+* ARGS_IN:
+    - num_direcciones: número de direcciones válidas de partida.
+    - semilla: semilla del generador aleatorio.
+    - solo_estandar: si es True, solo se generan direcciones de formato estándar (sin casos límite).
+* ARGS_OUT:
+    - lista de direcciones (válidas e inválidas).
+'''
+def generar_corpus(num_direcciones, semilla=0, solo_estandar=False):
+    aleatorio = random.Random(semilla)
+    corpus = []
+    for _ in range(num_direcciones):
+        tipo = aleatorio.random()
+        if tipo < 0.4:
+            # Base58Check con prefijos y longitudes variadas, incluidos ceros iniciales
+            if solo_estandar:
+                corpus.append(codificar_base58check(aleatorio.choice([b'\x00', b'\x05']) + aleatorio.randbytes(20)))
+                continue
+            prefijo = aleatorio.choice([b'\x00', b'\x05', b'\x00\x00', b'\x04', b'\x06', b''])
+            cuerpo = aleatorio.randbytes(aleatorio.choice([19, 20, 20, 20, 21, 22]))
+            if aleatorio.random() < 0.1:
+                cuerpo = b'\x00' * aleatorio.randint(1, 3) + cuerpo[3:]
+            corpus.append(codificar_base58check(prefijo + cuerpo))
+        elif solo_estandar:
+            version = aleatorio.choice([0, 1])
+            corpus.append(codificar_bech32("bc", version, aleatorio.randbytes(32),
+                                           CONSTANTE_BECH32 if version == 0 else CONSTANTE_BECH32M))
+        else:
+            version = aleatorio.choice([0, 0, 1, 1, 2])
+            longitud = aleatorio.choice([20, 32, 32, 2, 25, 40, 41])
+            constante = CONSTANTE_BECH32 if version == 0 else CONSTANTE_BECH32M
+            if aleatorio.random() < 0.05:
+                constante = CONSTANTE_BECH32M if version == 0 else CONSTANTE_BECH32
+            corpus.append(codificar_bech32("bc", version, aleatorio.randbytes(longitud), constante))
+
+    # Variantes con un carácter alterado
+    for direccion in list(corpus):
+        posicion = aleatorio.randrange(len(direccion))
+        alfabeto = ALFABETO_BECH32 if direccion.startswith("bc1") else ALFABETO_BASE58
+        corpus.append(direccion[:posicion] + aleatorio.choice(alfabeto) + direccion[posicion + 1:])
+    return corpus
+
+
+'''
+* FUNCIÓN: veredicto_bitcoinlib
+* DESCRIPCIÓN: Veredicto de la validación anterior del crawler, basada en Address.parse. Los errores distintos de
+               EncodingError (que antes detenían el rastreo) se consideran direcciones no válidas.
+* ARGS_IN:
+    - direccion: candidato a dirección Bitcoin.
+* ARGS_OUT:
+    - True si la dirección es válida.
+'''
+def veredicto_bitcoinlib(direccion):
+    try:
+        Address.parse(direccion)
+        return True
+    except EncodingError:
+        return False
+    except Exception:
+        return False
+
+
+if __name__ == "__main__":
+    corpus = generar_corpus(20000)
+    candidatos = [direccion for direccion in corpus if REGEX_CANDIDATOS.fullmatch(direccion)]
+
+    for nombre, lista in (("Corpus completo", corpus), ("Candidatos del extractor", candidatos)):
+        diferencias = [d for d in lista if veredicto_bitcoinlib(d) != direccion_valida.__wrapped__(d)]
+        num_validas = sum(1 for d in lista if direccion_valida.__wrapped__(d))
+        print(f"{nombre}: {len(lista)} direcciones, {num_validas} válidas, {len(diferencias)} diferencias")
+        for direccion in diferencias[:10]:
+            print(f"    {direccion}: bitcoinlib={veredicto_bitcoinlib(direccion)}")
+
+    # Medición de tiempos sobre candidatos de formato estándar, como los que aparecen en las páginas
+    candidatos = [d for d in generar_corpus(20000, semilla=1, solo_estandar=True) if REGEX_CANDIDATOS.fullmatch(d)]
+
+    inicio = time.perf_counter()
+    for direccion in candidatos:
+        veredicto_bitcoinlib(direccion)
+    tiempo_bitcoinlib = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for direccion in candidatos:
+        direccion_valida.__wrapped__(direccion)
+    tiempo_nativo = time.perf_counter() - inicio
+
+    direccion_valida.cache_clear()
+    inicio = time.perf_counter()
+    for _ in range(10):
+        for direccion in candidatos:
+            direccion_valida(direccion)
+    tiempo_cache = (time.perf_counter() - inicio) / 10
+
+    print(f"{len(candidatos)} candidatos estándar. Address.parse: {tiempo_bitcoinlib * 1000:.1f} ms | Nativo: {tiempo_nativo * 1000:.1f} ms | "
+          f"Nativo con caché (10 pasadas): {tiempo_cache * 1000:.1f} ms por pasada")
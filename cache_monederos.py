@@ -0,0 +1,209 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Lock
+import json
+import sqlite3
+import time
+
+# Versión del formato de la caché en disco, incluida en el nombre de la tabla. La versión 1 (tabla "monederos")
+# guardaba los datos con pickle y se elimina al abrir el fichero
+VERSION_CACHE = 2
+TABLA_MONEDEROS = f"monederos_v{VERSION_CACHE}"
+# Tiempo de vida por defecto (segundos) de los datos en memoria y en disco. En disco se conservan más tiempo para
+# reutilizarlos entre ejecuciones
+TIEMPO_VIDA = 600
+TIEMPO_VIDA_DISCO = 7 * 24 * 3600
+
+'''
+* CLASE: CacheMonederos
+* DESCRIPCIÓN: Clase que almacena los datos descargados de los monederos Bitcoin para no repetir la consulta a la API
+               al volver a un monedero ya visitado. Los datos caducan tras un tiempo de vida, más largo en disco que
+               en memoria, y el número de entradas está acotado: en memoria se expulsa el monedero menos
+               recientemente utilizado y, si se indica un fichero, los datos se conservan además en una base de
+               datos SQLite entre ejecuciones, de la que se expulsan los más antiguos. En disco los datos se guardan como JSON, nunca como objetos serializados
+               que ejecuten código al cargarlos, y su clave incluye el origen de los datos (API o índice local), de
+               modo que no se mezclan los de fuentes distintas. Las filas que no pueden decodificarse se descartan y
+               se consideran un fallo. Puede utilizarse desde varios hilos: si se pide un monedero que
+               otro hilo ya está descargando, se espera a esa descarga en lugar de repetirla.
+'''
+class CacheMonederos():
+    def __init__(self, tiempo_vida=TIEMPO_VIDA, max_entradas=128, ruta_disco=None, max_entradas_disco=4096, origen="",
+                 serializar=None, deserializar=None, tiempo_vida_disco=TIEMPO_VIDA_DISCO):
+        self.tiempo_vida = tiempo_vida
+        self.tiempo_vida_disco = tiempo_vida_disco
+        self.max_entradas = max_entradas
+        self.max_entradas_disco = max_entradas_disco
+        # Identificador de la fuente de los datos, parte de la clave en disco
+        self.origen = origen
+        # Conversión de los datos a valores JSON y viceversa. Por defecto, los datos ya son valores JSON
+        self.serializar = serializar or (lambda datos: datos)
+        self.deserializar = deserializar or (lambda valor: valor)
+
+        # Datos en memoria ordenados de menos a más recientemente utilizado.
+        # Clave: dirección del monedero. Valor: tupla (instante de la descarga, datos)
+        self.diccionario_monederos = OrderedDict()
+        # Descargas en curso. Clave: dirección del monedero. Valor: Future con los datos descargados
+        self.diccionario_descargas = {}
+        self.cerrojo = Lock()
+
+        self.conexion = None
+        if ruta_disco:
+            self.conexion = sqlite3.connect(ruta_disco, check_same_thread=False)
+            self.conexion.execute("PRAGMA journal_mode=WAL")
+            self.conexion.execute("DROP TABLE IF EXISTS monederos")
+            self.conexion.execute(f"CREATE TABLE IF NOT EXISTS {TABLA_MONEDEROS} (origen TEXT NOT NULL, direccion TEXT NOT NULL, "
+                                  "instante REAL NOT NULL, datos TEXT NOT NULL, PRIMARY KEY (origen, direccion))")
+            self.conexion.commit()
+
+        # Estadísticas de uso de la caché
+        self.num_aciertos = 0
+        self.num_fallos = 0
+
+    '''
+    * FUNCIÓN: obtener
+    * DESCRIPCIÓN: Devuelve los datos de un monedero. Si no están en la caché o han caducado, se descargan con la
+                   función indicada y se guardan. La descarga se realiza sin retener el cerrojo; las peticiones del
+                   mismo monedero que lleguen mientras tanto esperan a su resultado o a su excepción.
+    * ARGS_IN:
+        - direccion: dirección del monedero.
+        - funcion_descarga: función que recibe la dirección y devuelve los datos del monedero.
+    * ARGS_OUT:
+        - Datos del monedero.
+    '''
+    def obtener(self, direccion, funcion_descarga):
+        datos = self.consultar(direccion)
+        if datos is not None:
+            return datos
+
+        with self.cerrojo:
+            # Una descarga terminada entre la consulta y la adquisición del cerrojo ya está en memoria
+            entrada = self.diccionario_monederos.get(direccion)
+            if entrada is not None and time.time() - entrada[0] < self.tiempo_vida:
+                return entrada[1]
+            futuro = self.diccionario_descargas.get(direccion)
+            descarga_propia = futuro is None
+            if descarga_propia:
+                futuro = self.diccionario_descargas[direccion] = Future()
+        if not descarga_propia:
+            return futuro.result()
+
+        try:
+            datos = funcion_descarga(direccion)
+            self.guardar(direccion, datos)
+        except BaseException as error:
+            futuro.set_exception(error)
+            raise
+        else:
+            futuro.set_result(datos)
+        finally:
+            with self.cerrojo:
+                del self.diccionario_descargas[direccion]
+        return datos
+
+    '''
+    * FUNCIÓN: consultar
+    * DESCRIPCIÓN: Busca los datos vigentes de un monedero en memoria y, si no están, en disco. Si los datos en disco
+                   no pueden decodificarse se eliminan y se devuelve None, para que se vuelvan a descargar.
+    * ARGS_IN:
+        - direccion: dirección del monedero.
+    * ARGS_OUT:
+        - Datos del monedero. None, si no están en la caché o han caducado.
+    '''
+    def consultar(self, direccion):
+        ahora = time.time()
+        with self.cerrojo:
+            entrada = self.diccionario_monederos.get(direccion)
+            if entrada is not None:
+                instante, datos = entrada
+                if ahora - instante < self.tiempo_vida:
+                    self.diccionario_monederos.move_to_end(direccion)
+                    self.num_aciertos += 1
+                    return datos
+                del self.diccionario_monederos[direccion]
+
+            if self.conexion:
+                fila = self.conexion.execute(f"SELECT instante, datos FROM {TABLA_MONEDEROS} WHERE origen = ? AND direccion = ?",
+                                             (self.origen, direccion)).fetchone()
+                if fila is not None and ahora - fila[0] < self.tiempo_vida_disco:
+                    try:
+                        datos = self.deserializar(json.loads(fila[1]))
+                    except Exception:
+                        datos = None
+                        with self.conexion:
+                            self.conexion.execute(f"DELETE FROM {TABLA_MONEDEROS} WHERE origen = ? AND direccion = ?",
+                                                  (self.origen, direccion))
+                    if datos is not None:
+                        # En memoria cuentan desde su lectura, para no volver a decodificarlos en cada consulta
+                        self.guardar_en_memoria(direccion, ahora, datos)
+                        self.num_aciertos += 1
+                        return datos
+
+            self.num_fallos += 1
+            return None
+
+    '''
+    * FUNCIÓN: guardar
+    * DESCRIPCIÓN: Guarda los datos de un monedero en memoria y, si se ha configurado, en disco como JSON.
+    * ARGS_IN:
+        - direccion: dirección del monedero.
+        - datos: datos del monedero.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def guardar(self, direccion, datos):
+        instante = time.time()
+        texto = json.dumps(self.serializar(datos), separators=(',', ':')) if self.conexion else None
+        with self.cerrojo:
+            self.guardar_en_memoria(direccion, instante, datos)
+            if self.conexion:
+                with self.conexion:
+                    self.conexion.execute(f"INSERT OR REPLACE INTO {TABLA_MONEDEROS} (origen, direccion, instante, datos) "
+                                          "VALUES (?, ?, ?, ?)", (self.origen, direccion, instante, texto))
+                    # Expulsión de los datos caducados y, si se supera el máximo, de los más antiguos
+                    self.conexion.execute(f"DELETE FROM {TABLA_MONEDEROS} WHERE instante <= ?", (instante - self.tiempo_vida_disco,))
+                    self.conexion.execute(f"DELETE FROM {TABLA_MONEDEROS} WHERE rowid IN "
+                                          f"(SELECT rowid FROM {TABLA_MONEDEROS} ORDER BY instante DESC LIMIT -1 OFFSET ?)",
+                                          (self.max_entradas_disco,))
+
+    '''
+    * FUNCIÓN: guardar_en_memoria
+    * DESCRIPCIÓN: Guarda los datos de un monedero en memoria, expulsando el menos recientemente utilizado si se
+                   supera el número máximo de entradas. Debe llamarse con el cerrojo adquirido.
+    * ARGS_IN:
+        - direccion: dirección del monedero.
+        - instante: instante desde el que cuenta el tiempo de vida de los datos (time.time).
+        - datos: datos del monedero.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def guardar_en_memoria(self, direccion, instante, datos):
+        self.diccionario_monederos[direccion] = (instante, datos)
+        self.diccionario_monederos.move_to_end(direccion)
+        while len(self.diccionario_monederos) > self.max_entradas:
+            self.diccionario_monederos.popitem(last=False)
+
+    '''
+    * FUNCIÓN: estadisticas
+    * DESCRIPCIÓN: Devuelve las estadísticas de uso de la caché.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Diccionario con el número de aciertos, fallos y entradas en memoria.
+    '''
+    def estadisticas(self):
+        with self.cerrojo:
+            return {"aciertos": self.num_aciertos, "fallos": self.num_fallos, "entradas": len(self.diccionario_monederos)}
+
+    '''
+    * FUNCIÓN: cerrar
+    * DESCRIPCIÓN: Cierra la base de datos en disco, si se ha configurado.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar(self):
+        with self.cerrojo:
+            if self.conexion:
+                self.conexion.close()
+                self.conexion = None
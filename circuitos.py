@@ -0,0 +1,157 @@
+from threading import Lock
+from urllib.parse import urlsplit
+import requests
+
+# Latencia supuesta, en segundos, de los circuitos sin mediciones. Permite que la tasa de fallos y el número de hosts
+# penalicen también a los circuitos que aún no han respondido ninguna petición
+LATENCIA_INICIAL = 5.0
+# Número máximo de causas encadenadas que se examinan en el error de una petición
+MAX_CAUSAS = 10
+
+'''
+* CLASE: Circuito
+* DESCRIPCIÓN: Clase que modela un circuito de la red TOR accesible a través de un proxy SOCKS, junto con las
+               métricas observadas en las peticiones cursadas por él.
+'''
+class Circuito():
+    def __init__(self, url_proxy):
+        self.url_proxy = url_proxy
+        self.proxies = {'http': url_proxy, 'https': url_proxy}
+        # Medias móviles exponenciales de la latencia (segundos) y de la tasa de fallos
+        self.latencia_media = None
+        self.tasa_fallos = 0.0
+        self.num_exitos = 0
+        self.num_fallos = 0
+        # Número de hosts asignados actualmente al circuito
+        self.num_hosts = 0
+
+    '''
+    * FUNCIÓN: puntuacion
+    * DESCRIPCIÓN: Calcula el coste estimado de enviar nuevo tráfico por el circuito. Cuanto menor, mejor.
+                   Los circuitos sin mediciones utilizan LATENCIA_INICIAL, de modo que los hosts nuevos se
+                   reparten entre ellos y los que solo acumulan fallos dejan de recibirlos.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Coste estimado del circuito.
+    '''
+    def puntuacion(self):
+        latencia = LATENCIA_INICIAL if self.latencia_media is None else self.latencia_media
+        return latencia * (1 + 4 * self.tasa_fallos) * (1 + 0.1 * self.num_hosts)
+
+
+'''
+* CLASE: PoolCircuitos
+* DESCRIPCIÓN: Clase que reparte el tráfico del crawler entre varios circuitos de TOR. Los circuitos se obtienen de
+               una lista de endpoints SOCKS y/o del aislamiento de flujos por credenciales SOCKS de TOR
+               (IsolateSOCKSAuth), que asigna un circuito distinto a cada usuario sobre un mismo endpoint.
+               Cada host se asigna de forma estable a un circuito; los hosts nuevos se envían al circuito con menor
+               coste y los hosts de un circuito con muchos fallos se reasignan a otro.
+'''
+class PoolCircuitos():
+    def __init__(self, endpoints_socks, circuitos_por_endpoint=1, umbral_fallos=0.5, factor_suavizado=0.3):
+        self.umbral_fallos = umbral_fallos
+        self.factor_suavizado = factor_suavizado
+        self.circuitos = []
+        for endpoint in endpoints_socks:
+            url_endpoint = endpoint if "://" in endpoint else f"socks5h://{endpoint}"
+            partes = urlsplit(url_endpoint)
+            if circuitos_por_endpoint == 1:
+                self.circuitos.append(Circuito(url_endpoint))
+                continue
+            for i in range(circuitos_por_endpoint):
+                # Credenciales distintas por circuito para forzar el aislamiento de flujos en TOR
+                self.circuitos.append(Circuito(f"{partes.scheme}://crawler{i}:aislamiento@{partes.netloc}"))
+
+        if not self.circuitos:
+            raise ValueError("Se debe indicar al menos un endpoint SOCKS de TOR.")
+
+        # Asignación de hosts a circuitos. Clave: host. Valor: Circuito
+        self.diccionario_host_circuito = {}
+        self.cerrojo = Lock()
+
+    '''
+    * FUNCIÓN: asignar
+    * DESCRIPCIÓN: Devuelve el circuito por el que cursar las peticiones a un host. Si el host no tiene circuito o el
+                   suyo supera el umbral de fallos, se le asigna el circuito de menor coste, excluyendo aquel del que
+                   se le retira.
+    * ARGS_IN:
+        - host: host (netloc) de la URL a solicitar.
+    * ARGS_OUT:
+        - Objeto Circuito asignado al host.
+    '''
+    def asignar(self, host):
+        with self.cerrojo:
+            circuito = self.diccionario_host_circuito.get(host)
+            if circuito is not None and (circuito.tasa_fallos <= self.umbral_fallos or len(self.circuitos) == 1):
+                return circuito
+
+            circuito_nuevo = min((c for c in self.circuitos if c is not circuito), key=Circuito.puntuacion)
+            if circuito is not None:
+                circuito.num_hosts -= 1
+            circuito_nuevo.num_hosts += 1
+            self.diccionario_host_circuito[host] = circuito_nuevo
+            return circuito_nuevo
+
+    '''
+    * FUNCIÓN: registrar_resultado
+    * DESCRIPCIÓN: Actualiza las métricas de un circuito con el resultado de una petición. Solo deben registrarse
+                   como fallos los errores del transporte (ver fallo_del_circuito), no los de servicios ocultos caídos.
+    * ARGS_IN:
+        - circuito: circuito por el que se ha cursado la petición.
+        - latencia: tiempo en segundos hasta recibir la respuesta. Se ignora si la petición ha fallado.
+        - exito: True si se ha recibido respuesta, False si se ha producido un error del transporte.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def registrar_resultado(self, circuito, latencia, exito):
+        alfa = self.factor_suavizado
+        with self.cerrojo:
+            circuito.tasa_fallos = alfa * (0.0 if exito else 1.0) + (1 - alfa) * circuito.tasa_fallos
+            if exito:
+                circuito.num_exitos += 1
+                if circuito.latencia_media is None:
+                    circuito.latencia_media = latencia
+                else:
+                    circuito.latencia_media = alfa * latencia + (1 - alfa) * circuito.latencia_media
+            else:
+                circuito.num_fallos += 1
+
+    '''
+    * FUNCIÓN: estadisticas
+    * DESCRIPCIÓN: Devuelve las métricas de todos los circuitos del pool.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Lista de diccionarios con el proxy, la latencia media, la tasa de fallos y el número de hosts de cada circuito.
+    '''
+    def estadisticas(self):
+        with self.cerrojo:
+            return [{"proxy": c.url_proxy, "latencia_media": c.latencia_media, "tasa_fallos": c.tasa_fallos,
+                     "exitos": c.num_exitos, "fallos": c.num_fallos, "hosts": c.num_hosts} for c in self.circuitos]
+
+
+'''
+* FUNCIÓN: fallo_del_circuito
+* DESCRIPCIÓN: Comprueba si el error de una petición se debe al transporte (el endpoint SOCKS rechaza o corta la
+               conexión) y no al host de destino. Los errores de servicios ocultos caídos, que TOR comunica como
+               respuestas SOCKS o tiempos de espera agotados, no indican un problema del circuito.
+* ARGS_IN:
+    - excepcion: excepción lanzada por requests.
+* ARGS_OUT:
+    - True si el error es del endpoint SOCKS.
+'''
+def fallo_del_circuito(excepcion):
+    if isinstance(excepcion, requests.exceptions.ProxyError):
+        return True
+    # Cadena de causas: requests -> urllib3 (reason) -> PySocks -> error del socket
+    causa = excepcion
+    for _ in range(MAX_CAUSAS):
+        if causa is None:
+            break
+        # PySocks lanza ProxyConnectionError si no puede conectar con el endpoint SOCKS
+        if isinstance(causa, ConnectionRefusedError) or type(causa).__name__ == "ProxyConnectionError":
+            return True
+        razon = getattr(causa, "reason", None)
+        causa = razon if isinstance(razon, BaseException) else causa.__cause__ or causa.__context__
+    return False
@@ -0,0 +1,323 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, local
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from dateutil import parser
+from fuente_monederos import FuenteMonederos
+
+'''
+* DESCRIPCIÓN: Cliente de la API REST de Blockcypher para obtener los datos de monederos Bitcoin. Recorre el
+               historial completo de transacciones de cada dirección página a página con cursores de altura de
+               bloque, consulta varias direcciones en paralelo respetando un límite de peticiones por segundo y
+               permite precargar en segundo plano los monederos de un rastreo en una CacheMonederos.
+'''
+
+URL_API_BLOCKCYPHER = "https://api.blockcypher.com/v1/btc/main"
+# Máximo de transacciones por página que admite el endpoint addrs/full
+MAX_TXS_POR_PAGINA = 50
+# Cursor "before" superior a la altura de cualquier bloque, para pedir las transacciones confirmadas más recientes
+ALTURA_MAXIMA_BLOQUE = 2 ** 31 - 1
+
+
+'''
+* CLASE: LimitadorTasa
+* DESCRIPCIÓN: Clase que limita el número de peticiones por segundo mediante un cubo de fichas. Admite ráfagas de
+               hasta "rafaga" peticiones y puede utilizarse desde varios hilos. Las peticiones no prioritarias (las
+               precargas) solo obtienen ficha si no hay peticiones prioritarias esperando.
+'''
+class LimitadorTasa():
+    def __init__(self, peticiones_por_segundo, rafaga=1):
+        self.peticiones_por_segundo = peticiones_por_segundo
+        self.rafaga = rafaga
+        self.num_fichas = float(rafaga)
+        self.instante_actualizacion = time.monotonic()
+        self.num_esperas_prioritarias = 0
+        self.cerrojo = Lock()
+
+    '''
+    * FUNCIÓN: esperar
+    * DESCRIPCIÓN: Bloquea el hilo que la llama hasta que puede realizarse una nueva petición.
+    * ARGS_IN:
+        - prioritaria: si es False, la petición cede las fichas a las prioritarias en espera (Opcional).
+    * ARGS_OUT:
+        - N/A
+    '''
+    def esperar(self, prioritaria=True):
+        with self.cerrojo:
+            self.num_esperas_prioritarias += prioritaria
+        try:
+            while True:
+                with self.cerrojo:
+                    ahora = time.monotonic()
+                    self.num_fichas = min(self.rafaga, self.num_fichas + (ahora - self.instante_actualizacion) * self.peticiones_por_segundo)
+                    self.instante_actualizacion = ahora
+                    if self.num_fichas >= 1 and (prioritaria or not self.num_esperas_prioritarias):
+                        self.num_fichas -= 1
+                        return
+                    espera = (1 - self.num_fichas if self.num_fichas < 1 else 1) / self.peticiones_por_segundo
+                time.sleep(espera)
+        finally:
+            with self.cerrojo:
+                self.num_esperas_prioritarias -= prioritaria
+
+
+'''
+* CLASE: ClienteMonederos
+* DESCRIPCIÓN: Fuente de datos de monederos Bitcoin que consulta la API de Blockcypher (endpoint addrs/full). El
+               resultado tiene el mismo formato que blockcypher.get_address_full, pero con todas las transacciones
+               confirmadas del historial y no solo las de la primera página.
+'''
+class ClienteMonederos(FuenteMonederos):
+    def __init__(self, url_base=URL_API_BLOCKCYPHER, token=None, peticiones_por_segundo=3.0, max_hilos=8,
+                 txs_por_pagina=50, max_paginas=None, max_reintentos=5, timeout=30):
+        self.url_base = url_base.rstrip('/')
+        self.token = token
+        self.limitador = LimitadorTasa(peticiones_por_segundo)
+        self.max_hilos = max_hilos
+        self.txs_por_pagina = txs_por_pagina
+        # Número máximo de páginas por dirección. None, para recorrer el historial completo
+        self.max_paginas = max_paginas
+        self.max_reintentos = max_reintentos
+        self.timeout = timeout
+
+        # Datos propios de cada hilo: su sesión HTTP persistente y si pertenece a la precarga
+        self.datos_hilo = local()
+        self.ejecutor = None
+        # Dirección abierta por el usuario, cuyas peticiones son prioritarias aunque se realicen desde la precarga
+        self.direccion_prioritaria = None
+
+    '''
+    * FUNCIÓN: obtener_sesion
+    * DESCRIPCIÓN: Devuelve la sesión HTTP del hilo que la llama, creándola si no existe.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Objeto requests.Session.
+    '''
+    def obtener_sesion(self):
+        sesion = getattr(self.datos_hilo, "sesion", None)
+        if sesion is None:
+            sesion = requests.Session()
+            sesion.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            sesion.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            self.datos_hilo.sesion = sesion
+        return sesion
+
+    '''
+    * FUNCIÓN: obtener_pagina
+    * DESCRIPCIÓN: Solicita una página del historial de una dirección respetando el límite de peticiones. Las
+                   peticiones de la precarga ceden el turno a las demás, salvo las de la dirección prioritaria. Las
+                   respuestas 429 (límite de la API superado) y 5xx se reintentan con esperas crecientes.
+    * ARGS_IN:
+        - direccion: dirección del monedero.
+        - antes_de_bloque: altura de bloque a partir de la cual (excluida) se devuelven transacciones anteriores.
+          None, para la primera página.
+        - despues_de_bloque: altura de bloque hasta la cual (excluida) se devuelven transacciones posteriores
+          (Opcional).
+        - limite: número máximo de transacciones de la página (Opcional). Por defecto, txs_por_pagina.
+    * ARGS_OUT:
+        - Diccionario con la respuesta de la API.
+    '''
+    def obtener_pagina(self, direccion, antes_de_bloque=None, despues_de_bloque=None, limite=None):
+        parametros = {"limit": limite or self.txs_por_pagina}
+        if antes_de_bloque is not None:
+            parametros["before"] = antes_de_bloque
+        if despues_de_bloque is not None:
+            parametros["after"] = despues_de_bloque
+        if self.token:
+            parametros["token"] = self.token
+
+        espera = 1.0
+        for intento in range(self.max_reintentos + 1):
+            self.limitador.esperar(direccion == self.direccion_prioritaria or not getattr(self.datos_hilo, "precarga", False))
+            respuesta = self.obtener_sesion().get(f"{self.url_base}/addrs/{direccion}/full", params=parametros,
+                                                  timeout=self.timeout)
+            if (respuesta.status_code == 429 or respuesta.status_code >= 500) and intento < self.max_reintentos:
+                retry_after = respuesta.headers.get("Retry-After", "")
+                time.sleep(float(retry_after) if retry_after.isdigit() else espera)
+                espera *= 2
+                continue
+            respuesta.raise_for_status()
+            return respuesta.json()
+
+    '''
+    * FUNCIÓN: obtener_monedero
+    * DESCRIPCIÓN: Obtiene los datos de una dirección y su historial completo de transacciones. Cada página se
+                   solicita con el cursor "before" igual a la altura del bloque más antiguo de la página anterior más
+                   uno, de modo que las transacciones de un bloque repartido entre dos páginas no se pierden; las
+                   repetidas se descartan por su hash. Si una página solo contiene un bloque, este se solicita por
+                   separado (cursores "after" y "before") con el máximo de transacciones de la API antes de avanzar al
+                   bloque anterior. Si aun así no cabe en una página, el historial se marca como incompleto. Si la
+                   primera página solo contiene transacciones sin confirmar, las confirmadas se piden a partir del
+                   bloque más reciente.
+    * ARGS_IN:
+        - direccion: dirección del monedero.
+    * ARGS_OUT:
+        - Diccionario con el formato de blockcypher.get_address_full y todas las transacciones en "txs". "hasMore"
+          es True si el historial está incompleto.
+    '''
+    def obtener_monedero(self, direccion):
+        datos = self.obtener_pagina(direccion)
+        lista_txs = []
+        set_hashes = set()
+        respuesta = datos
+        num_paginas = 1
+        antes_de_bloque = None
+        historial_incompleto = False
+        while True:
+            num_txs_nuevas = incorporar_txs(respuesta, lista_txs, set_hashes)
+
+            if not respuesta.get("hasMore") or (self.max_paginas and num_paginas >= self.max_paginas):
+                break
+            alturas = [tx["block_height"] for tx in respuesta.get("txs", []) if tx.get("block_height", -1) >= 0]
+            if not alturas:
+                # Página con solo transacciones sin confirmar, que la API devuelve al principio del historial: se
+                # continúa por las confirmadas más recientes. Con cursor, la API no devuelve transacciones sin
+                # confirmar, por lo que una página así no debería repetirse
+                if antes_de_bloque is not None:
+                    historial_incompleto = True
+                    break
+                antes_de_bloque = ALTURA_MAXIMA_BLOQUE
+                respuesta = self.obtener_pagina(direccion, antes_de_bloque)
+                num_paginas += 1
+                continue
+            altura_minima = min(alturas)
+            if max(alturas) == altura_minima:
+                # Página con un único bloque, que puede tener más transacciones de las que caben en la página: se
+                # solicita el bloque completo y se avanza al bloque anterior
+                respuesta_bloque = self.obtener_pagina(direccion, altura_minima + 1, altura_minima - 1, MAX_TXS_POR_PAGINA)
+                num_paginas += 1
+                incorporar_txs(respuesta_bloque, lista_txs, set_hashes)
+                historial_incompleto = historial_incompleto or bool(respuesta_bloque.get("hasMore"))
+                siguiente_cursor = altura_minima
+            else:
+                # Si la página solo contiene bloques ya recorridos, se avanza al bloque anterior
+                siguiente_cursor = altura_minima + 1 if num_txs_nuevas else altura_minima
+            if antes_de_bloque is not None and siguiente_cursor >= antes_de_bloque:
+                siguiente_cursor = antes_de_bloque - 1
+            if siguiente_cursor <= 0:
+                break
+            antes_de_bloque = siguiente_cursor
+            respuesta = self.obtener_pagina(direccion, antes_de_bloque)
+            num_paginas += 1
+
+        datos["txs"] = lista_txs
+        # hasMore solo queda activo si el recorrido se ha detenido por el máximo de páginas, si algún bloque tiene
+        # más transacciones de las que admite una página o si no ha podido continuarse tras las no confirmadas
+        datos["hasMore"] = bool(respuesta.get("hasMore")) or historial_incompleto
+        return datos
+
+    '''
+    * FUNCIÓN: obtener_monederos
+    * DESCRIPCIÓN: Obtiene en paralelo los datos de varias direcciones, respetando el límite de peticiones global.
+    * ARGS_IN:
+        - direcciones: iterable de direcciones de monederos.
+    * ARGS_OUT:
+        - Diccionario con los datos obtenidos. Clave: dirección. Valor: datos del monedero.
+        - Diccionario con los errores. Clave: dirección. Valor: excepción.
+    '''
+    def obtener_monederos(self, direcciones):
+        diccionario_datos = {}
+        diccionario_errores = {}
+        with ThreadPoolExecutor(max_workers=self.max_hilos) as ejecutor:
+            diccionario_tareas = {direccion: ejecutor.submit(self.obtener_monedero, direccion) for direccion in dict.fromkeys(direcciones)}
+            for direccion, tarea in diccionario_tareas.items():
+                try:
+                    diccionario_datos[direccion] = tarea.result()
+                except Exception as e:
+                    diccionario_errores[direccion] = e
+        return diccionario_datos, diccionario_errores
+
+    '''
+    * FUNCIÓN: precargar
+    * DESCRIPCIÓN: Descarga en segundo plano los datos de varias direcciones y los guarda en una caché de monederos.
+                   Las direcciones vigentes en la caché no se vuelven a descargar. No bloquea al hilo que la llama.
+                   Sus peticiones no son prioritarias: las consultas del usuario se atienden antes.
+    * ARGS_IN:
+        - direcciones: iterable de direcciones de monederos.
+        - cache: objeto CacheMonederos en el que guardar los datos.
+        - funcion_descarga: función que recibe la dirección y devuelve lo que se guarda en la caché (Opcional). Por
+          defecto, obtener_monedero.
+    * ARGS_OUT:
+        - Lista de tareas (concurrent.futures.Future), una por dirección.
+    '''
+    def precargar(self, direcciones, cache, funcion_descarga=None):
+        if self.ejecutor is None:
+            self.ejecutor = ThreadPoolExecutor(max_workers=self.max_hilos, initializer=self.marcar_hilo_precarga)
+        funcion_descarga = funcion_descarga or self.obtener_monedero
+        return [self.ejecutor.submit(cache.obtener, direccion, funcion_descarga) for direccion in dict.fromkeys(direcciones)]
+
+    '''
+    * FUNCIÓN: marcar_hilo_precarga
+    * DESCRIPCIÓN: Marca el hilo que la llama como hilo de la precarga, cuyas peticiones no son prioritarias.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def marcar_hilo_precarga(self):
+        self.datos_hilo.precarga = True
+
+    '''
+    * FUNCIÓN: priorizar
+    * DESCRIPCIÓN: Da prioridad a las peticiones de la dirección que ha abierto el usuario, también si su descarga
+                   la está realizando la precarga.
+    * ARGS_IN:
+        - direccion: dirección del monedero.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def priorizar(self, direccion):
+        self.direccion_prioritaria = direccion
+
+    '''
+    * FUNCIÓN: cancelar_precarga
+    * DESCRIPCIÓN: Cancela las precargas pendientes.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cancelar_precarga(self):
+        if self.ejecutor:
+            self.ejecutor.shutdown(wait=False, cancel_futures=True)
+            self.ejecutor = None
+
+    '''
+    * FUNCIÓN: cerrar
+    * DESCRIPCIÓN: Cancela las precargas pendientes y cierra las sesiones HTTP del hilo que la llama.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar(self):
+        self.cancelar_precarga()
+        sesion = getattr(self.datos_hilo, "sesion", None)
+        if sesion is not None:
+            sesion.close()
+
+
+'''
+* FUNCIÓN: incorporar_txs
+* DESCRIPCIÓN: Añade al historial las transacciones de una página que aún no contiene y convierte sus fechas.
+* ARGS_IN:
+    - respuesta: diccionario con la respuesta de la API.
+    - lista_txs: lista de transacciones del historial.
+    - set_hashes: hashes de las transacciones del historial.
+* ARGS_OUT:
+    - Número de transacciones añadidas.
+'''
+def incorporar_txs(respuesta, lista_txs, set_hashes):
+    num_txs_nuevas = 0
+    for tx in respuesta.get("txs", []):
+        if tx["hash"] in set_hashes:
+            continue
+        set_hashes.add(tx["hash"])
+        num_txs_nuevas += 1
+        for campo in ("confirmed", "received"):
+            if isinstance(tx.get(campo), str):
+                tx[campo] = parser.parse(tx[campo])
+        lista_txs.append(tx)
+    return num_txs_nuevas
@@ -0,0 +1,616 @@
+from threading import Thread
+import queue
+import requests
+from urllib.parse import urlsplit
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from frontera import FronteraURLs, FronteraPrioridad, puntuacion_enlace, puntuacion_servicio
+from sesiones import PoolSesiones
+from circuitos import PoolCircuitos, fallo_del_circuito
+from planificador import PlanificadorHosts
+from almacen_rastreo import AlmacenRastreo
+from archivo_paginas import ArchivoPaginas
+from extractor_direcciones import encontrar_direcciones_bitcoin
+from analisis_paginas import analizar_pagina
+from huellas_contenido import IndiceHuellas
+from vitalidad_hosts import CacheVitalidadHosts, fallo_del_host
+from normalizacion_urls import normalizar_url_inicial, servicio_url
+
+
+'''
+* CLASE: HiloCrawler
+* DESCRIPCIÓN: Clase que implementa el hilo de ejecución del proceso de rastreo de monederos Bitcoin en la red TOR.
+               No depende de la interfaz gráfica: se comunica con quien la utiliza mediante tuplas (comando, datos)
+               en cola_comunicacion ("estado", "monedero_encontrado", "monederos_pagina", "estadisticas",
+               "terminado", "cancelado", "error" y "error_conexion") y se detiene al activarse evento_parada.
+'''
+class HiloCrawler(Thread):
+    def __init__(self, urls, num_min_monederos, cola_comunicacion, evento_parada, num_peticiones_concurrentes=1,
+                 tamano_maximo_pagina=5*1024*1024, endpoints_socks=("localhost:9050",), circuitos_por_endpoint=1,
+                 ruta_almacen=None, num_procesos_analisis=0, max_paginas_en_analisis=None, max_paginas_servicio=None,
+                 profundidad_maxima=None, ruta_archivo=None, priorizar_enlaces=True,
+                 ruta_cache_hosts=None):
+        super().__init__(daemon=True)
+        # Parámetros del crawler
+        self.num_min_monederos = num_min_monederos
+        self.num_peticiones_concurrentes = num_peticiones_concurrentes
+        # Número de procesos que analizan las páginas descargadas. Con 0, se analizan en el hilo de rastreo
+        self.num_procesos_analisis = num_procesos_analisis
+        # Número máximo de páginas pendientes de análisis. Mientras se supere, no se lanzan nuevas descargas
+        self.max_paginas_en_analisis = max_paginas_en_analisis or 2 * max(1, num_procesos_analisis)
+        # Tamaño máximo en bytes del cuerpo de una página. Las respuestas mayores se abandonan
+        self.tamano_maximo_pagina = tamano_maximo_pagina
+        self.set_direcciones_bitcoin_encontradas = set()
+        self.diccionario_url_direcciones_bitcoin = {}
+
+        # Índice de huellas del contenido de las páginas visitadas. No se expanden los enlaces de las páginas casi
+        # duplicadas de otra ya visitada (réplicas de un servicio oculto o trampas de rastreo)
+        self.indice_huellas = IndiceHuellas()
+        self.num_paginas_duplicadas = 0
+        # Enlaces de páginas duplicadas que no se han añadido a la frontera: descargas y análisis evitados
+        self.num_descargas_evitadas = 0
+
+        # Límites del rastreo: número máximo de páginas encoladas de cada servicio oculto, para que un único servicio
+        # muy grande no consuma todo el rastreo, y número máximo de enlaces seguidos desde las URLs iniciales. Con
+        # None, no se limitan
+        self.max_paginas_servicio = max_paginas_servicio
+        self.profundidad_maxima = profundidad_maxima
+        # Páginas encoladas de cada servicio. Clave: dirección .onion del servicio. Valor: número de páginas
+        self.diccionario_servicio_num_paginas = {}
+        # Profundidad de las URLs pendientes de visitar. Clave: URL. Valor: número de enlaces desde las URLs iniciales
+        self.diccionario_url_profundidad = {}
+        self.num_enlaces_fuera_de_limites = 0
+
+        # Rendimiento de cada servicio visitado. Clave: dirección .onion del servicio. Valor: lista
+        # [páginas visitadas, monederos nuevos encontrados]. Con priorizar_enlaces, se visitan primero los enlaces de
+        # los servicios y páginas con más monederos; si no, las URLs se visitan en orden de descubrimiento
+        self.diccionario_servicio_rendimiento = {}
+
+        # Las URLs iniciales se normalizan como los enlaces y se descartan las que no son de servicios ocultos válidos
+        urls = [url_normalizada for url_normalizada in map(normalizar_url_inicial, urls) if url_normalizada]
+
+        # Archivo en disco de las páginas descargadas, para volver a analizarlas sin conectarse a la red TOR. Si ya
+        # existe, se añaden las nuevas páginas al final
+        self.archivo_paginas = ArchivoPaginas(ruta_archivo) if ruta_archivo else None
+
+        # Almacén en disco del estado del rastreo. Si contiene un rastreo anterior, este se reanuda
+        self.almacen = AlmacenRastreo(ruta_almacen) if ruta_almacen else None
+        self.frontera = FronteraPrioridad() if priorizar_enlaces else FronteraURLs()
+        if self.almacen:
+            self.restaurar_estado(urls)
+        else:
+            for url in urls:
+                self.encolar(url, 0)
+        # Canales de comunicación con la rutina principal
+        self.cola_comunicacion = cola_comunicacion
+        self.evento_parada = evento_parada
+        
+        # Circuitos de TOR (endpoints SOCKS o flujos aislados) entre los que se reparte el tráfico por host
+        self.pool_circuitos = PoolCircuitos(endpoints_socks, circuitos_por_endpoint)
+        
+        self.USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; rv:109.0) Gecko/20100101 Firefox/115.0"
+
+        # Latencia y disponibilidad de cada host: determinan el tiempo de espera de sus peticiones y descartan las
+        # URLs de los hosts caídos. Si se indica un fichero, se conservan entre rastreos
+        self.vitalidad_hosts = CacheVitalidadHosts(ruta_cache_hosts)
+        # URLs descartadas sin descargarse por pertenecer a hosts caídos. Siguen pendientes en el almacén del rastreo
+        self.num_urls_hosts_caidos = 0
+
+        # Planificador de cortesía que limita el ritmo de peticiones de cada host por separado
+        self.planificador = PlanificadorHosts(vitalidad_hosts=self.vitalidad_hosts)
+
+        # Sesiones HTTP persistentes por host para reutilizar las conexiones a través de TOR
+        self.pool_sesiones = PoolSesiones(self.USER_AGENT)
+
+        # Tamaño de los fragmentos leídos de las respuestas y firmas iniciales de un documento HTML
+        self.TAMANO_FRAGMENTO = 16384
+        self.FIRMAS_HTML = (b'<!doctype html', b'<html', b'<head', b'<body', b'<title', b'<meta', b'<!--', b'<a ', b'<div', b'<p>')
+        
+    '''
+    * FUNCIÓN: run
+    * DESCRIPCIÓN: Rutina ejecutada por el hilo que implementa el rastreo en la red TOR. Si se ha configurado más de
+                   una petición simultánea o el análisis en procesos independientes, el rastreo se realiza en modo
+                   asíncrono.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def run(self):
+        try:
+            # Verificación de la conexión a la red TOR
+            self.verificar_conexion_tor()
+
+            if self.num_peticiones_concurrentes > 1 or self.num_procesos_analisis > 0:
+                completado = asyncio.run(self.rastrear_asincrono())
+            else:
+                completado = self.rastrear()
+
+            self.notificar_estadisticas()
+
+            if not completado:
+                # Se comunica a la rutina principal que se ha cancelado la ejecución
+                self.cola_comunicacion.put(("cancelado", "Cerrando hilo de rastreo"))
+                return
+
+            # Envío de resultados a la rutina principal de la aplicación
+            self.cola_comunicacion.put(("terminado", self.diccionario_url_direcciones_bitcoin))
+
+        except ConnectionError as e:
+            self.cola_comunicacion.put(("error_conexion", str(e)))
+        
+        # Error genérico
+        except Exception as e:
+            self.cola_comunicacion.put(("error", str(e)))
+
+        finally:
+            self.pool_sesiones.cerrar()
+            if self.almacen:
+                self.almacen.cerrar()
+            if self.archivo_paginas:
+                self.archivo_paginas.cerrar()
+            self.vitalidad_hosts.cerrar()
+
+    '''
+    * FUNCIÓN: restaurar_estado
+    * DESCRIPCIÓN: Reconstruye la frontera y los resultados a partir del almacén del rastreo. Las URLs ya visitadas
+                   no se vuelven a encolar y las URLs iniciales nuevas se añaden al final de la frontera guardada. El
+                   rendimiento de cada servicio se reconstruye a partir de sus páginas visitadas y sus monederos.
+    * ARGS_IN:
+        - urls: URLs iniciales del rastreo.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def restaurar_estado(self, urls):
+        lista_urls_pendientes, lista_urls_visitadas, self.diccionario_url_direcciones_bitcoin = self.almacen.cargar()
+
+        for url in lista_urls_visitadas:
+            self.frontera.marcar_visitada(url)
+            self.contar_pagina_servicio(url)
+            self.actualizar_rendimiento_servicio(url, 0)
+        for url, profundidad in lista_urls_pendientes:
+            if self.frontera.agregar(url, puntuacion_enlace(url, 0, profundidad)):
+                self.diccionario_url_profundidad[url] = profundidad
+                self.contar_pagina_servicio(url)
+        for url in urls:
+            self.encolar(url, 0)
+
+        # Los monederos nuevos de las páginas visitadas se suman al rendimiento de sus servicios
+        for url, lista_direcciones in self.diccionario_url_direcciones_bitcoin.items():
+            set_direcciones_nuevas = set(lista_direcciones) - self.set_direcciones_bitcoin_encontradas
+            self.set_direcciones_bitcoin_encontradas.update(set_direcciones_nuevas)
+            rendimiento = self.diccionario_servicio_rendimiento.setdefault(servicio_url(url), [1, 0])
+            rendimiento[1] += len(set_direcciones_nuevas)
+            self.frontera.actualizar_servicio(servicio_url(url), puntuacion_servicio(*rendimiento))
+
+    '''
+    * FUNCIÓN: rastreo_pendiente
+    * DESCRIPCIÓN: Comprueba si quedan URLs por visitar y no se ha alcanzado el número mínimo de monederos.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - True si el rastreo debe continuar.
+    '''
+    def rastreo_pendiente(self):
+        return (len(self.frontera) > 0 or self.planificador.num_aparcadas > 0) and len(self.set_direcciones_bitcoin_encontradas) < self.num_min_monederos
+
+    '''
+    * FUNCIÓN: rastrear
+    * DESCRIPCIÓN: Bucle principal de rastreo secuencial: visita las URLs de una en una.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - True si el rastreo ha finalizado. False, si ha sido cancelado.
+    '''
+    def rastrear(self):
+        while self.rastreo_pendiente():
+            #  Comprobar si se ha solicitado detener el hilo
+            if self.evento_parada.is_set():
+                return False
+
+            url_actual, espera = self.planificador.siguiente(self.frontera)
+            self.descartar_urls_hosts_caidos()
+            if url_actual is None:
+                # Ningún host está listo: se espera al primero que lo esté, atendiendo a la parada
+                self.evento_parada.wait(min(espera if espera is not None else 0.2, 1.0))
+                continue
+            # Se comunica a la rutina principal la URL que se está procesando
+            self.notificar_estado(f"Procesando: {url_actual}")
+
+            # Se obtiene el HTML de la página visitada y se procesa
+            html = self.obtener_html(url_actual)
+            self.archivar_pagina(url_actual, html)
+            self.procesar_pagina(url_actual, html)
+        return True
+
+    '''
+    * FUNCIÓN: rastrear_asincrono
+    * DESCRIPCIÓN: Bucle principal de rastreo asíncrono: mantiene hasta num_peticiones_concurrentes descargas en curso
+                   a través del proxy de TOR y procesa cada página en cuanto se completa su descarga.
+                   Las descargas se delegan en un conjunto de hilos, mientras que el estado del rastreo solo se
+                   modifica desde el bucle de eventos. Si se han configurado procesos de análisis, el contenido en
+                   bruto de cada página se envía a un conjunto de procesos y no se lanzan nuevas descargas mientras
+                   haya max_paginas_en_analisis páginas pendientes de analizar.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - True si el rastreo ha finalizado. False, si ha sido cancelado.
+    '''
+    async def rastrear_asincrono(self):
+        bucle = asyncio.get_running_loop()
+        ejecutor = ThreadPoolExecutor(max_workers=self.num_peticiones_concurrentes)
+        # Los procesos de análisis se crean con spawn para no duplicar el estado de la interfaz gráfica ni de los hilos
+        ejecutor_analisis = None
+        if self.num_procesos_analisis > 0:
+            ejecutor_analisis = ProcessPoolExecutor(max_workers=self.num_procesos_analisis,
+                                                    mp_context=multiprocessing.get_context("spawn"))
+        # Descargas en curso. Clave: tarea. Valor: URL descargada
+        diccionario_tareas_url = {}
+        # Análisis en curso. Clave: tarea. Valor: URL analizada
+        diccionario_analisis_url = {}
+        try:
+            while True:
+                #  Comprobar si se ha solicitado detener el hilo
+                if self.evento_parada.is_set():
+                    return False
+
+                # Se lanzan nuevas descargas de hosts listos hasta completar el número de peticiones simultáneas
+                espera = None
+                while (len(diccionario_tareas_url) < self.num_peticiones_concurrentes
+                       and len(diccionario_analisis_url) < self.max_paginas_en_analisis and self.rastreo_pendiente()):
+                    url_actual, espera = self.planificador.siguiente(self.frontera)
+                    self.descartar_urls_hosts_caidos()
+                    if url_actual is None:
+                        break
+                    self.notificar_estado(f"Procesando: {url_actual}")
+                    tarea = bucle.run_in_executor(ejecutor, self.obtener_html, url_actual)
+                    diccionario_tareas_url[tarea] = url_actual
+
+                # Espera acotada para poder atender la parada y a los hosts que pasen a estar listos
+                tiempo_espera = 0.2 if espera is None else min(espera, 0.2)
+                if not diccionario_tareas_url and not diccionario_analisis_url:
+                    if not self.rastreo_pendiente():
+                        return True
+                    # Ningún host está listo y no hay descargas ni análisis en curso
+                    await asyncio.sleep(tiempo_espera)
+                    continue
+
+                tareas_finalizadas, _ = await asyncio.wait(diccionario_tareas_url.keys() | diccionario_analisis_url.keys(),
+                                                           timeout=tiempo_espera, return_when=asyncio.FIRST_COMPLETED)
+                for tarea in tareas_finalizadas:
+                    if tarea in diccionario_analisis_url:
+                        self.registrar_pagina(diccionario_analisis_url.pop(tarea), *tarea.result())
+                        continue
+                    url_actual = diccionario_tareas_url.pop(tarea)
+                    contenido = tarea.result()
+                    self.archivar_pagina(url_actual, contenido)
+                    if contenido and ejecutor_analisis:
+                        tarea_analisis = bucle.run_in_executor(ejecutor_analisis, analizar_pagina, contenido, url_actual)
+                        diccionario_analisis_url[tarea_analisis] = url_actual
+                    else:
+                        self.procesar_pagina(url_actual, contenido)
+
+                # Al alcanzar el número mínimo de monederos no se espera a las descargas pendientes
+                if len(self.set_direcciones_bitcoin_encontradas) >= self.num_min_monederos:
+                    return True
+        finally:
+            for tarea in diccionario_tareas_url.keys() | diccionario_analisis_url.keys():
+                tarea.cancel()
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+            if ejecutor_analisis:
+                ejecutor_analisis.shutdown(wait=False, cancel_futures=True)
+
+    '''
+    * FUNCIÓN: archivar_pagina
+    * DESCRIPCIÓN: Añade una página descargada al archivo de páginas, si se ha configurado.
+    * ARGS_IN:
+        - url_actual: dirección de la página visitada.
+        - html: HTML de la página, en bytes. None, si no se pudo obtener.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def archivar_pagina(self, url_actual, html):
+        if self.archivo_paginas and html:
+            self.archivo_paginas.escribir(url_actual, html)
+
+    '''
+    * FUNCIÓN: procesar_pagina
+    * DESCRIPCIÓN: Procesa el HTML de una página visitada: registra los monederos encontrados en ella, informa
+                   a la rutina principal y añade sus enlaces a la frontera.
+    * ARGS_IN:
+        - url_actual: dirección de la página visitada.
+        - html: HTML de la página. None, si no se pudo obtener.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def procesar_pagina(self, url_actual, html):
+        if not html:
+            self.diccionario_url_profundidad.pop(url_actual, None)
+            self.actualizar_rendimiento_servicio(url_actual, 0)
+            if self.almacen:
+                self.almacen.registrar_visita(url_actual)
+            return
+        # Se procesa el HTML para buscar monederos en el código y nuevos enlaces para visitar
+        self.registrar_pagina(url_actual, *self.procesar_y_extraer_enlaces(html, url_actual))
+
+    '''
+    * FUNCIÓN: registrar_pagina
+    * DESCRIPCIÓN: Registra el resultado del análisis de una página visitada: guarda los monederos encontrados en
+                   ella, informa a la rutina principal y añade sus enlaces a la frontera.
+    * ARGS_IN:
+        - url_actual: dirección de la página visitada.
+        - set_direcciones_bitcoin_pagina_actual: set con las direcciones de monederos Bitcoin de la página.
+        - set_nuevos_enlaces: set con los enlaces a otras páginas encontrados en la página.
+        - huella: huella del texto de la página (Opcional). Si la página es casi duplicada de otra ya visitada, sus
+          monederos se registran, pero sus enlaces no se añaden a la frontera.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def registrar_pagina(self, url_actual, set_direcciones_bitcoin_pagina_actual, set_nuevos_enlaces, huella=None):
+        profundidad = self.diccionario_url_profundidad.pop(url_actual, 0)
+        self.actualizar_rendimiento_servicio(url_actual, len(set_direcciones_bitcoin_pagina_actual - self.set_direcciones_bitcoin_encontradas))
+        if self.almacen:
+            self.almacen.registrar_visita(url_actual, list(set_direcciones_bitcoin_pagina_actual))
+        
+        if set_direcciones_bitcoin_pagina_actual:                     
+            # Se añaden el total de direcciones Bitcoin encontradas en la página al diccionario de resultados
+            self.diccionario_url_direcciones_bitcoin[url_actual] = list(set_direcciones_bitcoin_pagina_actual)
+            # Se comunican los monederos de la página para que los resultados puedan consumirse a medida que se encuentran
+            self.cola_comunicacion.put(("monederos_pagina", (url_actual, list(set_direcciones_bitcoin_pagina_actual))))
+            
+            # Si al menos una de los monederos no había sido rastreado previamente, se actualiza el
+            # el conjunto total de monederos encontrados en el rastreo y 
+            # la barra de progreso de la ventana de progreso de la rutina principal
+            if len(set_direcciones_bitcoin_pagina_actual-self.set_direcciones_bitcoin_encontradas) > 0:
+                self.set_direcciones_bitcoin_encontradas.update(set_direcciones_bitcoin_pagina_actual)
+                self.cola_comunicacion.put(("monedero_encontrado", len(self.set_direcciones_bitcoin_encontradas)))
+        
+        if huella is not None:
+            url_original = self.indice_huellas.buscar(huella)
+            if url_original is not None:
+                # Los enlaces nuevos de la página duplicada son las descargas que se evitan
+                self.num_paginas_duplicadas += 1
+                self.num_descargas_evitadas += sum(1 for enlace in set_nuevos_enlaces if enlace not in self.frontera)
+                self.notificar_estado(f"Página duplicada de {url_original}: {url_actual}")
+                return
+            self.indice_huellas.agregar(huella, url_actual)
+
+        # Añadir los enlaces encontrados a la frontera si no han sido vistos previamente
+        for enlace in set_nuevos_enlaces:
+            self.encolar(enlace, profundidad + 1, len(set_direcciones_bitcoin_pagina_actual))
+
+    '''
+    * FUNCIÓN: encolar
+    * DESCRIPCIÓN: Añade una URL normalizada a la frontera si no ha sido vista previamente y no supera la profundidad
+                   máxima ni el número máximo de páginas de su servicio.
+    * ARGS_IN:
+        - url: URL normalizada de la página.
+        - profundidad: número de enlaces seguidos desde las URLs iniciales hasta la página.
+        - num_monederos_origen: número de monederos de la página que contiene el enlace (Opcional).
+    * ARGS_OUT:
+        - True si la URL ha sido encolada.
+    '''
+    def encolar(self, url, profundidad, num_monederos_origen=0):
+        if url in self.frontera:
+            return False
+        if self.profundidad_maxima is not None and profundidad > self.profundidad_maxima:
+            self.num_enlaces_fuera_de_limites += 1
+            return False
+        if self.max_paginas_servicio is not None and self.diccionario_servicio_num_paginas.get(servicio_url(url), 0) >= self.max_paginas_servicio:
+            self.num_enlaces_fuera_de_limites += 1
+            return False
+
+        self.frontera.agregar(url, puntuacion_enlace(url, num_monederos_origen, profundidad))
+        self.diccionario_url_profundidad[url] = profundidad
+        self.contar_pagina_servicio(url)
+        if self.almacen:
+            self.almacen.registrar_url(url, profundidad)
+        return True
+
+    '''
+    * FUNCIÓN: descartar_urls_hosts_caidos
+    * DESCRIPCIÓN: Recoge las URLs que el planificador ha descartado por pertenecer a hosts caídos. No se registran
+                   como visitadas en el almacén, de modo que al reanudar el rastreo se vuelven a intentar si su host
+                   ha dejado de considerarse caído.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def descartar_urls_hosts_caidos(self):
+        for url in self.planificador.extraer_descartadas():
+            self.diccionario_url_profundidad.pop(url, None)
+            self.num_urls_hosts_caidos += 1
+
+    '''
+    * FUNCIÓN: contar_pagina_servicio
+    * DESCRIPCIÓN: Suma una página encolada al servicio oculto al que pertenece.
+    * ARGS_IN:
+        - url: URL de la página.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def contar_pagina_servicio(self, url):
+        servicio = servicio_url(url)
+        self.diccionario_servicio_num_paginas[servicio] = self.diccionario_servicio_num_paginas.get(servicio, 0) + 1
+
+    '''
+    * FUNCIÓN: actualizar_rendimiento_servicio
+    * DESCRIPCIÓN: Suma una página visitada y sus monederos nuevos al rendimiento de su servicio oculto y actualiza
+                   la prioridad del servicio en la frontera.
+    * ARGS_IN:
+        - url: URL de la página visitada.
+        - num_monederos_nuevos: número de monederos de la página no encontrados previamente en el rastreo.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def actualizar_rendimiento_servicio(self, url, num_monederos_nuevos):
+        servicio = servicio_url(url)
+        rendimiento = self.diccionario_servicio_rendimiento.setdefault(servicio, [0, 0])
+        rendimiento[0] += 1
+        rendimiento[1] += num_monederos_nuevos
+        self.frontera.actualizar_servicio(servicio, puntuacion_servicio(*rendimiento))
+
+    '''
+    * FUNCIÓN: notificar_estadisticas
+    * DESCRIPCIÓN: Comunica a la rutina principal las estadísticas de páginas duplicadas, enlaces descartados por
+                   los límites del rastreo, URLs descartadas por pertenecer a hosts caídos y reutilización de las
+                   sesiones HTTP, antes del mensaje final.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def notificar_estadisticas(self):
+        self.descartar_urls_hosts_caidos()
+        estadisticas_sesiones = self.pool_sesiones.estadisticas()
+        self.cola_comunicacion.put(("estadisticas", {"paginas_indexadas": len(self.indice_huellas),
+                                                     "paginas_duplicadas": self.num_paginas_duplicadas,
+                                                     "descargas_evitadas": self.num_descargas_evitadas,
+                                                     "enlaces_fuera_de_limites": self.num_enlaces_fuera_de_limites,
+                                                     "hosts_caidos": self.vitalidad_hosts.estadisticas()["hosts_caidos"],
+                                                     "urls_hosts_caidos": self.num_urls_hosts_caidos,
+                                                     "sesiones_reutilizadas": estadisticas_sesiones["aciertos"],
+                                                     "sesiones_creadas": estadisticas_sesiones["fallos"],
+                                                     "sesiones_expulsadas": estadisticas_sesiones["expulsiones"]}))
+
+    '''
+    * FUNCIÓN: notificar_estado
+    * DESCRIPCIÓN: Comunica a la rutina principal el estado del rastreo. Los mensajes de estado solo tienen valor
+                   informativo, por lo que se descartan si la cola de comunicación está llena en lugar de bloquear
+                   el rastreo. El resto de mensajes se envían con put y bloquean mientras la cola esté llena.
+    * ARGS_IN:
+        - texto: texto del estado.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def notificar_estado(self, texto):
+        try:
+            self.cola_comunicacion.put_nowait(("estado", texto))
+        except queue.Full:
+            pass
+
+    '''
+    * FUNCIÓN: verificar_conexion_tor
+    * DESCRIPCIÓN: Comprueba que el tráfico es cursado a través de la red TOR utilizando la API de comprobación
+                   de TOR Project, que devuelve True si la petición es recibida desde un nodo de salida de dicha red.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''   
+    def verificar_conexion_tor(self):
+        try:      
+            url_verificacion = "https://check.torproject.org/api/ip"
+            circuito = self.pool_circuitos.asignar(urlsplit(url_verificacion).netloc)
+            respuesta_ip = self.pool_sesiones.obtener_sesion(url_verificacion, circuito.proxies).get(url_verificacion, timeout=20)
+            if not respuesta_ip.json().get("IsTor"):
+                raise ConnectionError("La IP utilizada no pertenece a TOR.")
+        except requests.exceptions.RequestException as e:
+            raise ConnectionError(f"No se pudo conectar con la API de verificación de TOR ({e})")
+    
+    '''
+    * FUNCIÓN: obtener_html
+    * DESCRIPCIÓN: Obtiene el código HTML de una dirección URL con una única petición GET en modo streaming.
+                   A partir de las cabeceras de la respuesta (y de los primeros bytes del cuerpo si el Content-Type
+                   no está presente) se decide si continuar con la descarga. Las respuestas que no son HTML se
+                   abandonan sin descargar su cuerpo y las que superan el tamaño máximo se interrumpen. El tiempo
+                   de espera depende de la latencia del host y los fallos de conexión se registran en la caché de
+                   vitalidad, que descarta las URLs del host si pasa a considerarse caído.
+    * ARGS_IN:
+        - url: dirección de la página.
+    * ARGS_OUT:
+        - HTML de la página, en bytes sin decodificar. None, si el Content-Type no es text/html, si se supera el tamaño máximo de página
+          o si se produce algún tipo de error en la conexión.
+    ''' 
+    def obtener_html(self, url):
+        host = urlsplit(url).netloc.lower()
+        circuito = self.pool_circuitos.asignar(host)
+        inicio_peticion = time.monotonic()
+        # Resultado de la petición para el planificador: los errores y respuestas 429/5xx ralentizan el host
+        respuesta_host_correcta = False
+        try:
+            sesion = self.pool_sesiones.obtener_sesion(url, circuito.proxies)
+            try:
+                # El tiempo de espera se adapta a la latencia del host para no agotar el máximo con los hosts caídos
+                response = sesion.get(url, timeout=self.vitalidad_hosts.timeout(host), stream=True)
+            except requests.exceptions.RequestException as e:
+                # Los servicios ocultos caídos no penalizan al circuito: solo los errores del endpoint SOCKS
+                if fallo_del_circuito(e):
+                    self.pool_circuitos.registrar_resultado(circuito, None, False)
+                if fallo_del_host(e) and self.vitalidad_hosts.registrar_fallo(host):
+                    self.notificar_estado(f"Host caído: {host}")
+                raise
+            latencia = time.monotonic() - inicio_peticion
+            self.pool_circuitos.registrar_resultado(circuito, latencia, True)
+            self.vitalidad_hosts.registrar_exito(host, latencia)
+
+            with response:
+                respuesta_host_correcta = response.status_code < 500 and response.status_code != 429
+                response.raise_for_status()
+
+                content_type = response.headers.get('Content-Type', '').lower()
+                # Si la cabecera indica un contenido distinto de HTML, se cierra la conexión sin leer el cuerpo
+                if content_type and 'text/html' not in content_type:
+                    return None
+
+                # Si el servidor anuncia un tamaño superior al máximo, se descarta la página sin descargarla
+                content_length = response.headers.get('Content-Length', '')
+                if content_length.isdigit() and int(content_length) > self.tamano_maximo_pagina:
+                    return None
+
+                contenido = bytearray()
+                for fragmento in response.iter_content(chunk_size=self.TAMANO_FRAGMENTO):
+                    # Sin Content-Type, se comprueba en el primer fragmento si el contenido parece HTML
+                    if not content_type and not contenido and not self.parece_html(fragmento):
+                        return None
+                    contenido.extend(fragmento)
+                    if len(contenido) > self.tamano_maximo_pagina:
+                        return None
+
+            return bytes(contenido)
+    
+        except requests.exceptions.RequestException as e:
+            return None
+
+        finally:
+            self.planificador.registrar_resultado(url, time.monotonic() - inicio_peticion, respuesta_host_correcta)
+
+    '''
+    * FUNCIÓN: parece_html
+    * DESCRIPCIÓN: Comprueba si los primeros bytes de una respuesta corresponden a un documento HTML.
+    * ARGS_IN:
+        - primeros_bytes: bytes iniciales del cuerpo de la respuesta.
+    * ARGS_OUT:
+        - True si el contenido parece HTML.
+    '''
+    def parece_html(self, primeros_bytes):
+        inicio = primeros_bytes[:self.TAMANO_FRAGMENTO].lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+        return inicio.startswith(self.FIRMAS_HTML)
+
+    '''
+    * FUNCIÓN: encontrar_direcciones_bitcoin
+    * DESCRIPCIÓN: Busca direcciones Bitcoin en un texto con el motor de extracción de una única pasada.
+    * ARGS_IN:
+        - texto: Texto en el que buscar monederos.
+    * ARGS_OUT:
+        - set con las direcciones de monederos Bitcoin encontrados en el texto.
+    '''
+    def encontrar_direcciones_bitcoin(self, texto):
+        return encontrar_direcciones_bitcoin(texto)
+
+    '''
+    * FUNCIÓN: procesar_y_extraer_enlaces
+    * DESCRIPCIÓN: Procesa código HTML y busca direcciones Bitcoin y nuevos enlaces para visitar.
+    * ARGS_IN:
+        - html: código HTML de la página, en bytes sin decodificar o como texto.
+        - url_base: URL del dominio del cuál se está procesando la página.
+    * ARGS_OUT:
+        - set con las direcciones de monederos Bitcoin encontrados en el texto.
+        - set con los enlaces a otras páginas encontrados en el código.
+        - Huella del texto de la página. None, si el texto es demasiado corto para compararlo.
+    '''
+    def procesar_y_extraer_enlaces(self, html, url_base):
+        return analizar_pagina(html, url_base)
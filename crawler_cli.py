@@ -0,0 +1,228 @@
+import sys
+import os
+import json
+import queue
+import argparse
+import sqlite3
+from threading import Event
+from crawler import HiloCrawler
+from normalizacion_urls import normalizar_url_inicial
+
+'''
+* DESCRIPCIÓN: Punto de entrada por línea de comandos del crawler, sin interfaz gráfica. Lee las URLs iniciales de un
+               fichero o de la entrada estándar y escribe los monederos encontrados en formato JSON Lines (una línea
+               por página con monederos) a medida que se encuentran. No importa customtkinter, pandas ni blockcypher,
+               de modo que puede ejecutarse en servidores sin entorno gráfico o desde cron. Ejemplo:
+
+                   python crawler_cli.py -m 50 -p 32 --procesos 4 -u semillas.txt -o monederos.jsonl
+
+               La función rastrear ofrece la misma funcionalidad como API importable.
+'''
+
+# Mensajes del hilo de rastreo que indican el fin del rastreo
+COMANDOS_FINALES = ("terminado", "cancelado", "error", "error_conexion")
+
+# Códigos de salida del programa
+CODIGO_TERMINADO = 0
+CODIGO_ERROR = 1
+CODIGO_ERROR_CONEXION = 3
+CODIGO_CANCELADO = 130
+
+
+'''
+* FUNCIÓN: leer_urls
+* DESCRIPCIÓN: Lee las URLs iniciales de un fichero de texto (una por línea) y conserva, normalizadas, las que son
+               URLs de servicios ocultos v3 válidos de la red TOR.
+* ARGS_IN:
+    - fichero: objeto fichero de texto abierto para lectura.
+* ARGS_OUT:
+    - Lista de URLs válidas, sin duplicados y en orden de aparición.
+    - Número de líneas descartadas.
+'''
+def leer_urls(fichero):
+    lista_urls = []
+    num_descartadas = 0
+    for linea in fichero:
+        url = linea.strip()
+        if not url or url.startswith('#'):
+            continue
+        url_normalizada = normalizar_url_inicial(url)
+        if url_normalizada:
+            lista_urls.append(url_normalizada)
+        else:
+            num_descartadas += 1
+    return list(dict.fromkeys(lista_urls)), num_descartadas
+
+
+'''
+* FUNCIÓN: rastrear
+* DESCRIPCIÓN: Ejecuta un rastreo en un HiloCrawler y devuelve sus mensajes a medida que se producen. Si el consumidor
+               deja de iterar (o se interrumpe con Ctrl+C), se detiene el rastreo y se espera a que el hilo finalice.
+* ARGS_IN:
+    - urls: lista de URLs iniciales.
+    - num_min_monederos: número de monederos a partir del cual finaliza el rastreo.
+    - evento_parada: evento para detener el rastreo desde otro hilo (Opcional).
+    - opciones: resto de parámetros de HiloCrawler (num_peticiones_concurrentes, num_procesos_analisis,
+      ruta_almacen, endpoints_socks, circuitos_por_endpoint, tamano_maximo_pagina, max_paginas_servicio,
+      profundidad_maxima, ruta_archivo, priorizar_enlaces, ruta_cache_hosts...).
+* ARGS_OUT:
+    - Generador de tuplas (comando, datos) con los mensajes del hilo de rastreo. El último mensaje es "terminado",
+      "cancelado", "error" o "error_conexion".
+'''
+def rastrear(urls, num_min_monederos, evento_parada=None, **opciones):
+    cola_comunicacion = queue.Queue()
+    evento_parada = evento_parada or Event()
+    hilo_crawler = HiloCrawler(urls, num_min_monederos, cola_comunicacion, evento_parada, **opciones)
+    hilo_crawler.start()
+    try:
+        while True:
+            try:
+                mensaje = cola_comunicacion.get(timeout=0.5)
+            except queue.Empty:
+                if not hilo_crawler.is_alive() and cola_comunicacion.empty():
+                    return
+                continue
+            yield mensaje
+            if mensaje[0] in COMANDOS_FINALES:
+                return
+    finally:
+        evento_parada.set()
+        hilo_crawler.join()
+
+
+'''
+* FUNCIÓN: crear_analizador_argumentos
+* DESCRIPCIÓN: Crea el analizador de los argumentos de la línea de comandos.
+* ARGS_IN:
+    - N/A
+* ARGS_OUT:
+    - Objeto argparse.ArgumentParser.
+'''
+def crear_analizador_argumentos():
+    analizador = argparse.ArgumentParser(description="Rastrea servicios ocultos de la red TOR en busca de monederos "
+                                                     "Bitcoin y escribe los resultados en formato JSON Lines.")
+    analizador.add_argument("-m", "--monederos", type=int, required=True,
+                            help="número mínimo de monederos a encontrar")
+    analizador.add_argument("-u", "--urls", default="-",
+                            help="fichero de URLs iniciales, una por línea ('-' para la entrada estándar, por defecto)")
+    analizador.add_argument("-o", "--salida", default="-",
+                            help="fichero JSON Lines de resultados, al que se añaden líneas ('-' para la salida estándar, por defecto)")
+    analizador.add_argument("-p", "--peticiones", type=int, default=1,
+                            help="número de peticiones simultáneas (por defecto, 1)")
+    analizador.add_argument("--procesos", type=int, default=0,
+                            help="número de procesos de análisis de páginas (por defecto, 0: en el hilo de rastreo)")
+    analizador.add_argument("--paginas-por-servicio", type=int,
+                            help="número máximo de páginas de cada servicio oculto (por defecto, sin límite)")
+    analizador.add_argument("--profundidad", type=int,
+                            help="número máximo de enlaces seguidos desde las URLs iniciales (por defecto, sin límite)")
+    analizador.add_argument("-a", "--almacen",
+                            help="fichero de estado para guardar o reanudar el rastreo")
+    analizador.add_argument("--archivo",
+                            help="archivo WARC comprimido (.warc.gz) al que se añaden las páginas descargadas, para "
+                                 "volver a analizarlas sin conexión con archivo_paginas.py")
+    analizador.add_argument("--cache-hosts",
+                            help="fichero en el que conservar entre rastreos la latencia de los hosts y los hosts caídos, "
+                                 "cuyas URLs se descartan sin volver a intentarlas hasta que caduca la caída")
+    analizador.add_argument("--fifo", action="store_true",
+                            help="visita las URLs en orden de descubrimiento, sin priorizar los servicios y enlaces con "
+                                 "más monederos")
+    analizador.add_argument("--socks", action="append",
+                            help="endpoint SOCKS de TOR (host:puerto). Puede repetirse (por defecto, localhost:9050)")
+    analizador.add_argument("--circuitos", type=int, default=1,
+                            help="número de circuitos aislados por endpoint SOCKS (por defecto, 1)")
+    analizador.add_argument("-v", "--verbose", action="store_true",
+                            help="muestra en la salida de error las URLs procesadas")
+    return analizador
+
+
+'''
+* FUNCIÓN: main
+* DESCRIPCIÓN: Rutina principal de la línea de comandos.
+* ARGS_IN:
+    - argv: lista de argumentos (Opcional). Por defecto, los argumentos del programa.
+* ARGS_OUT:
+    - Código de salida del programa.
+'''
+def main(argv=None):
+    analizador = crear_analizador_argumentos()
+    argumentos = analizador.parse_args(argv)
+    if argumentos.monederos < 1:
+        analizador.error("el número mínimo de monederos debe ser un entero positivo")
+    if argumentos.peticiones < 1:
+        analizador.error("el número de peticiones simultáneas debe ser un entero positivo")
+    if argumentos.procesos < 0:
+        analizador.error("el número de procesos de análisis debe ser un entero no negativo")
+    if argumentos.paginas_por_servicio is not None and argumentos.paginas_por_servicio < 1:
+        analizador.error("el número máximo de páginas por servicio debe ser un entero positivo")
+    if argumentos.profundidad is not None and argumentos.profundidad < 0:
+        analizador.error("la profundidad máxima debe ser un entero no negativo")
+    if argumentos.circuitos < 1:
+        analizador.error("el número de circuitos por endpoint debe ser un entero positivo")
+
+    if argumentos.urls == "-":
+        urls, num_descartadas = leer_urls(sys.stdin)
+    else:
+        with open(argumentos.urls, encoding="utf-8") as fichero_urls:
+            urls, num_descartadas = leer_urls(fichero_urls)
+    if num_descartadas:
+        print(f"Se han descartado {num_descartadas} URLs no válidas", file=sys.stderr)
+
+    # Si se indica un fichero de estado existente, el rastreo se reanuda y no son necesarias URLs iniciales
+    if not urls and not (argumentos.almacen and os.path.isfile(argumentos.almacen)):
+        analizador.error("se debe proporcionar al menos una URL .onion v3 inicial válida")
+
+    salida = sys.stdout if argumentos.salida == "-" else open(argumentos.salida, "a", encoding="utf-8")
+    codigo_salida = CODIGO_ERROR
+    try:
+        for comando, datos in rastrear(urls, argumentos.monederos,
+                                       num_peticiones_concurrentes=argumentos.peticiones,
+                                       num_procesos_analisis=argumentos.procesos,
+                                       ruta_almacen=argumentos.almacen,
+                                       max_paginas_servicio=argumentos.paginas_por_servicio,
+                                       profundidad_maxima=argumentos.profundidad,
+                                       ruta_archivo=argumentos.archivo,
+                                       priorizar_enlaces=not argumentos.fifo,
+                                       ruta_cache_hosts=argumentos.cache_hosts,
+                                       endpoints_socks=tuple(argumentos.socks or ("localhost:9050",)),
+                                       circuitos_por_endpoint=argumentos.circuitos):
+            if comando == "monederos_pagina":
+                url, lista_direcciones = datos
+                salida.write(json.dumps({"url": url, "direcciones": lista_direcciones}) + "\n")
+                salida.flush()
+            elif comando == "estado" and argumentos.verbose:
+                print(datos, file=sys.stderr)
+            elif comando == "monedero_encontrado":
+                print(f"Monederos encontrados: {datos}/{argumentos.monederos}", file=sys.stderr)
+            elif comando == "estadisticas":
+                print(f"Páginas duplicadas: {datos['paginas_duplicadas']} de {datos['paginas_indexadas'] + datos['paginas_duplicadas']} "
+                      f"({datos['descargas_evitadas']} descargas y análisis evitados)", file=sys.stderr)
+                print(f"Enlaces descartados por los límites del rastreo: {datos['enlaces_fuera_de_limites']}", file=sys.stderr)
+                print(f"URLs descartadas de hosts caídos: {datos['urls_hosts_caidos']} ({datos['hosts_caidos']} caídas de hosts)",
+                      file=sys.stderr)
+                print(f"Sesiones HTTP: {datos['sesiones_reutilizadas']} reutilizadas, {datos['sesiones_creadas']} creadas, "
+                      f"{datos['sesiones_expulsadas']} expulsadas", file=sys.stderr)
+            elif comando == "terminado":
+                print(f"Rastreo completado: {len(datos)} páginas con monederos", file=sys.stderr)
+                codigo_salida = CODIGO_TERMINADO
+            elif comando == "cancelado":
+                codigo_salida = CODIGO_CANCELADO
+            elif comando == "error_conexion":
+                print(f"Error al establecer conexión con la red TOR: {datos}", file=sys.stderr)
+                codigo_salida = CODIGO_ERROR_CONEXION
+            elif comando == "error":
+                print(f"Ha ocurrido un error: {datos}", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("Rastreo cancelado", file=sys.stderr)
+        codigo_salida = CODIGO_CANCELADO
+    except sqlite3.Error as e:
+        print(f"No se pudo abrir el fichero de estado del rastreo o la caché de hosts ({e})", file=sys.stderr)
+    except OSError as e:
+        print(f"No se pudo abrir el archivo de páginas ({e})", file=sys.stderr)
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    return codigo_salida
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+import os
+import csv
+import json
+from itertools import islice
+from openpyxl import Workbook
+from monedero_bitcoin import formatear_participantes
+
+'''
+* DESCRIPCIÓN: Exportación de las transacciones de un monedero y de los resultados de un rastreo a ficheros CSV, JSON
+               Lines, Parquet o Excel. Las filas se generan y se escriben por bloques, de modo que la memoria
+               utilizada no depende del tamaño de la exportación, y pueden exportarse desde un hilo en segundo plano.
+               El formato se elige por la extensión del fichero.
+'''
+
+# Número de filas escritas en cada bloque
+TAMANO_BLOQUE_EXPORTACION = 10000
+# Número máximo de filas de una hoja de Excel. Al alcanzarlo, se continúa en una hoja nueva
+MAX_FILAS_HOJA_EXCEL = 1048576
+
+# Tipos de fichero admitidos, en el formato de filedialog
+TIPOS_FICHERO_EXPORTACION = [("Excel", "*.xlsx"), ("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Parquet", "*.parquet")]
+
+# Columnas de cada exportación: tuplas (nombre, tipo de los valores). Los importes se exportan en satoshis, sin pérdida
+# de precisión
+COLUMNAS_TRANSACCIONES = (("Hash", str), ("Valor Neto (satoshis)", int), ("Comisión (satoshis)", int), ("Bloque", int), ("Fecha", str),
+                          ("Confirmaciones", int), ("Emisores", str), ("Receptores", str))
+COLUMNAS_RESULTADOS = (("URL", str), ("Monedero", str))
+
+
+'''
+* CLASE: EscritorCSV
+* DESCRIPCIÓN: Clase que escribe filas en un fichero CSV con cabecera.
+'''
+class EscritorCSV():
+    def __init__(self, ruta, columnas):
+        self.fichero = open(ruta, "w", encoding="utf-8", newline="")
+        self.escritor = csv.writer(self.fichero)
+        self.escritor.writerow([nombre for nombre, _ in columnas])
+
+    '''
+    * FUNCIÓN: escribir
+    * DESCRIPCIÓN: Escribe un bloque de filas.
+    * ARGS_IN:
+        - filas: lista de tuplas con los valores de cada fila, en el orden de las columnas.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def escribir(self, filas):
+        self.escritor.writerows(filas)
+
+    '''
+    * FUNCIÓN: cerrar
+    * DESCRIPCIÓN: Cierra el fichero.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar(self):
+        self.fichero.close()
+
+
+'''
+* CLASE: EscritorJSONL
+* DESCRIPCIÓN: Clase que escribe filas en un fichero JSON Lines, un objeto por fila con los nombres de las columnas.
+'''
+class EscritorJSONL():
+    def __init__(self, ruta, columnas):
+        self.fichero = open(ruta, "w", encoding="utf-8")
+        self.nombres = [nombre for nombre, _ in columnas]
+
+    '''
+    * FUNCIÓN: escribir
+    * DESCRIPCIÓN: Escribe un bloque de filas.
+    * ARGS_IN:
+        - filas: lista de tuplas con los valores de cada fila, en el orden de las columnas.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def escribir(self, filas):
+        self.fichero.writelines(json.dumps(dict(zip(self.nombres, fila)), ensure_ascii=False) + "\n" for fila in filas)
+
+    '''
+    * FUNCIÓN: cerrar
+    * DESCRIPCIÓN: Cierra el fichero.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar(self):
+        self.fichero.close()
+
+
+'''
+* CLASE: EscritorParquet
+* DESCRIPCIÓN: Clase que escribe filas en un fichero Parquet, un grupo de filas por bloque. Requiere pyarrow.
+'''
+class EscritorParquet():
+    def __init__(self, ruta, columnas):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ValueError("La exportación a Parquet requiere el paquete pyarrow")
+        self.pyarrow = pyarrow
+        tipos = {str: pyarrow.string(), int: pyarrow.int64(), float: pyarrow.float64()}
+        self.esquema = pyarrow.schema([(nombre, tipos[tipo]) for nombre, tipo in columnas])
+        self.escritor = pyarrow.parquet.ParquetWriter(ruta, self.esquema)
+
+    '''
+    * FUNCIÓN: escribir
+    * DESCRIPCIÓN: Escribe un bloque de filas como un grupo de filas del fichero.
+    * ARGS_IN:
+        - filas: lista de tuplas con los valores de cada fila, en el orden de las columnas.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def escribir(self, filas):
+        columnas = list(zip(*filas))
+        self.escritor.write_table(self.pyarrow.Table.from_arrays(
+            [self.pyarrow.array(valores, type=campo.type) for valores, campo in zip(columnas, self.esquema)], schema=self.esquema))
+
+    '''
+    * FUNCIÓN: cerrar
+    * DESCRIPCIÓN: Escribe el pie del fichero y lo cierra.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar(self):
+        self.escritor.close()
+
+
+'''
+* CLASE: EscritorExcel
+* DESCRIPCIÓN: Clase que escribe filas en un fichero Excel con openpyxl en modo de solo escritura, que no mantiene las
+               celdas en memoria. Si se supera el número máximo de filas de una hoja, se continúa en una hoja nueva.
+'''
+class EscritorExcel():
+    def __init__(self, ruta, columnas):
+        self.ruta = ruta
+        self.cabecera = [nombre for nombre, _ in columnas]
+        self.libro = Workbook(write_only=True)
+        self.hoja = None
+        self.num_filas_hoja = MAX_FILAS_HOJA_EXCEL
+
+    '''
+    * FUNCIÓN: escribir
+    * DESCRIPCIÓN: Escribe un bloque de filas en la hoja actual, creando una hoja nueva cuando se llena.
+    * ARGS_IN:
+        - filas: lista de tuplas con los valores de cada fila, en el orden de las columnas.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def escribir(self, filas):
+        for fila in filas:
+            if self.num_filas_hoja >= MAX_FILAS_HOJA_EXCEL:
+                self.hoja = self.libro.create_sheet(f"Hoja{len(self.libro.worksheets) + 1}")
+                self.hoja.append(self.cabecera)
+                self.num_filas_hoja = 1
+            self.hoja.append(fila)
+            self.num_filas_hoja += 1
+
+    '''
+    * FUNCIÓN: cerrar
+    * DESCRIPCIÓN: Guarda el libro. Si no se ha escrito ninguna fila, se crea una hoja con la cabecera.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar(self):
+        if self.hoja is None:
+            self.hoja = self.libro.create_sheet("Hoja1")
+            self.hoja.append(self.cabecera)
+        self.libro.save(self.ruta)
+
+
+# Escritor de cada formato. Clave: extensión del fichero
+ESCRITORES_EXPORTACION = {".csv": EscritorCSV, ".jsonl": EscritorJSONL, ".parquet": EscritorParquet, ".xlsx": EscritorExcel}
+
+
+'''
+* FUNCIÓN: exportar
+* DESCRIPCIÓN: Escribe las filas indicadas en un fichero, por bloques, en el formato correspondiente a su extensión.
+               Si la exportación falla o se cancela, se elimina el fichero incompleto.
+* ARGS_IN:
+    - ruta: ruta del fichero a crear.
+    - columnas: tupla de columnas (nombre, tipo de los valores).
+    - filas: iterable de tuplas con los valores de cada fila. Puede ser un generador.
+    - evento_cancelacion: evento que cancela la exportación entre dos bloques (Opcional).
+    - tamano_bloque: número de filas de cada bloque.
+* ARGS_OUT:
+    - Número de filas exportadas. None, si se ha cancelado.
+'''
+def exportar(ruta, columnas, filas, evento_cancelacion=None, tamano_bloque=TAMANO_BLOQUE_EXPORTACION):
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension not in ESCRITORES_EXPORTACION:
+        raise ValueError(f"Formato de exportación no admitido: {extension or ruta}")
+
+    escritor = ESCRITORES_EXPORTACION[extension](ruta, columnas)
+    num_filas = 0
+    completada = False
+    try:
+        iterador_filas = iter(filas)
+        while True:
+            if evento_cancelacion is not None and evento_cancelacion.is_set():
+                return None
+            bloque = list(islice(iterador_filas, tamano_bloque))
+            if not bloque:
+                break
+            escritor.escribir(bloque)
+            num_filas += len(bloque)
+        completada = True
+    finally:
+        try:
+            escritor.cerrar()
+        finally:
+            if not completada and os.path.exists(ruta):
+                os.remove(ruta)
+    return num_filas
+
+
+'''
+* FUNCIÓN: filas_transacciones
+* DESCRIPCIÓN: Genera las filas de exportación de las transacciones confirmadas de un monedero.
+* ARGS_IN:
+    - monedero: objeto MonederoBitcoin.
+* ARGS_OUT:
+    - Generador de tuplas con las columnas de COLUMNAS_TRANSACCIONES.
+'''
+def filas_transacciones(monedero):
+    for tx in monedero.transacciones_confirmadas:
+        fecha_confirmacion = tx.fecha_confirmacion
+        yield (tx.hash, tx.valor_neto, tx.comision, tx.num_bloque,
+               fecha_confirmacion.strftime("%Y-%m-%d %H:%M") if fecha_confirmacion else "", tx.num_confirmaciones,
+               formatear_participantes(tx.emisores), formatear_participantes(tx.receptores))
+
+
+'''
+* FUNCIÓN: filas_resultados
+* DESCRIPCIÓN: Genera las filas de exportación de los resultados de un rastreo, una por cada monedero de cada URL.
+* ARGS_IN:
+    - resultados: iterable de pares (URL, lista de monederos).
+* ARGS_OUT:
+    - Generador de tuplas con las columnas de COLUMNAS_RESULTADOS.
+'''
+def filas_resultados(resultados):
+    for url, lista_monederos in resultados:
+        for monedero in lista_monederos:
+            yield (url, monedero)
@@ -0,0 +1,45 @@
+import re
+from validador_direcciones import direccion_valida
+
+'''
+* DESCRIPCIÓN: Motor de extracción de direcciones Bitcoin de un texto. Los candidatos P2PKH, P2SH, Bech32 y Bech32m
+               se localizan en una única pasada con una expresión regular compilada, equivalente a la unión de
+               las cuatro expresiones por tipo de dirección. Los textos que no contienen ningún prefijo posible
+               se descartan sin aplicar la expresión regular.
+'''
+
+# Expresión regular de candidatos a dirección Bitcoin. Empieza por el conjunto de primeros caracteres posibles
+# (y no por la frontera de palabra) para que el motor de expresiones regulares avance rápidamente por el texto
+REGEX_CANDIDATOS = re.compile(r"[13b](?<=\b[13b])"
+                              r"(?:(?<=[13])[a-km-zA-HJ-NP-Z1-9]{25,34}"   # P2PKH (empiezan por 1) y P2SH (empiezan por 3)
+                              r"|(?<=b)c1[qp][ac-hj-np-z02-9]{39,59})\b")  # Bech32 (bc1q) y Bech32m (bc1p)
+
+# Longitud mínima de un candidato a dirección
+LONGITUD_MINIMA_CANDIDATO = 26
+
+
+'''
+* FUNCIÓN: encontrar_candidatos
+* DESCRIPCIÓN: Busca en una única pasada los candidatos sintácticos a dirección Bitcoin de un texto.
+* ARGS_IN:
+    - texto: Texto en el que buscar monederos.
+* ARGS_OUT:
+    - set con los candidatos encontrados en el texto, sin validar.
+'''
+def encontrar_candidatos(texto):
+    # Prefiltro: todos los candidatos empiezan por 1, 3 o bc1
+    if len(texto) < LONGITUD_MINIMA_CANDIDATO or ('1' not in texto and '3' not in texto):
+        return set()
+    return set(REGEX_CANDIDATOS.findall(texto))
+
+
+'''
+* FUNCIÓN: encontrar_direcciones_bitcoin
+* DESCRIPCIÓN: Busca direcciones Bitcoin válidas en un texto.
+* ARGS_IN:
+    - texto: Texto en el que buscar monederos.
+* ARGS_OUT:
+    - set con las direcciones de monederos Bitcoin encontrados en el texto.
+'''
+def encontrar_direcciones_bitcoin(texto):
+    return {candidato for candidato in encontrar_candidatos(texto) if direccion_valida(candidato)}
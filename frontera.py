@@ -0,0 +1,276 @@
+import heapq
+import itertools
+import math
+import re
+from collections import deque
+from urllib.parse import urlsplit
+from normalizacion_urls import servicio_url
+
+# Palabras de la ruta o la query string de una URL que suelen indicar páginas con monederos (donaciones, pagos)
+REGEX_PALABRAS_MONEDEROS = re.compile(r"donat|pay|checkout|bitcoin|btc|wallet|deposit|invoice|billing|cart|order|buy|fund",
+                                      re.IGNORECASE)
+
+# Pesos de las señales con las que se puntúan los enlaces en la frontera con prioridad
+PESO_MONEDEROS_ORIGEN = 2.0
+PESO_PALABRAS_MONEDEROS = 3.0
+PESO_PROFUNDIDAD = 0.5
+PESO_RENDIMIENTO_SERVICIO = 4.0
+
+# Entradas obsoletas toleradas en el montículo de servicios, por servicio con URLs pendientes, antes de compactarlo
+FACTOR_COMPACTACION = 4
+
+'''
+* CLASE: FronteraURLs
+* DESCRIPCIÓN: Clase que modela la frontera de rastreo del crawler: la cola FIFO de URLs pendientes de visitar
+               junto con un índice hash de las URLs ya vistas (visitadas o encoladas). Tanto la extracción de la
+               siguiente URL como la comprobación de pertenencia se realizan en tiempo constante.
+'''
+class FronteraURLs():
+    def __init__(self, urls=()):
+        # Cola de URLs pendientes de visitar
+        self.cola_urls = deque()
+        # Índice de URLs vistas: contiene tanto las encoladas como las ya visitadas
+        self.set_urls_vistas = set()
+        # Índice de URLs ya extraídas de la cola para ser visitadas
+        self.set_urls_visitadas = set()
+
+        for url in urls:
+            self.agregar(url)
+
+    '''
+    * FUNCIÓN: agregar
+    * DESCRIPCIÓN: Encola una URL si no ha sido vista previamente.
+    * ARGS_IN:
+        - url: dirección de la página a encolar.
+        - prioridad: prioridad de la URL (Opcional). La cola FIFO la ignora.
+    * ARGS_OUT:
+        - True si la URL ha sido encolada. False si ya había sido vista.
+    '''
+    def agregar(self, url, prioridad=0.0):
+        if url in self.set_urls_vistas:
+            return False
+        self.set_urls_vistas.add(url)
+        self.cola_urls.append(url)
+        return True
+
+    '''
+    * FUNCIÓN: actualizar_servicio
+    * DESCRIPCIÓN: Actualiza la prioridad de un servicio oculto. La cola FIFO no utiliza prioridades.
+    * ARGS_IN:
+        - servicio: dirección .onion del servicio.
+        - prioridad: prioridad del servicio.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def actualizar_servicio(self, servicio, prioridad):
+        pass
+
+    '''
+    * FUNCIÓN: siguiente
+    * DESCRIPCIÓN: Extrae de la cola la siguiente URL a visitar y la marca como visitada.
+    * ARGS_IN:
+        - url_lista: función que indica si una URL puede visitarse ya (Opcional). La cola FIFO la ignora.
+        - max_exploracion: número máximo de servicios omitidos por no estar listos (Opcional). La cola FIFO lo
+          ignora.
+    * ARGS_OUT:
+        - URL a visitar. None, si no quedan URLs pendientes.
+    '''
+    def siguiente(self, url_lista=None, max_exploracion=None):
+        if not self.cola_urls:
+            return None
+        url = self.cola_urls.popleft()
+        self.set_urls_visitadas.add(url)
+        return url
+
+    '''
+    * FUNCIÓN: marcar_visitada
+    * DESCRIPCIÓN: Registra una URL como visitada sin encolarla. Se utiliza al reanudar un rastreo guardado.
+    * ARGS_IN:
+        - url: dirección de la página visitada.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def marcar_visitada(self, url):
+        self.set_urls_vistas.add(url)
+        self.set_urls_visitadas.add(url)
+
+    '''
+    * FUNCIÓN: visitada
+    * DESCRIPCIÓN: Comprueba si una URL ya ha sido extraída de la frontera para su visita.
+    * ARGS_IN:
+        - url: dirección de la página.
+    * ARGS_OUT:
+        - True si la URL ya ha sido visitada.
+    '''
+    def visitada(self, url):
+        return url in self.set_urls_visitadas
+
+    def __contains__(self, url):
+        return url in self.set_urls_vistas
+
+    def __len__(self):
+        return len(self.cola_urls)
+
+
+'''
+* CLASE: FronteraPrioridad
+* DESCRIPCIÓN: Frontera de rastreo que extrae primero las URLs con mayor prioridad, para alcanzar antes el número
+               mínimo de monederos. La prioridad de una URL es la suma de la suya propia, fijada al encolarla, y la
+               de su servicio oculto, que cambia a medida que se visitan sus páginas. Cada servicio tiene su propio
+               montículo de URLs y un montículo global ordena los servicios por su prioridad más la de su mejor URL.
+               Al cambiar la prioridad de un servicio se inserta una nueva entrada y las anteriores se descartan de
+               forma perezosa al extraerlas, por lo que todas las operaciones son logarítmicas. A igual prioridad,
+               las URLs se extraen en orden de llegada, como en la cola FIFO.
+'''
+class FronteraPrioridad(FronteraURLs):
+    def __init__(self, urls=()):
+        # Montículo de URLs pendientes de cada servicio. Clave: dirección .onion. Valor: lista de tuplas
+        # (-prioridad de la URL, orden de llegada, URL)
+        self.diccionario_servicio_urls = {}
+        # Prioridad de cada servicio. Los servicios sin prioridad asignada utilizan la de un servicio no visitado
+        self.diccionario_servicio_prioridad = {}
+        # Versión de la entrada vigente de cada servicio en el montículo global
+        self.diccionario_servicio_version = {}
+        # Montículo global de tuplas (-prioridad, orden de llegada de su mejor URL, servicio, versión)
+        self.monticulo_servicios = []
+        self.contador_llegada = itertools.count()
+        self.num_pendientes = 0
+        self.prioridad_servicio_nuevo = puntuacion_servicio(0, 0)
+        super().__init__(urls)
+
+    '''
+    * FUNCIÓN: agregar
+    * DESCRIPCIÓN: Encola una URL con la prioridad indicada si no ha sido vista previamente.
+    * ARGS_IN:
+        - url: dirección de la página a encolar.
+        - prioridad: prioridad propia de la URL (Opcional).
+    * ARGS_OUT:
+        - True si la URL ha sido encolada. False si ya había sido vista.
+    '''
+    def agregar(self, url, prioridad=0.0):
+        if url in self.set_urls_vistas:
+            return False
+        self.set_urls_vistas.add(url)
+        servicio = servicio_url(url)
+        monticulo = self.diccionario_servicio_urls.setdefault(servicio, [])
+        heapq.heappush(monticulo, (-prioridad, next(self.contador_llegada), url))
+        self.num_pendientes += 1
+        # Solo cambia la entrada del servicio si la URL es su nueva mejor URL
+        if monticulo[0][2] == url:
+            self.programar_servicio(servicio)
+        return True
+
+    '''
+    * FUNCIÓN: siguiente
+    * DESCRIPCIÓN: Extrae la URL pendiente con mayor prioridad y la marca como visitada. Si se indica url_lista, se
+                   omiten los servicios cuya mejor URL aún no puede visitarse: sus URLs permanecen en la frontera,
+                   con sus prioridades, y sus entradas vuelven al montículo global al terminar.
+    * ARGS_IN:
+        - url_lista: función que indica si una URL puede visitarse ya (Opcional).
+        - max_exploracion: número máximo de servicios omitidos por no estar listos (Opcional).
+    * ARGS_OUT:
+        - URL a visitar. None, si no quedan URLs pendientes o ninguna de las exploradas está lista.
+    '''
+    def siguiente(self, url_lista=None, max_exploracion=None):
+        lista_entradas_omitidas = []
+        try:
+            while self.monticulo_servicios:
+                if max_exploracion is not None and len(lista_entradas_omitidas) >= max_exploracion:
+                    return None
+                entrada = heapq.heappop(self.monticulo_servicios)
+                _, _, servicio, version = entrada
+                # Entrada obsoleta: el servicio ha cambiado de prioridad o de mejor URL desde que se insertó
+                if version != self.diccionario_servicio_version[servicio]:
+                    continue
+                monticulo = self.diccionario_servicio_urls[servicio]
+                if url_lista is not None and not url_lista(monticulo[0][2]):
+                    lista_entradas_omitidas.append(entrada)
+                    continue
+                url = heapq.heappop(monticulo)[2]
+                self.num_pendientes -= 1
+                if monticulo:
+                    self.programar_servicio(servicio)
+                else:
+                    del self.diccionario_servicio_urls[servicio]
+                self.set_urls_visitadas.add(url)
+                return url
+            return None
+        finally:
+            for entrada in lista_entradas_omitidas:
+                heapq.heappush(self.monticulo_servicios, entrada)
+
+    '''
+    * FUNCIÓN: actualizar_servicio
+    * DESCRIPCIÓN: Cambia la prioridad de un servicio oculto, que se suma a la de todas sus URLs pendientes.
+    * ARGS_IN:
+        - servicio: dirección .onion del servicio.
+        - prioridad: nueva prioridad del servicio.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def actualizar_servicio(self, servicio, prioridad):
+        if self.diccionario_servicio_prioridad.get(servicio) == prioridad:
+            return
+        self.diccionario_servicio_prioridad[servicio] = prioridad
+        if servicio in self.diccionario_servicio_urls:
+            self.programar_servicio(servicio)
+
+    '''
+    * FUNCIÓN: programar_servicio
+    * DESCRIPCIÓN: Inserta en el montículo global una nueva entrada del servicio con su prioridad actual, que
+                   invalida las anteriores. Si las entradas obsoletas superan FACTOR_COMPACTACION veces el número de
+                   servicios con URLs pendientes, se reconstruye el montículo solo con las vigentes.
+    * ARGS_IN:
+        - servicio: dirección .onion del servicio, con URLs pendientes.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def programar_servicio(self, servicio):
+        version = self.diccionario_servicio_version.get(servicio, 0) + 1
+        self.diccionario_servicio_version[servicio] = version
+        menos_prioridad_url, orden_llegada, _ = self.diccionario_servicio_urls[servicio][0]
+        prioridad = self.diccionario_servicio_prioridad.get(servicio, self.prioridad_servicio_nuevo) - menos_prioridad_url
+        heapq.heappush(self.monticulo_servicios, (-prioridad, orden_llegada, servicio, version))
+
+        if len(self.monticulo_servicios) > FACTOR_COMPACTACION * len(self.diccionario_servicio_urls) + 64:
+            self.monticulo_servicios = [entrada for entrada in self.monticulo_servicios
+                                        if entrada[3] == self.diccionario_servicio_version[entrada[2]]]
+            heapq.heapify(self.monticulo_servicios)
+
+    def __len__(self):
+        return self.num_pendientes
+
+
+'''
+* FUNCIÓN: puntuacion_enlace
+* DESCRIPCIÓN: Calcula la prioridad propia de una URL a partir de las señales disponibles al encolarla: los
+               monederos de la página que la enlaza, las palabras de su ruta asociadas a pagos o donaciones y su
+               profundidad.
+* ARGS_IN:
+    - url: URL normalizada de la página.
+    - num_monederos_origen: número de monederos de la página que contiene el enlace.
+    - profundidad: número de enlaces seguidos desde las URLs iniciales hasta la página.
+* ARGS_OUT:
+    - Prioridad de la URL.
+'''
+def puntuacion_enlace(url, num_monederos_origen, profundidad):
+    partes = urlsplit(url)
+    puntuacion = PESO_MONEDEROS_ORIGEN * math.log1p(num_monederos_origen) - PESO_PROFUNDIDAD * profundidad
+    if REGEX_PALABRAS_MONEDEROS.search(partes.path) or REGEX_PALABRAS_MONEDEROS.search(partes.query):
+        puntuacion += PESO_PALABRAS_MONEDEROS
+    return puntuacion
+
+
+'''
+* FUNCIÓN: puntuacion_servicio
+* DESCRIPCIÓN: Calcula la prioridad de un servicio oculto a partir de su rendimiento: monederos nuevos por página
+               visitada. La prioridad de los servicios sin páginas visitadas es la de un servicio con un monedero
+               por página, y decrece con cada página visitada sin monederos.
+* ARGS_IN:
+    - num_paginas: número de páginas visitadas del servicio.
+    - num_monederos: número de monederos nuevos encontrados en el servicio.
+* ARGS_OUT:
+    - Prioridad del servicio.
+'''
+def puntuacion_servicio(num_paginas, num_monederos):
+    return PESO_RENDIMIENTO_SERVICIO * (num_monederos + 1) / (num_paginas + 1)
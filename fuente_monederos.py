@@ -0,0 +1,87 @@
+'''
+* CLASE: FuenteMonederos
+* DESCRIPCIÓN: Clase base de las fuentes de datos de monederos Bitcoin que utiliza MonederoBitcoin. Cada fuente
+               devuelve los datos de una dirección con el formato del endpoint addrs/full de Blockcypher (balance,
+               total_received, total_sent, n_tx, unconfirmed_balance, unconfirmed_n_tx y la lista "txs"), de modo
+               que la API remota (ClienteMonederos) y el índice local (IndiceMonederos) son intercambiables.
+'''
+class FuenteMonederos():
+
+    '''
+    * FUNCIÓN: obtener_monedero
+    * DESCRIPCIÓN: Obtiene los datos y el historial de transacciones de una dirección. Debe implementarse en cada fuente.
+    * ARGS_IN:
+        - direccion: dirección del monedero.
+    * ARGS_OUT:
+        - Diccionario con los datos del monedero.
+    '''
+    def obtener_monedero(self, direccion):
+        raise NotImplementedError
+
+    '''
+    * FUNCIÓN: obtener_monederos
+    * DESCRIPCIÓN: Obtiene los datos de varias direcciones. Por defecto se consultan una a una.
+    * ARGS_IN:
+        - direcciones: iterable de direcciones de monederos.
+    * ARGS_OUT:
+        - Diccionario con los datos obtenidos. Clave: dirección. Valor: datos del monedero.
+        - Diccionario con los errores. Clave: dirección. Valor: excepción.
+    '''
+    def obtener_monederos(self, direcciones):
+        diccionario_datos = {}
+        diccionario_errores = {}
+        for direccion in dict.fromkeys(direcciones):
+            try:
+                diccionario_datos[direccion] = self.obtener_monedero(direccion)
+            except Exception as e:
+                diccionario_errores[direccion] = e
+        return diccionario_datos, diccionario_errores
+
+    '''
+    * FUNCIÓN: precargar
+    * DESCRIPCIÓN: Descarga en segundo plano los datos de varias direcciones en una caché. Por defecto no se realiza
+                   ninguna precarga, para las fuentes cuyas consultas no requieren acceso a la red.
+    * ARGS_IN:
+        - direcciones: iterable de direcciones de monederos.
+        - cache: objeto CacheMonederos en el que guardar los datos.
+        - funcion_descarga: función que recibe la dirección y devuelve lo que se guarda en la caché (Opcional). Por
+          defecto, obtener_monedero.
+    * ARGS_OUT:
+        - Lista de tareas (concurrent.futures.Future) de la precarga.
+    '''
+    def precargar(self, direcciones, cache, funcion_descarga=None):
+        return []
+
+    '''
+    * FUNCIÓN: priorizar
+    * DESCRIPCIÓN: Da prioridad a la consulta de la dirección que ha abierto el usuario frente a las precargas. Por
+                   defecto no hay precargas con las que compartir las consultas.
+    * ARGS_IN:
+        - direccion: dirección del monedero.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def priorizar(self, direccion):
+        pass
+
+    '''
+    * FUNCIÓN: cancelar_precarga
+    * DESCRIPCIÓN: Cancela las precargas pendientes. Por defecto no hay precargas que cancelar.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cancelar_precarga(self):
+        pass
+
+    '''
+    * FUNCIÓN: cerrar
+    * DESCRIPCIÓN: Libera los recursos de la fuente.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar(self):
+        pass
@@ -0,0 +1,155 @@
+import re
+import sys
+import zlib
+from array import array
+
+'''
+* DESCRIPCIÓN: Huellas de contenido para detectar páginas casi duplicadas (réplicas de un mismo servicio oculto o
+               variantes de una página que solo cambian en la query string). La huella de una página es el SimHash de
+               64 bits de los trigramas de palabras de su texto visible: dos páginas con casi el mismo texto tienen
+               huellas que difieren en pocos bits. El índice localiza huellas a una distancia de Hamming acotada
+               dividiéndolas en bandas: si dos huellas difieren en k bits o menos, coinciden en al menos una de k+1
+               bandas, que se buscan en diccionarios.
+'''
+
+# Número de bits de las huellas
+NUM_BITS_HUELLA = 64
+# Número de palabras de cada trigrama (shingle) del texto
+PALABRAS_POR_SHINGLE = 3
+# Número mínimo de palabras de una página para calcular su huella. Las páginas más cortas no se comparan
+MIN_PALABRAS_HUELLA = 20
+# Número máximo de caracteres del texto que se utilizan para calcular la huella, de modo que su coste no crezca con el
+# tamaño de las páginas grandes. En los textos más largos se toman NUM_FRAGMENTOS_HUELLA fragmentos repartidos por todo
+# el texto, y no solo su inicio, para que dos páginas con una misma cabecera extensa no resulten casi duplicadas
+MAX_CARACTERES_HUELLA = 16384
+NUM_FRAGMENTOS_HUELLA = 8
+# Distancia de Hamming máxima entre las huellas de dos páginas casi duplicadas. En páginas de pocos cientos de
+# palabras, cambiar una sola palabra altera varios bits de la huella, mientras que dos páginas sin relación difieren en
+# unos 32 bits y la probabilidad de que difieran en 6 o menos es despreciable
+DISTANCIA_MAXIMA_DUPLICADOS = 6
+
+REGEX_PALABRA = re.compile(r"\w+")
+
+'''
+* FUNCIÓN: calcular_huella
+* DESCRIPCIÓN: Calcula el SimHash de 64 bits del texto de una página a partir de los trigramas de palabras distintos
+               de una muestra de MAX_CARACTERES_HUELLA caracteres repartidos por todo el texto (muestrear_texto).
+               Los hashes de los trigramas son estables entre procesos (CRC32), por lo que la huella puede
+               calcularse en los procesos de análisis.
+* ARGS_IN:
+    - texto: texto visible de la página.
+* ARGS_OUT:
+    - Huella de 64 bits. None, si la página tiene menos de MIN_PALABRAS_HUELLA palabras.
+'''
+def calcular_huella(texto):
+    palabras = REGEX_PALABRA.findall(muestrear_texto(texto).lower())
+    if len(palabras) < MIN_PALABRAS_HUELLA:
+        return None
+
+    set_shingles = {' '.join(palabras[i:i + PALABRAS_POR_SHINGLE]) for i in range(len(palabras) - PALABRAS_POR_SHINGLE + 1)}
+    valores = array('Q')
+    for shingle in set_shingles:
+        datos = shingle.encode('utf-8')
+        valores.append(zlib.crc32(datos) | (zlib.crc32(datos, 0x9E3779B9) << 32))
+
+    # Los hashes se empaquetan en un único entero y cada bit se cuenta de una vez en todos ellos, enmascarando su
+    # posición en cada palabra de 64 bits. Cada bit de la huella se activa si lo tiene activo más de la mitad de los
+    # trigramas
+    num_valores = len(valores)
+    hashes = int.from_bytes(valores.tobytes(), sys.byteorder)
+    mascara = int.from_bytes((1).to_bytes(8, sys.byteorder) * num_valores, sys.byteorder)
+    huella = 0
+    for bit in range(NUM_BITS_HUELLA):
+        if 2 * ((hashes >> bit) & mascara).bit_count() > num_valores:
+            huella |= 1 << bit
+    return huella
+
+
+'''
+* FUNCIÓN: muestrear_texto
+* DESCRIPCIÓN: Reduce un texto a MAX_CARACTERES_HUELLA caracteres como máximo, formados por NUM_FRAGMENTOS_HUELLA
+               fragmentos de igual tamaño equiespaciados desde el inicio hasta el final del texto.
+* ARGS_IN:
+    - texto: texto visible de la página.
+* ARGS_OUT:
+    - Texto completo, si no supera el máximo, o fragmentos del texto separados por espacios.
+'''
+def muestrear_texto(texto):
+    if len(texto) <= MAX_CARACTERES_HUELLA:
+        return texto
+    tamano_fragmento = MAX_CARACTERES_HUELLA // NUM_FRAGMENTOS_HUELLA
+    paso = (len(texto) - tamano_fragmento) / (NUM_FRAGMENTOS_HUELLA - 1)
+    return ' '.join(texto[round(i * paso):round(i * paso) + tamano_fragmento] for i in range(NUM_FRAGMENTOS_HUELLA))
+
+
+'''
+* FUNCIÓN: distancia_hamming
+* DESCRIPCIÓN: Número de bits en los que difieren dos huellas.
+* ARGS_IN:
+    - huella_a: primera huella.
+    - huella_b: segunda huella.
+* ARGS_OUT:
+    - Distancia de Hamming.
+'''
+def distancia_hamming(huella_a, huella_b):
+    return (huella_a ^ huella_b).bit_count()
+
+
+'''
+* CLASE: IndiceHuellas
+* DESCRIPCIÓN: Clase que indexa las huellas de las páginas visitadas y encuentra, para una nueva huella, una página
+               ya indexada a una distancia de Hamming no superior a distancia_maxima.
+'''
+class IndiceHuellas():
+    def __init__(self, distancia_maxima=DISTANCIA_MAXIMA_DUPLICADOS):
+        self.distancia_maxima = distancia_maxima
+        # Límites en bits de cada banda: distancia_maxima + 1 bandas de tamaño similar
+        num_bandas = distancia_maxima + 1
+        self.lista_limites_bandas = [(NUM_BITS_HUELLA * i // num_bandas, NUM_BITS_HUELLA * (i + 1) // num_bandas) for i in range(num_bandas)]
+        # Un diccionario por banda. Clave: valor de la banda. Valor: lista de pares (huella, URL)
+        self.lista_diccionarios_bandas = [{} for _ in range(num_bandas)]
+        self.num_huellas = 0
+
+    '''
+    * FUNCIÓN: bandas
+    * DESCRIPCIÓN: Divide una huella en los valores de sus bandas.
+    * ARGS_IN:
+        - huella: huella a dividir.
+    * ARGS_OUT:
+        - Generador de valores de las bandas.
+    '''
+    def bandas(self, huella):
+        for inicio, fin in self.lista_limites_bandas:
+            yield (huella >> inicio) & ((1 << (fin - inicio)) - 1)
+
+    '''
+    * FUNCIÓN: buscar
+    * DESCRIPCIÓN: Busca una página indexada cuya huella esté a una distancia no superior a la máxima.
+    * ARGS_IN:
+        - huella: huella de la página.
+    * ARGS_OUT:
+        - URL de la página casi duplicada. None, si no hay ninguna.
+    '''
+    def buscar(self, huella):
+        for diccionario_banda, valor_banda in zip(self.lista_diccionarios_bandas, self.bandas(huella)):
+            for huella_indexada, url in diccionario_banda.get(valor_banda, ()):
+                if distancia_hamming(huella, huella_indexada) <= self.distancia_maxima:
+                    return url
+        return None
+
+    '''
+    * FUNCIÓN: agregar
+    * DESCRIPCIÓN: Indexa la huella de una página.
+    * ARGS_IN:
+        - huella: huella de la página.
+        - url: URL de la página.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def agregar(self, huella, url):
+        for diccionario_banda, valor_banda in zip(self.lista_diccionarios_bandas, self.bandas(huella)):
+            diccionario_banda.setdefault(valor_banda, []).append((huella, url))
+        self.num_huellas += 1
+
+    def __len__(self):
+        return self.num_huellas
@@ -0,0 +1,321 @@
+import sys
+import json
+import sqlite3
+from datetime import datetime, timezone
+from threading import Lock
+from dateutil import parser
+from fuente_monederos import FuenteMonederos
+
+'''
+* DESCRIPCIÓN: Índice local de transacciones Bitcoin en una base de datos SQLite, consultable por dirección sin
+               acceso a la red. Se carga de forma masiva a partir de volcados en formato JSON Lines, en los que cada
+               línea es una transacción de Blockcypher, un registro con una lista "txs" de transacciones de
+               Blockcypher (un bloque o una respuesta addrs/full guardada) o un bloque de Bitcoin Core obtenido con
+               "bitcoin-cli getblock <hash> 3" (con los datos de las salidas gastadas en "prevout"). Las
+               transacciones sin confirmar se ignoran. Ejemplo:
+
+                   python indice_monederos.py indice.db bloques_800000_800999.jsonl transacciones.jsonl
+'''
+
+# Número de transacciones insertadas en cada lote durante la carga masiva
+TAMANO_LOTE_CARGA = 10000
+# Número máximo de parámetros por consulta SQL
+MAX_PARAMETROS_CONSULTA = 900
+# Sentido de un movimiento: entrada (la dirección envía) o salida (la dirección recibe)
+SENTIDO_ENTRADA = 0
+SENTIDO_SALIDA = 1
+
+
+'''
+* CLASE: IndiceMonederos
+* DESCRIPCIÓN: Fuente de datos de monederos Bitcoin respaldada por un índice SQLite local. Las transacciones se
+               guardan en la tabla "transacciones" y sus entradas y salidas, una fila por dirección, en la tabla
+               "movimientos", indexada por dirección. Puede utilizarse desde varios hilos.
+'''
+class IndiceMonederos(FuenteMonederos):
+    def __init__(self, ruta):
+        self.cerrojo = Lock()
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS transacciones (
+                hash TEXT PRIMARY KEY, altura INTEGER NOT NULL, confirmada REAL, recibida REAL,
+                comision INTEGER NOT NULL, total INTEGER NOT NULL) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS movimientos (
+                hash_tx TEXT NOT NULL, sentido INTEGER NOT NULL, posicion INTEGER NOT NULL, direccion TEXT NOT NULL,
+                valor INTEGER NOT NULL, PRIMARY KEY (hash_tx, sentido, posicion, direccion)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS movimientos_direccion ON movimientos (direccion, hash_tx);
+            CREATE TABLE IF NOT EXISTS metadatos (clave TEXT PRIMARY KEY, valor) WITHOUT ROWID;
+        """)
+        self.conexion.commit()
+
+    '''
+    * FUNCIÓN: cargar_volcado
+    * DESCRIPCIÓN: Carga en el índice las transacciones de un volcado JSON Lines. Las transacciones ya indexadas se
+                   ignoran, por lo que un mismo volcado puede cargarse varias veces.
+    * ARGS_IN:
+        - fichero: objeto fichero de texto abierto para lectura.
+    * ARGS_OUT:
+        - Número de transacciones leídas del volcado.
+    '''
+    def cargar_volcado(self, fichero):
+        num_transacciones = 0
+        lista_transacciones = []
+        lista_movimientos = []
+        altura_maxima = -1
+        with self.cerrojo, self.conexion:
+            for linea in fichero:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                for transaccion, movimientos in convertir_registro(json.loads(linea)):
+                    lista_transacciones.append(transaccion)
+                    lista_movimientos.extend(movimientos)
+                    altura_maxima = max(altura_maxima, transaccion[1])
+                    num_transacciones += 1
+                if len(lista_transacciones) >= TAMANO_LOTE_CARGA:
+                    self.insertar_lote(lista_transacciones, lista_movimientos)
+                    lista_transacciones, lista_movimientos = [], []
+            self.insertar_lote(lista_transacciones, lista_movimientos)
+            self.conexion.execute("INSERT INTO metadatos (clave, valor) VALUES ('altura_maxima', ?) "
+                                  "ON CONFLICT (clave) DO UPDATE SET valor = max(valor, excluded.valor)", (altura_maxima,))
+        return num_transacciones
+
+    '''
+    * FUNCIÓN: insertar_lote
+    * DESCRIPCIÓN: Inserta un lote de transacciones y movimientos. Debe llamarse con el cerrojo adquirido y dentro
+                   de una transacción de la base de datos.
+    * ARGS_IN:
+        - lista_transacciones: lista de tuplas (hash, altura, confirmada, recibida, comision, total).
+        - lista_movimientos: lista de tuplas (hash_tx, sentido, posicion, direccion, valor).
+    * ARGS_OUT:
+        - N/A
+    '''
+    def insertar_lote(self, lista_transacciones, lista_movimientos):
+        self.conexion.executemany("INSERT OR IGNORE INTO transacciones VALUES (?, ?, ?, ?, ?, ?)", lista_transacciones)
+        self.conexion.executemany("INSERT OR IGNORE INTO movimientos VALUES (?, ?, ?, ?, ?)", lista_movimientos)
+
+    '''
+    * FUNCIÓN: obtener_monedero
+    * DESCRIPCIÓN: Obtiene los datos y el historial de transacciones de una dirección del índice.
+    * ARGS_IN:
+        - direccion: dirección del monedero.
+    * ARGS_OUT:
+        - Diccionario con el formato de blockcypher.get_address_full.
+    '''
+    def obtener_monedero(self, direccion):
+        diccionario_datos, _ = self.obtener_monederos([direccion])
+        return diccionario_datos[direccion]
+
+    '''
+    * FUNCIÓN: obtener_monederos
+    * DESCRIPCIÓN: Obtiene los datos de varias direcciones con unas pocas consultas. Las transacciones compartidas por
+                   varias direcciones se leen una sola vez. Las direcciones sin transacciones en el índice se
+                   devuelven con balance y número de transacciones nulos, igual que en Blockcypher.
+    * ARGS_IN:
+        - direcciones: iterable de direcciones de monederos.
+    * ARGS_OUT:
+        - Diccionario con los datos obtenidos. Clave: dirección. Valor: datos del monedero.
+        - Diccionario con los errores (vacío).
+    '''
+    def obtener_monederos(self, direcciones):
+        lista_direcciones = list(dict.fromkeys(direcciones))
+        with self.cerrojo:
+            fila = self.conexion.execute("SELECT valor FROM metadatos WHERE clave = 'altura_maxima'").fetchone()
+            altura_maxima = fila[0] if fila else -1
+
+            # Movimientos de las direcciones consultadas: hashes de sus transacciones
+            diccionario_direccion_hashes = {direccion: [] for direccion in lista_direcciones}
+            for bloque in trocear(lista_direcciones):
+                marcadores = ','.join('?' * len(bloque))
+                for direccion, hash_tx in self.conexion.execute(
+                        f"SELECT DISTINCT direccion, hash_tx FROM movimientos WHERE direccion IN ({marcadores})", bloque):
+                    diccionario_direccion_hashes[direccion].append(hash_tx)
+
+            # Transacciones completas, con todas sus entradas y salidas
+            set_hashes = {hash_tx for lista_hashes in diccionario_direccion_hashes.values() for hash_tx in lista_hashes}
+            diccionario_transacciones = {}
+            diccionario_ultima_posicion = {}
+            for bloque in trocear(list(set_hashes)):
+                marcadores = ','.join('?' * len(bloque))
+                for hash_tx, altura, confirmada, recibida, comision, total in self.conexion.execute(
+                        f"SELECT * FROM transacciones WHERE hash IN ({marcadores})", bloque):
+                    diccionario_transacciones[hash_tx] = {
+                        "hash": hash_tx, "block_height": altura, "confirmations": altura_maxima - altura + 1,
+                        "confirmed": marca_a_fecha(confirmada), "received": marca_a_fecha(recibida),
+                        "fees": comision, "total": total, "inputs": [], "outputs": []}
+                for hash_tx, sentido, posicion, direccion, valor in self.conexion.execute(
+                        f"SELECT * FROM movimientos WHERE hash_tx IN ({marcadores}) ORDER BY hash_tx, sentido, posicion", bloque):
+                    if sentido == SENTIDO_ENTRADA:
+                        lista, campo_valor = diccionario_transacciones[hash_tx]["inputs"], "output_value"
+                    else:
+                        lista, campo_valor = diccionario_transacciones[hash_tx]["outputs"], "value"
+                    # Las filas de una misma entrada o salida con varias direcciones (multifirma) se agrupan
+                    if diccionario_ultima_posicion.get((hash_tx, sentido)) == posicion:
+                        if direccion:
+                            lista[-1]["addresses"].append(direccion)
+                    else:
+                        diccionario_ultima_posicion[hash_tx, sentido] = posicion
+                        lista.append({"addresses": [direccion] if direccion else None, campo_valor: valor})
+
+        diccionario_datos = {}
+        for direccion, lista_hashes in diccionario_direccion_hashes.items():
+            lista_txs = sorted((diccionario_transacciones[hash_tx] for hash_tx in lista_hashes),
+                               key=lambda tx: tx["block_height"], reverse=True)
+            total_recibido = sum(salida["value"] for tx in lista_txs for salida in tx["outputs"]
+                                 if salida["addresses"] and direccion in salida["addresses"])
+            total_enviado = sum(entrada["output_value"] for tx in lista_txs for entrada in tx["inputs"]
+                                if entrada["addresses"] and direccion in entrada["addresses"])
+            diccionario_datos[direccion] = {
+                "address": direccion, "total_received": total_recibido, "total_sent": total_enviado,
+                "balance": total_recibido - total_enviado, "final_balance": total_recibido - total_enviado,
+                "n_tx": len(lista_txs), "final_n_tx": len(lista_txs), "unconfirmed_balance": 0, "unconfirmed_n_tx": 0,
+                "txs": lista_txs, "hasMore": False}
+        return diccionario_datos, {}
+
+    '''
+    * FUNCIÓN: cerrar
+    * DESCRIPCIÓN: Cierra la base de datos del índice.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar(self):
+        with self.cerrojo:
+            self.conexion.close()
+
+
+'''
+* FUNCIÓN: trocear
+* DESCRIPCIÓN: Divide una lista en bloques que no superan el número máximo de parámetros de una consulta SQL.
+* ARGS_IN:
+    - lista: lista a dividir.
+* ARGS_OUT:
+    - Generador de bloques de la lista.
+'''
+def trocear(lista):
+    for inicio in range(0, len(lista), MAX_PARAMETROS_CONSULTA):
+        yield lista[inicio:inicio + MAX_PARAMETROS_CONSULTA]
+
+
+'''
+* FUNCIÓN: marca_a_fecha
+* DESCRIPCIÓN: Convierte una marca de tiempo Unix en una fecha con zona horaria UTC, como las de Blockcypher.
+* ARGS_IN:
+    - marca: marca de tiempo Unix. None, si se desconoce.
+* ARGS_OUT:
+    - Objeto datetime o None.
+'''
+def marca_a_fecha(marca):
+    return datetime.fromtimestamp(marca, timezone.utc) if marca is not None else None
+
+
+'''
+* FUNCIÓN: fecha_a_marca
+* DESCRIPCIÓN: Convierte una fecha de un volcado (texto ISO 8601 o marca de tiempo Unix) en una marca de tiempo Unix.
+* ARGS_IN:
+    - fecha: fecha del volcado. None, si no figura.
+* ARGS_OUT:
+    - Marca de tiempo Unix o None.
+'''
+def fecha_a_marca(fecha):
+    if fecha is None:
+        return None
+    if isinstance(fecha, (int, float)):
+        return float(fecha)
+    try:
+        fecha = datetime.fromisoformat(fecha)
+    except ValueError:
+        fecha = parser.parse(fecha)
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return fecha.timestamp()
+
+
+'''
+* FUNCIÓN: direcciones_script
+* DESCRIPCIÓN: Obtiene las direcciones del scriptPubKey de Bitcoin Core. Desde la versión 22 se indica una única
+               dirección en "address"; las versiones anteriores utilizan la lista "addresses".
+* ARGS_IN:
+    - script_pub_key: diccionario scriptPubKey de una salida.
+* ARGS_OUT:
+    - Lista de direcciones. Contiene una cadena vacía si la salida no tiene dirección.
+'''
+def direcciones_script(script_pub_key):
+    if "address" in script_pub_key:
+        return [script_pub_key["address"]]
+    return script_pub_key.get("addresses") or [""]
+
+
+'''
+* FUNCIÓN: convertir_registro
+* DESCRIPCIÓN: Convierte un registro de un volcado en filas del índice. Admite transacciones de Blockcypher,
+               registros con una lista "txs" de transacciones de Blockcypher y bloques de Bitcoin Core con
+               verbosidad 3 (importes en BTC).
+* ARGS_IN:
+    - registro: diccionario leído de una línea del volcado.
+* ARGS_OUT:
+    - Generador de tuplas (fila de la transacción, lista de filas de sus movimientos).
+'''
+def convertir_registro(registro):
+    # Bloque de Blockcypher o respuesta addrs/full
+    if "txs" in registro:
+        for transaccion in registro["txs"]:
+            transaccion.setdefault("block_height", registro.get("height"))
+            transaccion.setdefault("confirmed", registro.get("time"))
+            yield from convertir_registro(transaccion)
+        return
+
+    # Bloque de Bitcoin Core
+    if "tx" in registro:
+        for transaccion in registro["tx"]:
+            lista_movimientos = []
+            lista_entradas = transaccion.get("vin", [])
+            total_entradas = 0
+            for posicion, entrada in enumerate(lista_entradas):
+                if "prevout" not in entrada:
+                    continue
+                valor = round(entrada["prevout"]["value"] * 100000000)
+                total_entradas += valor
+                for direccion in direcciones_script(entrada["prevout"]["scriptPubKey"]):
+                    lista_movimientos.append((transaccion["txid"], SENTIDO_ENTRADA, posicion, direccion, valor))
+            total_salidas = 0
+            for salida in transaccion.get("vout", []):
+                valor = round(salida["value"] * 100000000)
+                total_salidas += valor
+                for direccion in direcciones_script(salida["scriptPubKey"]):
+                    lista_movimientos.append((transaccion["txid"], SENTIDO_SALIDA, salida["n"], direccion, valor))
+            # La comisión solo se conoce si todas las entradas incluyen la salida que gastan. Las transacciones
+            # coinbase, sin entradas previas, no pagan comisión
+            completa = lista_entradas and all("prevout" in entrada for entrada in lista_entradas)
+            comision = total_entradas - total_salidas if completa else 0
+            yield ((transaccion["txid"], registro["height"], float(registro["time"]), float(registro["time"]),
+                    comision, total_salidas), lista_movimientos)
+        return
+
+    # Transacción de Blockcypher
+    if registro.get("block_height") is None or registro["block_height"] < 0:
+        return
+    lista_movimientos = []
+    for posicion, entrada in enumerate(registro.get("inputs", [])):
+        for direccion in entrada.get("addresses") or [""]:
+            lista_movimientos.append((registro["hash"], SENTIDO_ENTRADA, posicion, direccion, entrada.get("output_value", 0)))
+    for posicion, salida in enumerate(registro.get("outputs", [])):
+        for direccion in salida.get("addresses") or [""]:
+            lista_movimientos.append((registro["hash"], SENTIDO_SALIDA, posicion, direccion, salida.get("value", 0)))
+    total = registro.get("total", sum(salida.get("value", 0) for salida in registro.get("outputs", [])))
+    yield ((registro["hash"], registro["block_height"], fecha_a_marca(registro.get("confirmed")),
+            fecha_a_marca(registro.get("received")), registro.get("fees", 0), total), lista_movimientos)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Uso: python indice_monederos.py <índice.db> <volcado.jsonl> [<volcado.jsonl> ...]", file=sys.stderr)
+        sys.exit(2)
+    indice = IndiceMonederos(sys.argv[1])
+    for ruta in sys.argv[2:]:
+        with open(ruta, encoding="utf-8") as fichero:
+            print(f"{ruta}: {indice.cargar_volcado(fichero)} transacciones", file=sys.stderr)
+    indice.cerrar()
@@ -0,0 +1,208 @@
+from datetime import datetime, timezone
+from cliente_monederos import ClienteMonederos
+
+'''
+* DESCRIPCIÓN: Modelo de los monederos Bitcoin y sus transacciones. Los objetos utilizan __slots__ en lugar de un
+               diccionario por instancia, los importes se guardan como enteros en satoshis, las fechas como marcas de
+               tiempo y las direcciones de emisores y receptores como tuplas compartidas entre las transacciones del
+               monedero. Los datos de la API se descartan tras la conversión, de modo que un monedero con decenas de
+               miles de transacciones no mantiene en memoria varias copias de la misma información.
+'''
+
+SATOSHIS_POR_BTC = 100000000
+# Versión del formato de MonederoBitcoin.a_diccionario. Los diccionarios de otras versiones no se cargan
+VERSION_FORMATO = 1
+
+# Tipos de participación del monedero en una transacción
+TIPO_EMISOR = "Emisor"
+TIPO_RECEPTOR = "Receptor"
+TIPO_EMISOR_RECEPTOR = "Emisor/Receptor"
+TIPO_DESCONOCIDO = "Revisar en la cadena"
+
+
+'''
+* CLASE: TransaccionBitcoin
+* DESCRIPCIÓN: Clase que modela las transacciones de Bitcoin. Los emisores y receptores son tuplas de pares
+               (tupla de direcciones, importe en satoshis).
+'''
+class TransaccionBitcoin():
+    __slots__ = ("hash", "valor_neto", "comision", "num_bloque", "marca_confirmacion", "num_confirmaciones",
+                 "tipo", "emisores", "receptores")
+
+    def __init__(self, hash, valor_neto, comision, num_bloque, fecha_confirmacion, num_confirmaciones,
+                 tipo, emisores, receptores):
+        self.hash = hash
+        self.valor_neto = valor_neto
+        self.comision = comision
+        self.num_bloque = num_bloque
+        if fecha_confirmacion is not None and fecha_confirmacion.tzinfo is None:
+            fecha_confirmacion = fecha_confirmacion.replace(tzinfo=timezone.utc)
+        self.marca_confirmacion = fecha_confirmacion.timestamp() if fecha_confirmacion is not None else None
+        self.num_confirmaciones = num_confirmaciones
+        self.tipo = tipo
+        self.emisores = emisores
+        self.receptores = receptores
+
+    '''
+    * FUNCIÓN: fecha_confirmacion
+    * DESCRIPCIÓN: Fecha de confirmación de la transacción en UTC.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Objeto datetime. None, si se desconoce.
+    '''
+    @property
+    def fecha_confirmacion(self):
+        if self.marca_confirmacion is None:
+            return None
+        return datetime.fromtimestamp(self.marca_confirmacion, timezone.utc)
+
+
+'''
+* CLASE: MonederoBitcoin
+* DESCRIPCIÓN: Clase que modela los monederos Bitcoin. Los balances y totales se guardan en satoshis, como los
+               importes de las transacciones; solo se convierten a BTC al mostrarlos (formatear_btc).
+'''
+class MonederoBitcoin():
+    __slots__ = ("direccion", "balance", "total_recibido", "total_enviado", "num_transacciones_confirmadas",
+                 "balance_no_confirmado", "num_transacciones_no_confirmadas", "transacciones_confirmadas")
+
+    def __init__(self, direccion, datosapi=None, fuente=None):
+        self.direccion = direccion
+
+        # Obtención de la información del monedero a través de la fuente indicada (por defecto, la API Blockcypher), si no se proporciona
+        if datosapi is None:
+            datosapi = (fuente or ClienteMonederos()).obtener_monedero(direccion)
+
+        # Información financiera en satoshis
+        self.balance = datosapi["balance"]
+        self.total_recibido = datosapi["total_received"]
+        self.total_enviado = datosapi["total_sent"]
+        self.num_transacciones_confirmadas = datosapi["n_tx"]
+
+        self.balance_no_confirmado = datosapi["unconfirmed_balance"]
+        self.num_transacciones_no_confirmadas = datosapi["unconfirmed_n_tx"]
+
+        # Lista que contiene objetos de tipo TransaccionBitcoin asociados a los movimientos confirmados en los que se identifica al monedero
+        self.transacciones_confirmadas = []
+
+        # Direcciones y tuplas de direcciones compartidas por todas las transacciones del monedero
+        diccionario_direcciones = {}
+
+        if self.num_transacciones_confirmadas > 0:
+            for transaccion in datosapi["txs"]:
+                # Para cada transacción, estudiamos si el monedero ha participado como emisor, receptor o ambos
+                emisores = tuple((compartir_direcciones(diccionario_direcciones, e['addresses']), e['output_value']) for e in transaccion["inputs"])
+                receptores = tuple((compartir_direcciones(diccionario_direcciones, r['addresses']), r['value']) for r in transaccion["outputs"])
+
+                en_emisores = any(self.direccion in direcciones for direcciones, _ in emisores)
+                en_receptores = any(self.direccion in direcciones for direcciones, _ in receptores)
+
+                if en_emisores and en_receptores:
+                    tipo = TIPO_EMISOR_RECEPTOR
+                elif en_emisores:
+                    tipo = TIPO_EMISOR
+                elif en_receptores:
+                    tipo = TIPO_RECEPTOR
+                else:
+                    tipo = TIPO_DESCONOCIDO
+
+                self.transacciones_confirmadas.append(TransaccionBitcoin(hash = transaccion["hash"], valor_neto = transaccion["total"],
+                                                                         comision = transaccion["fees"],
+                                                                         num_bloque = transaccion["block_height"],
+                                                                         fecha_confirmacion = transaccion["confirmed"],
+                                                                         num_confirmaciones = transaccion["confirmations"],
+                                                                         tipo = tipo, emisores = emisores, receptores = receptores))
+
+    '''
+    * FUNCIÓN: a_diccionario
+    * DESCRIPCIÓN: Convierte el monedero en un diccionario de valores JSON, para guardarlo en la caché en disco.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Diccionario con los datos del monedero y sus transacciones como listas.
+    '''
+    def a_diccionario(self):
+        return {"version": VERSION_FORMATO, "direccion": self.direccion, "balance": self.balance,
+                "total_recibido": self.total_recibido, "total_enviado": self.total_enviado,
+                "num_transacciones_confirmadas": self.num_transacciones_confirmadas,
+                "balance_no_confirmado": self.balance_no_confirmado,
+                "num_transacciones_no_confirmadas": self.num_transacciones_no_confirmadas,
+                "transacciones": [[tx.hash, tx.valor_neto, tx.comision, tx.num_bloque, tx.marca_confirmacion,
+                                   tx.num_confirmaciones, tx.tipo, tx.emisores, tx.receptores]
+                                  for tx in self.transacciones_confirmadas]}
+
+    '''
+    * FUNCIÓN: desde_diccionario
+    * DESCRIPCIÓN: Reconstruye un monedero a partir del diccionario generado por a_diccionario.
+    * ARGS_IN:
+        - diccionario: diccionario con los datos del monedero.
+    * ARGS_OUT:
+        - Objeto de la clase MonederoBitcoin. Lanza ValueError si el diccionario es de otra versión del formato.
+    '''
+    @classmethod
+    def desde_diccionario(cls, diccionario):
+        if diccionario.get("version") != VERSION_FORMATO:
+            raise ValueError(f"Versión del formato del monedero no admitida: {diccionario.get('version')}")
+        monedero = cls.__new__(cls)
+        monedero.direccion = diccionario["direccion"]
+        monedero.balance = diccionario["balance"]
+        monedero.total_recibido = diccionario["total_recibido"]
+        monedero.total_enviado = diccionario["total_enviado"]
+        monedero.num_transacciones_confirmadas = diccionario["num_transacciones_confirmadas"]
+        monedero.balance_no_confirmado = diccionario["balance_no_confirmado"]
+        monedero.num_transacciones_no_confirmadas = diccionario["num_transacciones_no_confirmadas"]
+        diccionario_direcciones = {}
+        monedero.transacciones_confirmadas = []
+        for hash, valor_neto, comision, num_bloque, marca, num_confirmaciones, tipo, emisores, receptores in diccionario["transacciones"]:
+            monedero.transacciones_confirmadas.append(TransaccionBitcoin(
+                hash, valor_neto, comision, num_bloque,
+                datetime.fromtimestamp(marca, timezone.utc) if marca is not None else None, num_confirmaciones, tipo,
+                tuple((compartir_direcciones(diccionario_direcciones, direcciones), valor) for direcciones, valor in emisores),
+                tuple((compartir_direcciones(diccionario_direcciones, direcciones), valor) for direcciones, valor in receptores)))
+        return monedero
+
+
+'''
+* FUNCIÓN: compartir_direcciones
+* DESCRIPCIÓN: Devuelve la tupla de direcciones de una entrada o salida, reutilizando la misma tupla (y las mismas
+               cadenas) para todas las apariciones de las mismas direcciones.
+* ARGS_IN:
+    - diccionario_direcciones: diccionario de direcciones y tuplas ya creadas. Clave y valor: dirección o tupla.
+    - direcciones: lista de direcciones de la API. None, si la entrada o salida no tiene dirección.
+* ARGS_OUT:
+    - Tupla de direcciones.
+'''
+def compartir_direcciones(diccionario_direcciones, direcciones):
+    tupla = tuple(direcciones) if direcciones else ()
+    tupla_compartida = diccionario_direcciones.get(tupla)
+    if tupla_compartida is None:
+        tupla_compartida = tuple([diccionario_direcciones.setdefault(direccion, direccion) for direccion in tupla])
+        diccionario_direcciones[tupla_compartida] = tupla_compartida
+    return tupla_compartida
+
+
+'''
+* FUNCIÓN: formatear_btc
+* DESCRIPCIÓN: Formatea un importe en satoshis como BTC con sus ocho decimales, sin pasar por coma flotante.
+* ARGS_IN:
+    - satoshis: importe entero en satoshis.
+* ARGS_OUT:
+    - Texto con el importe en BTC.
+'''
+def formatear_btc(satoshis):
+    btc, resto = divmod(abs(satoshis), SATOSHIS_POR_BTC)
+    return f"{'-' if satoshis < 0 else ''}{btc}.{resto:08d}"
+
+
+'''
+* FUNCIÓN: formatear_participantes
+* DESCRIPCIÓN: Formatea los emisores o receptores de una transacción para mostrarlos o exportarlos, con la primera
+               dirección de cada entrada o salida y su importe en BTC con ocho decimales.
+* ARGS_IN:
+    - participantes: tupla de pares (tupla de direcciones, importe en satoshis).
+* ARGS_OUT:
+    - Texto con los participantes separados por comas.
+'''
+def formatear_participantes(participantes):
+    return ', '.join(f"{direcciones[0]}: {formatear_btc(valor)} BTC" for direcciones, valor in participantes if direcciones)
@@ -0,0 +1,126 @@
+import base64
+import hashlib
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit
+
+'''
+* DESCRIPCIÓN: Normalización de las URLs de servicios ocultos antes de añadirlas a la frontera, de modo que las
+               variantes de una misma página (mayúsculas en el host, puerto por defecto, fragmento, parámetros de
+               seguimiento o en distinto orden) se rastrean una sola vez. Solo se aceptan URLs http(s) cuyo host es
+               una dirección .onion v3 válida, comprobando la suma de control de la clave pública que contiene.
+'''
+
+# Host .onion v3, con subdominios opcionales: la etiqueta final codifica en base32 la clave pública, la suma de
+# control y la versión del servicio
+REGEX_HOST_ONION = re.compile(r"^(?:[a-z0-9-]+\.)*([a-z2-7]{56})\.onion$")
+# Longitud del host de un servicio oculto v3 sin subdominios: 56 caracteres y ".onion"
+LONGITUD_HOST_ONION = 62
+# Versión de las direcciones .onion v3
+VERSION_ONION = 3
+
+# Puerto por defecto de cada esquema admitido
+PUERTOS_POR_DEFECTO = {"http": 80, "https": 443}
+
+# Parámetros de la query string que no identifican el contenido y se eliminan de las URLs: solo identificadores de
+# seguimiento de campañas y de sesión conocidos. Parámetros genéricos como "ref" se conservan, porque en muchos
+# servicios ocultos seleccionan el contenido (código de afiliado, producto, página de referencia)
+PARAMETROS_DESCARTADOS = frozenset({"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "_ga",
+                                    "phpsessid", "jsessionid", "sessionid", "session_id", "sid", "aspsessionid"})
+PREFIJOS_PARAMETROS_DESCARTADOS = ("utm_",)
+
+
+'''
+* FUNCIÓN: onion_valido
+* DESCRIPCIÓN: Comprueba que la etiqueta de una dirección .onion v3 codifica una clave pública con una suma de control
+               y una versión correctas.
+* ARGS_IN:
+    - etiqueta: 56 caracteres en base32 que preceden a ".onion", en minúsculas.
+* ARGS_OUT:
+    - True si la dirección es válida.
+'''
+@lru_cache(maxsize=65536)
+def onion_valido(etiqueta):
+    try:
+        datos = base64.b32decode(etiqueta.upper())
+    except ValueError:
+        return False
+    clave_publica, suma_control, version = datos[:32], datos[32:34], datos[34]
+    if version != VERSION_ONION:
+        return False
+    return hashlib.sha3_256(b".onion checksum" + clave_publica + bytes([version])).digest()[:2] == suma_control
+
+
+'''
+* FUNCIÓN: parametro_descartado
+* DESCRIPCIÓN: Comprueba si un parámetro de la query string debe eliminarse de la URL.
+* ARGS_IN:
+    - parametro: par "nombre=valor" de la query string.
+* ARGS_OUT:
+    - True si el parámetro no identifica el contenido.
+'''
+def parametro_descartado(parametro):
+    nombre = parametro.split('=', 1)[0].lower()
+    return nombre in PARAMETROS_DESCARTADOS or nombre.startswith(PREFIJOS_PARAMETROS_DESCARTADOS)
+
+
+'''
+* FUNCIÓN: normalizar_url
+* DESCRIPCIÓN: Obtiene la forma canónica de la URL de una página de un servicio oculto: esquema y host en minúsculas,
+               sin credenciales, puerto por defecto ni fragmento, ruta "/" si está vacía y query string sin
+               parámetros de seguimiento o sesión y con los demás ordenados.
+* ARGS_IN:
+    - url: URL absoluta.
+* ARGS_OUT:
+    - URL canónica. None, si no es una URL http(s) de un servicio oculto v3 válido.
+'''
+def normalizar_url(url):
+    # Descarte rápido de la mayoría de enlaces a la web convencional
+    if ".onion" not in url.lower():
+        return None
+    try:
+        partes = urlsplit(url)
+        puerto = partes.port
+    except ValueError:
+        return None
+
+    esquema = partes.scheme.lower()
+    host = (partes.hostname or "").rstrip('.')
+    if esquema not in PUERTOS_POR_DEFECTO:
+        return None
+    coincidencia = REGEX_HOST_ONION.match(host)
+    if not coincidencia or not onion_valido(coincidencia.group(1)):
+        return None
+
+    netloc = host if puerto in (None, PUERTOS_POR_DEFECTO[esquema]) else f"{host}:{puerto}"
+    query = '&'.join(sorted(parametro for parametro in partes.query.split('&') if parametro and not parametro_descartado(parametro)))
+    return urlunsplit((esquema, netloc, partes.path or "/", query, ""))
+
+
+'''
+* FUNCIÓN: normalizar_url_inicial
+* DESCRIPCIÓN: Obtiene la forma canónica de una URL inicial introducida por el usuario, que puede omitir el esquema.
+               Las URLs sin esquema se consideran http.
+* ARGS_IN:
+    - url: URL introducida por el usuario.
+* ARGS_OUT:
+    - URL canónica. None, si no es una URL http(s) de un servicio oculto v3 válido.
+'''
+def normalizar_url_inicial(url):
+    url = url.strip()
+    if "://" not in url:
+        url = "http://" + url
+    return normalizar_url(url)
+
+
+'''
+* FUNCIÓN: servicio_url
+* DESCRIPCIÓN: Obtiene el servicio oculto al que pertenece una URL canónica, sin subdominios ni puerto, para
+               repartir los límites del rastreo por servicio.
+* ARGS_IN:
+    - url: URL canónica.
+* ARGS_OUT:
+    - Dirección .onion del servicio.
+'''
+def servicio_url(url):
+    return (urlsplit(url).hostname or "")[-LONGITUD_HOST_ONION:]
@@ -0,0 +1,242 @@
+from collections import deque
+from threading import Lock
+from urllib.parse import urlsplit
+import heapq
+import time
+
+'''
+* CLASE: EstadoHost
+* DESCRIPCIÓN: Clase que almacena el estado de cortesía de un host: instante a partir del cual puede volver a
+               recibir peticiones, retardo actual entre peticiones y URLs aparcadas a la espera de ese instante.
+'''
+class EstadoHost():
+    def __init__(self, retardo_inicial):
+        self.instante_listo = 0.0
+        self.retardo = retardo_inicial
+        self.tiempo_respuesta_medio = None
+        self.num_en_curso = 0
+        self.urls_aparcadas = deque()
+
+
+'''
+* CLASE: PlanificadorHosts
+* DESCRIPCIÓN: Clase que planifica las visitas del crawler respetando un ritmo de peticiones independiente por host.
+               La frontera con prioridad omite los servicios cuyos hosts aún no están listos sin extraer sus URLs,
+               que conservan su prioridad; con la cola FIFO, las URLs de esos hosts se aparcan en orden de llegada y
+               se sigue extrayendo de la frontera. Así, las páginas de hosts distintos se despachan sin pausas
+               globales. El retardo de cada host se adapta a
+               sus tiempos de respuesta y se duplica tras cada error. Si se indica una caché de vitalidad, las URLs
+               de los hosts caídos se descartan sin despacharse.
+'''
+class PlanificadorHosts():
+    def __init__(self, retardo_minimo=1.0, retardo_maximo=60.0, factor_respuesta=2.0, max_peticiones_host=1,
+                 max_exploracion=1000, vitalidad_hosts=None):
+        self.retardo_minimo = retardo_minimo
+        self.retardo_maximo = retardo_maximo
+        # Multiplicador del tiempo de respuesta medio de un host para calcular su retardo
+        self.factor_respuesta = factor_respuesta
+        self.max_peticiones_host = max_peticiones_host
+        # Número máximo de URLs extraídas de la frontera en cada llamada a siguiente
+        self.max_exploracion = max_exploracion
+        # Caché de vitalidad de los hosts (Opcional). Las URLs de los hosts caídos se descartan sin despacharse
+        self.vitalidad_hosts = vitalidad_hosts
+
+        # Estado por host. Clave: host. Valor: EstadoHost
+        self.diccionario_host_estado = {}
+        # Montículo de tuplas (instante_listo, host) de los hosts con URLs aparcadas
+        self.monticulo_hosts = []
+        self.num_aparcadas = 0
+        # URLs descartadas por pertenecer a hosts caídos, pendientes de recoger con extraer_descartadas
+        self.lista_urls_descartadas = []
+        self.cerrojo = Lock()
+
+    '''
+    * FUNCIÓN: siguiente
+    * DESCRIPCIÓN: Devuelve la siguiente URL que puede visitarse sin incumplir el ritmo de su host. Se priorizan las
+                   URLs aparcadas de hosts que ya están listos y, después, se extraen URLs de la frontera, que omite
+                   las de hosts que no lo están si lo admite.
+    * ARGS_IN:
+        - frontera: frontera de rastreo de la que extraer nuevas URLs.
+    * ARGS_OUT:
+        - URL a visitar. None, si ningún host está listo.
+        - Segundos hasta que un host con URLs pendientes esté listo. None, si no se conoce ninguno en espera.
+    '''
+    def siguiente(self, frontera):
+        with self.cerrojo:
+            ahora = time.monotonic()
+
+            # URLs aparcadas de hosts que ya pueden recibir peticiones
+            while self.monticulo_hosts and self.monticulo_hosts[0][0] <= ahora:
+                _, host = heapq.heappop(self.monticulo_hosts)
+                estado = self.diccionario_host_estado[host]
+                if not estado.urls_aparcadas:
+                    continue
+                if estado.num_en_curso >= self.max_peticiones_host:
+                    # Se volverá a programar al registrar el resultado de la petición en curso
+                    continue
+                if estado.instante_listo > ahora:
+                    self.programar(host, estado)
+                    continue
+                if self.host_caido(host):
+                    self.descartar_aparcadas(estado)
+                    continue
+                url = estado.urls_aparcadas.popleft()
+                self.num_aparcadas -= 1
+                self.despachar(estado, ahora)
+                # Si el host conserva URLs aparcadas se vuelve a programar
+                if estado.urls_aparcadas:
+                    self.programar(host, estado)
+                return url, None
+
+            # Instante en que estará listo el primero de los hosts omitidos por la frontera
+            instante_omitidos = None
+
+            def url_lista(url):
+                nonlocal instante_omitidos
+                host = urlsplit(url).netloc.lower()
+                estado = self.diccionario_host_estado.get(host)
+                if estado is None or self.host_caido(host) or (not estado.urls_aparcadas and self.host_listo(estado, ahora)):
+                    return True
+                # Los hosts con peticiones en curso se vuelven a comprobar al registrar su resultado
+                if estado.num_en_curso < self.max_peticiones_host:
+                    instante_omitidos = estado.instante_listo if instante_omitidos is None else min(instante_omitidos, estado.instante_listo)
+                return False
+
+            # Nuevas URLs de la frontera
+            for _ in range(self.max_exploracion):
+                url = frontera.siguiente(url_lista, self.max_exploracion)
+                if url is None:
+                    break
+                host = urlsplit(url).netloc.lower()
+                if self.host_caido(host):
+                    self.lista_urls_descartadas.append(url)
+                    continue
+                estado = self.diccionario_host_estado.get(host)
+                if estado is None:
+                    estado = self.diccionario_host_estado[host] = EstadoHost(self.retardo_minimo)
+                if not estado.urls_aparcadas and self.host_listo(estado, ahora):
+                    self.despachar(estado, ahora)
+                    return url, None
+                # El host no está listo (frontera sin omisión de hosts): se aparca la URL y se continúa
+                estado.urls_aparcadas.append(url)
+                self.num_aparcadas += 1
+                if len(estado.urls_aparcadas) == 1:
+                    self.programar(host, estado)
+
+            instantes_espera = [self.monticulo_hosts[0][0]] if self.monticulo_hosts else []
+            if instante_omitidos is not None:
+                instantes_espera.append(instante_omitidos)
+            if instantes_espera:
+                return None, max(0.0, min(instantes_espera) - ahora)
+            return None, None
+
+    '''
+    * FUNCIÓN: registrar_resultado
+    * DESCRIPCIÓN: Actualiza el retardo de un host con el resultado de una petición y fija el instante a partir del
+                   cual puede recibir la siguiente.
+    * ARGS_IN:
+        - url: dirección de la página solicitada.
+        - tiempo_respuesta: segundos empleados en la petición.
+        - exito: True si el host ha respondido, False si se ha producido un error.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def registrar_resultado(self, url, tiempo_respuesta, exito):
+        host = urlsplit(url).netloc.lower()
+        with self.cerrojo:
+            estado = self.diccionario_host_estado.get(host)
+            if estado is None:
+                return
+            estado.num_en_curso = max(0, estado.num_en_curso - 1)
+
+            if exito:
+                if estado.tiempo_respuesta_medio is None:
+                    estado.tiempo_respuesta_medio = tiempo_respuesta
+                else:
+                    estado.tiempo_respuesta_medio = 0.3 * tiempo_respuesta + 0.7 * estado.tiempo_respuesta_medio
+                estado.retardo = self.factor_respuesta * estado.tiempo_respuesta_medio
+            else:
+                estado.retardo = 2 * estado.retardo
+                # Si el fallo ha hecho caer el host, sus URLs aparcadas se descartan sin esperar a su turno
+                if self.host_caido(host):
+                    self.descartar_aparcadas(estado)
+            estado.retardo = min(self.retardo_maximo, max(self.retardo_minimo, estado.retardo))
+
+            estado.instante_listo = time.monotonic() + estado.retardo
+            if estado.urls_aparcadas:
+                self.programar(host, estado)
+
+    '''
+    * FUNCIÓN: host_listo
+    * DESCRIPCIÓN: Comprueba si un host puede recibir una nueva petición.
+    * ARGS_IN:
+        - estado: EstadoHost del host.
+        - ahora: instante actual (time.monotonic).
+    * ARGS_OUT:
+        - True si el host está listo.
+    '''
+    def host_listo(self, estado, ahora):
+        return estado.instante_listo <= ahora and estado.num_en_curso < self.max_peticiones_host
+
+    '''
+    * FUNCIÓN: despachar
+    * DESCRIPCIÓN: Registra el envío de una petición a un host. Mientras no se registre su resultado, el host no
+                   vuelve a estar listo hasta pasado su retardo actual.
+    * ARGS_IN:
+        - estado: EstadoHost del host.
+        - ahora: instante actual (time.monotonic).
+    * ARGS_OUT:
+        - N/A
+    '''
+    def despachar(self, estado, ahora):
+        estado.num_en_curso += 1
+        estado.instante_listo = ahora + estado.retardo
+
+    '''
+    * FUNCIÓN: host_caido
+    * DESCRIPCIÓN: Comprueba en la caché de vitalidad, si se ha configurado, si un host está caído.
+    * ARGS_IN:
+        - host: host a comprobar.
+    * ARGS_OUT:
+        - True si el host está caído.
+    '''
+    def host_caido(self, host):
+        return self.vitalidad_hosts is not None and self.vitalidad_hosts.host_caido(host)
+
+    '''
+    * FUNCIÓN: descartar_aparcadas
+    * DESCRIPCIÓN: Descarta todas las URLs aparcadas de un host. Debe llamarse con el cerrojo adquirido.
+    * ARGS_IN:
+        - estado: EstadoHost del host.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def descartar_aparcadas(self, estado):
+        self.lista_urls_descartadas.extend(estado.urls_aparcadas)
+        self.num_aparcadas -= len(estado.urls_aparcadas)
+        estado.urls_aparcadas.clear()
+
+    '''
+    * FUNCIÓN: extraer_descartadas
+    * DESCRIPCIÓN: Devuelve las URLs descartadas por pertenecer a hosts caídos desde la llamada anterior.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Lista de URLs descartadas.
+    '''
+    def extraer_descartadas(self):
+        with self.cerrojo:
+            lista_urls_descartadas, self.lista_urls_descartadas = self.lista_urls_descartadas, []
+        return lista_urls_descartadas
+
+    '''
+    * FUNCIÓN: programar
+    * DESCRIPCIÓN: Añade un host con URLs aparcadas al montículo de hosts en espera.
+    * ARGS_IN:
+        - host: host a programar.
+        - estado: EstadoHost del host.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def programar(self, host, estado):
+        heapq.heappush(self.monticulo_hosts, (estado.instante_listo, host))
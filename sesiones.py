@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from threading import Lock
+from urllib.parse import urlsplit
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+'''
+* CLASE: PoolSesiones
+* DESCRIPCIÓN: Clase que gestiona un conjunto de sesiones HTTP persistentes (keep-alive), una por cada host visitado.
+               Las peticiones sucesivas a un mismo servicio oculto reutilizan las conexiones ya establecidas a través
+               del proxy SOCKS, evitando repetir el establecimiento del circuito. Si un host pasa a cursarse por
+               otro proxy (circuito), se le asigna una sesión nueva. El número de sesiones y el número de
+               conexiones por sesión están acotados, y las sesiones inactivas se cierran.
+'''
+class PoolSesiones():
+    def __init__(self, user_agent, max_sesiones=256, max_conexiones_host=4, tiempo_max_inactividad=300):
+        self.user_agent = user_agent
+        self.max_sesiones = max_sesiones
+        self.max_conexiones_host = max_conexiones_host
+        self.tiempo_max_inactividad = tiempo_max_inactividad
+
+        # Sesiones abiertas ordenadas de menos a más recientemente utilizada.
+        # Clave: tupla (host, proxy). Valor: tupla (sesión, instante del último uso)
+        self.diccionario_sesiones = OrderedDict()
+        self.cerrojo = Lock()
+
+        # Estadísticas de reutilización de las sesiones
+        self.num_aciertos = 0
+        self.num_fallos = 0
+        self.num_expulsiones = 0
+
+    '''
+    * FUNCIÓN: obtener_sesion
+    * DESCRIPCIÓN: Devuelve la sesión asociada al host de una URL y al proxy indicado, creándola si no existe.
+                   Antes se cierran las sesiones inactivas y, si se supera el número máximo de sesiones, la menos
+                   recientemente utilizada.
+    * ARGS_IN:
+        - url: dirección de la página a solicitar.
+        - proxies: diccionario de proxies de requests por el que cursar las peticiones.
+    * ARGS_OUT:
+        - Objeto requests.Session asociado al host de la URL.
+    '''
+    def obtener_sesion(self, url, proxies):
+        clave = (urlsplit(url).netloc.lower(), proxies.get('http'))
+        ahora = time.monotonic()
+        with self.cerrojo:
+            self.expulsar_inactivas(ahora)
+
+            if clave in self.diccionario_sesiones:
+                self.num_aciertos += 1
+                sesion, _ = self.diccionario_sesiones.pop(clave)
+            else:
+                self.num_fallos += 1
+                sesion = self.crear_sesion(proxies)
+                if len(self.diccionario_sesiones) >= self.max_sesiones:
+                    _, (sesion_expulsada, _) = self.diccionario_sesiones.popitem(last=False)
+                    sesion_expulsada.close()
+                    self.num_expulsiones += 1
+
+            self.diccionario_sesiones[clave] = (sesion, ahora)
+            return sesion
+
+    '''
+    * FUNCIÓN: crear_sesion
+    * DESCRIPCIÓN: Crea una sesión HTTP configurada con el proxy de TOR y un pool de conexiones acotado.
+    * ARGS_IN:
+        - proxies: diccionario de proxies de requests de la sesión.
+    * ARGS_OUT:
+        - Objeto requests.Session.
+    '''
+    def crear_sesion(self, proxies):
+        sesion = requests.Session()
+        sesion.proxies.update(proxies)
+        sesion.headers['User-Agent'] = self.user_agent
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_conexiones_host)
+        sesion.mount('http://', adaptador)
+        sesion.mount('https://', adaptador)
+        return sesion
+
+    '''
+    * FUNCIÓN: expulsar_inactivas
+    * DESCRIPCIÓN: Cierra las sesiones que llevan más tiempo sin utilizarse que el máximo permitido.
+                   Debe llamarse con el cerrojo adquirido.
+    * ARGS_IN:
+        - ahora: instante actual (time.monotonic).
+    * ARGS_OUT:
+        - N/A
+    '''
+    def expulsar_inactivas(self, ahora):
+        while self.diccionario_sesiones:
+            clave, (sesion, ultimo_uso) = next(iter(self.diccionario_sesiones.items()))
+            if ahora - ultimo_uso < self.tiempo_max_inactividad:
+                break
+            del self.diccionario_sesiones[clave]
+            sesion.close()
+            self.num_expulsiones += 1
+
+    '''
+    * FUNCIÓN: estadisticas
+    * DESCRIPCIÓN: Devuelve las estadísticas de uso del pool de sesiones.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Diccionario con el número de aciertos, fallos, expulsiones y sesiones abiertas.
+    '''
+    def estadisticas(self):
+        with self.cerrojo:
+            return {"aciertos": self.num_aciertos, "fallos": self.num_fallos,
+                    "expulsiones": self.num_expulsiones, "sesiones_abiertas": len(self.diccionario_sesiones)}
+
+    '''
+    * FUNCIÓN: cerrar
+    * DESCRIPCIÓN: Cierra todas las sesiones abiertas del pool.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar(self):
+        with self.cerrojo:
+            for sesion, _ in self.diccionario_sesiones.values():
+                sesion.close()
+            self.diccionario_sesiones.clear()
@@ -0,0 +1,212 @@
+from functools import lru_cache
+import hashlib
+import math
+
+'''
+* DESCRIPCIÓN: Validación nativa de direcciones Bitcoin: suma de verificación Base58Check para direcciones P2PKH y
+               P2SH, y Bech32/Bech32m (BIP173/BIP350) para direcciones SegWit y Taproot. Reproduce el veredicto de
+               bitcoinlib.keys.Address.parse sin construir objetos ni lanzar excepciones por candidato, salvo en
+               los casos excepcionales que se delegan en bitcoinlib, y guarda los veredictos en una caché LRU
+               acotada compartida por todo el rastreo.
+'''
+
+ALFABETO_BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+DICCIONARIO_BASE58 = {caracter: valor for valor, caracter in enumerate(ALFABETO_BASE58)}
+# bitcoinlib interpreta las mayúsculas fuera del alfabeto como su minúscula
+DICCIONARIO_BASE58.update({'I': DICCIONARIO_BASE58['i'], 'O': DICCIONARIO_BASE58['o']})
+
+ALFABETO_BECH32 = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+DICCIONARIO_BECH32 = {caracter: valor for valor, caracter in enumerate(ALFABETO_BECH32)}
+GENERADORES_BECH32 = (0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3)
+CONSTANTE_BECH32 = 1
+CONSTANTE_BECH32M = 0x2bc830a3
+
+# Longitud mínima en bytes de una dirección Base58Check decodificada (prefijo + hash + suma de verificación)
+LONGITUD_MINIMA_BASE58 = 25
+# Prefijos Base58 de las direcciones P2PKH (0x00) y P2SH (0x05) de Bitcoin
+PREFIJOS_BASE58 = (0x00, 0x05)
+# Prefijos legibles (HRP) de direcciones Bech32 conocidos por bitcoinlib
+PREFIJOS_BECH32 = ("bc", "tb", "ltc", "tltc", "blt")
+
+# Número máximo de veredictos almacenados en la caché
+TAMANO_CACHE_VALIDACION = 65536
+
+
+'''
+* FUNCIÓN: decodificar_base58
+* DESCRIPCIÓN: Decodifica una cadena Base58 a bytes conservando un byte nulo por cada '1' inicial y completando
+               con ceros a la izquierda hasta la longitud mínima de una dirección, como bitcoinlib.
+* ARGS_IN:
+    - cadena: cadena codificada en Base58.
+* ARGS_OUT:
+    - bytes decodificados. None, si la cadena contiene caracteres fuera del alfabeto Base58.
+'''
+def decodificar_base58(cadena):
+    valor = 0
+    for caracter in cadena:
+        digito = DICCIONARIO_BASE58.get(caracter)
+        if digito is None:
+            return None
+        valor = valor * 58 + digito
+    decodificado = valor.to_bytes((valor.bit_length() + 7) // 8, 'big')
+
+    # bitcoinlib deja de añadir los ceros iniciales si la longitud coincide con la longitud esperada de la salida
+    longitud_esperada = len(cadena) / math.log(256, 58)
+    for _ in range(len(cadena) - len(cadena.lstrip('1'))):
+        if longitud_esperada != len(decodificado):
+            decodificado = b'\x00' + decodificado
+
+    return decodificado.rjust(LONGITUD_MINIMA_BASE58, b'\x00')
+
+
+'''
+* FUNCIÓN: base58check_valida
+* DESCRIPCIÓN: Comprueba la suma de verificación Base58Check de una dirección decodificada.
+* ARGS_IN:
+    - decodificado: bytes de la dirección decodificada.
+* ARGS_OUT:
+    - True si la suma de verificación es correcta.
+'''
+def base58check_valida(decodificado):
+    suma_verificacion = hashlib.sha256(hashlib.sha256(decodificado[:-4]).digest()).digest()[:4]
+    return suma_verificacion == decodificado[-4:]
+
+
+'''
+* FUNCIÓN: calcular_tabla_generadores
+* DESCRIPCIÓN: Calcula, para cada combinación de los 5 bits superiores del polimódulo Bech32, el XOR de los
+               generadores correspondientes, de modo que cada paso del polimódulo requiere una única consulta.
+* ARGS_IN:
+    - N/A
+* ARGS_OUT:
+    - tupla de 32 enteros.
+'''
+def calcular_tabla_generadores():
+    tabla = []
+    for bits_superiores in range(32):
+        valor = 0
+        for i in range(5):
+            if (bits_superiores >> i) & 1:
+                valor ^= GENERADORES_BECH32[i]
+        tabla.append(valor)
+    return tuple(tabla)
+
+
+TABLA_GENERADORES_BECH32 = calcular_tabla_generadores()
+
+
+'''
+* FUNCIÓN: polimodulo_bech32
+* DESCRIPCIÓN: Calcula el polimódulo BCH de la especificación Bech32 sobre una lista de valores de 5 bits.
+* ARGS_IN:
+    - valores: lista de enteros de 5 bits.
+* ARGS_OUT:
+    - valor del polimódulo.
+'''
+def polimodulo_bech32(valores):
+    chk = 1
+    for valor in valores:
+        chk = ((chk & 0x1ffffff) << 5) ^ valor ^ TABLA_GENERADORES_BECH32[chk >> 25]
+    return chk
+
+
+'''
+* FUNCIÓN: decodificar_bech32
+* DESCRIPCIÓN: Decodifica una dirección SegWit comprobando su suma de verificación Bech32/Bech32m (BIP173/BIP350),
+               el relleno del programa de testigo y las longitudes admitidas por bitcoinlib.
+* ARGS_IN:
+    - direccion: dirección codificada en Bech32 o Bech32m.
+* ARGS_OUT:
+    - Versión de testigo. None, si la dirección no es válida.
+    - Longitud en bytes del programa de testigo.
+'''
+def decodificar_bech32(direccion):
+    if any(ord(caracter) < 33 or ord(caracter) > 126 for caracter in direccion):
+        return None, 0
+    if direccion.lower() != direccion and direccion.upper() != direccion:
+        return None, 0
+    direccion = direccion.lower()
+    posicion = direccion.rfind('1')
+    if posicion < 1 or posicion + 7 > len(direccion) or len(direccion) > 90:
+        return None, 0
+
+    hrp = direccion[:posicion]
+    datos = [DICCIONARIO_BECH32.get(caracter) for caracter in direccion[posicion + 1:]]
+    if None in datos:
+        return None, 0
+
+    hrp_expandido = [ord(caracter) >> 5 for caracter in hrp] + [0] + [ord(caracter) & 31 for caracter in hrp]
+    constante = polimodulo_bech32(hrp_expandido + datos)
+    version = datos[0]
+    # La versión 0 usa Bech32 y el resto Bech32m
+    if constante != (CONSTANTE_BECH32 if version == 0 else CONSTANTE_BECH32M):
+        return None, 0
+
+    # Conversión del programa de testigo de grupos de 5 bits a bytes, sin relleno
+    acumulador = 0
+    num_bits = 0
+    num_bytes = 0
+    for valor in datos[1:-6]:
+        acumulador = ((acumulador << 5) | valor) & 0xfff
+        num_bits += 5
+        if num_bits >= 8:
+            num_bits -= 8
+            num_bytes += 1
+    if num_bits >= 5 or ((acumulador << (8 - num_bits)) & 0xff):
+        return None, 0
+
+    if num_bytes < 2 or num_bytes > 40 or version > 16:
+        return None, 0
+    if version == 0 and num_bytes not in (20, 32):
+        return None, 0
+    return version, num_bytes
+
+
+'''
+* FUNCIÓN: validar_con_bitcoinlib
+* DESCRIPCIÓN: Valida una dirección con bitcoinlib.keys.Address.parse. Solo se utiliza para los casos excepcionales
+               con suma de verificación correcta pero formato no estándar (prefijos Base58 de otras redes o
+               programas de testigo de longitud atípica), cuyo veredicto depende de la construcción del objeto.
+* ARGS_IN:
+    - direccion: candidato a dirección Bitcoin.
+* ARGS_OUT:
+    - True si la dirección es válida.
+'''
+def validar_con_bitcoinlib(direccion):
+    from bitcoinlib.keys import Address
+    try:
+        Address.parse(direccion)
+        return True
+    # Además de EncodingError, bitcoinlib lanza otros errores (por ejemplo, NetworkError) con prefijos desconocidos
+    except Exception:
+        return False
+
+
+'''
+* FUNCIÓN: direccion_valida
+* DESCRIPCIÓN: Comprueba si un candidato es una dirección Bitcoin válida, con el mismo veredicto que Address.parse.
+               Los veredictos se memorizan en una caché LRU acotada, de modo que las direcciones repetidas en varias
+               páginas solo se validan una vez.
+* ARGS_IN:
+    - direccion: candidato a dirección Bitcoin.
+* ARGS_OUT:
+    - True si la dirección es válida.
+'''
+@lru_cache(maxsize=TAMANO_CACHE_VALIDACION)
+def direccion_valida(direccion):
+    # Como en Address.parse, las direcciones con prefijo Bech32 no se interpretan como Base58
+    if direccion[:3].split("1")[0] not in PREFIJOS_BECH32:
+        decodificado = decodificar_base58(direccion)
+        if decodificado is not None and base58check_valida(decodificado):
+            # P2PKH y P2SH de Bitcoin
+            if len(decodificado) == LONGITUD_MINIMA_BASE58 and decodificado[0] in PREFIJOS_BASE58:
+                return True
+            return validar_con_bitcoinlib(direccion)
+
+    # Si la decodificación Base58 falla, Address.parse intenta la decodificación Bech32
+    version, num_bytes = decodificar_bech32(direccion)
+    if version is None:
+        return False
+    if num_bytes in (20, 32, 40) and direccion[:direccion.rfind('1')] == "bc":
+        return True
+    return validar_con_bitcoinlib(direccion)
@@ -1,15 +1,20 @@
 import sys
+import os
+import sqlite3
 import customtkinter as ctk
-from tkinter import messagebox
-from threading import Thread, Event
+from tkinter import messagebox, filedialog
+from threading import Event
 import queue
-import requests
-from bs4 import BeautifulSoup
-import re
-from urllib.parse import urljoin
-from bitcoinlib.keys import Address
-from bitcoinlib.encoding import EncodingError
-import time
+from crawler import HiloCrawler
+from normalizacion_urls import normalizar_url_inicial
+
+# Número máximo de mensajes en la cola de comunicación con el hilo de rastreo. Al alcanzarse, el hilo descarta los
+# mensajes de estado y espera a la interfaz para enviar el resto
+TAMANO_MAXIMO_COLA = 1000
+# Milisegundos entre dos lecturas de la cola de comunicación
+INTERVALO_LECTURA_COLA = 100
+# Fichero opcional en el que conservar entre rastreos la latencia de los hosts y los hosts caídos
+RUTA_CACHE_HOSTS = os.environ.get("TOR_CRAWLING_CACHE_HOSTS")
 
 
 '''
@@ -28,7 +33,12 @@ class VentanaEmergenteProgreso(ctk.CTkToplevel):
         # Llamar a la función que cancela el rastreo si se cierra desde la "X" superior la ventana
         self.protocol("WM_DELETE_WINDOW", self.cancelar_rastreo)
 
-        self.label_estado = ctk.CTkLabel(self, text="Iniciando conexión con la red TOR", wraplength=450, font=("Arial", 15))
+        # Estado y número de monederos mostrados, para reconfigurar las etiquetas solo cuando cambian
+        self.estado = "Iniciando conexión con la red TOR"
+        self.num_monederos_encontrados = 0
+        self.num_min_monederos = num_min_monederos
+
+        self.label_estado = ctk.CTkLabel(self, text=self.estado, wraplength=450, font=("Arial", 15))
         self.label_estado.pack(pady=10, padx=10)
 
         # Barra de progreso de la ventana
@@ -40,22 +50,37 @@ class VentanaEmergenteProgreso(ctk.CTkToplevel):
         self.label_monederos_encontrados = ctk.CTkLabel(self, text=f"Monederos encontrados: 0 / {num_min_monederos}", font=("Arial", 14))
         self.label_monederos_encontrados.pack(pady=5, padx=10)
 
+        frame_botones = ctk.CTkFrame(self, fg_color="transparent")
+        frame_botones.pack(pady=10)
+
+        # Cuando es pulsado, el botón de resultados muestra los monederos encontrados hasta el momento sin detener el rastreo
+        self.boton_resultados = ctk.CTkButton(frame_botones, text="Ver monederos", command=self.controller.mostrar_resultados_parciales)
+        self.boton_resultados.pack(side="left", padx=10)
+
         # Cuando es pulsado, el botón de cancelar llama a la función que finaliza la ejecución del rastreo
-        self.boton_cancelar = ctk.CTkButton(self, text="Cancelar", command=self.cancelar_rastreo, fg_color="red", hover_color="#C00000")
-        self.boton_cancelar.pack(pady=10)
+        self.boton_cancelar = ctk.CTkButton(frame_botones, text="Cancelar", command=self.cancelar_rastreo, fg_color="red", hover_color="#C00000")
+        self.boton_cancelar.pack(side="left", padx=10)
 
     '''
     * FUNCIÓN: actualizar_progreso
-    * DESCRIPCIÓN: Actualiza la información para mostrar en la ventana emergente durante el proceso de rastreo.
+    * DESCRIPCIÓN: Actualiza la información para mostrar en la ventana emergente durante el proceso de rastreo. Solo
+                   se reconfiguran los elementos cuyo valor ha cambiado.
     * ARGS_IN:
-        - estado: texto del estado para mostrar en la ventana de progreso.
+        - estado: texto del estado para mostrar en la ventana de progreso. None, para mantener el actual.
         - num_monederos_encontrados: número de monederos Bitcoin que se han encontrado hasta el momento.
         - num_min_monederos: número mínimo de monederos Bitcoin a encontrar solicitados por el usuario.
     * ARGS_OUT:
         - N/A
     '''
     def actualizar_progreso(self, estado, num_monederos_encontrados, num_min_monederos):
-        self.label_estado.configure(text=estado)
+        if estado is not None and estado != self.estado:
+            self.estado = estado
+            self.label_estado.configure(text=estado)
+
+        if (num_monederos_encontrados, num_min_monederos) == (self.num_monederos_encontrados, self.num_min_monederos):
+            return
+        self.num_monederos_encontrados = num_monederos_encontrados
+        self.num_min_monederos = num_min_monederos
         self.label_monederos_encontrados.configure(text=f"Monederos encontrados: {num_monederos_encontrados} / {num_min_monederos}")
         
         # Actualización de la barra de progreso
@@ -75,190 +100,12 @@ class VentanaEmergenteProgreso(ctk.CTkToplevel):
         - N/A
     '''
     def cancelar_rastreo(self):
-        self.label_estado.configure(text="Cancelando rastreo. Esperando a que el hilo termine.")
+        self.actualizar_progreso("Cancelando rastreo. Esperando a que el hilo termine.", self.num_monederos_encontrados,
+                                 self.num_min_monederos)
         self.boton_cancelar.configure(state="disabled")
         self.controller.detener_crawler()
         
         
-'''
-* CLASE: HiloCrawler
-* DESCRIPCIÓN: Clase que implementa el hilo de ejecución del proceso de rastreo de monederos Bitcoin en la red TOR.
-'''
-class HiloCrawler(Thread):
-    def __init__(self, urls, num_min_monederos, cola_comunicacion, evento_parada):
-        super().__init__(daemon=True)
-        # Parámetros del crawler
-        self.lista_urls_a_visitar = list(urls)
-        self.num_min_monederos = num_min_monederos
-        self.set_urls_visitadas = set()
-        self.set_direcciones_bitcoin_encontradas = set()
-        self.diccionario_url_direcciones_bitcoin = {}
-        # Canales de comunicación con la rutina principal
-        self.cola_comunicacion = cola_comunicacion
-        self.evento_parada = evento_parada
-        
-        # Proxies para redirigir el tráfico a través del servicio TOR
-        self.PROXIES = {'http': 'socks5h://localhost:9050', 'https': 'socks5h://localhost:9050'}
-        
-        self.USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; rv:109.0) Gecko/20100101 Firefox/115.0"
-        
-        # Expresiones regulares para localización de monederos Bitcoin en las páginas visitadas
-        self.REGEX_BITCOIN = [re.compile(r"\b[1][a-km-zA-HJ-NP-Z1-9]{25,34}\b"),  # P2PKH (empiezan por 1)
-                              re.compile(r"\b[3][a-km-zA-HJ-NP-Z1-9]{25,34}\b"),  # P2SH (empiezan por 3)
-                              re.compile(r"\bbc1q[ac-hj-np-z02-9]{39,59}\b"),     # Bech32 (empiezan por bc1q)
-                              re.compile(r"\bbc1p[ac-hj-np-z02-9]{39,59}\b")]     # Bech32m (empiezan por bc1p)] 
-    '''
-    * FUNCIÓN: run
-    * DESCRIPCIÓN: Rutina ejecutada por el hilo que implementa el rastreo en la red TOR.
-    * ARGS_IN:
-        - N/A
-    * ARGS_OUT:
-        - N/A
-    '''
-    def run(self):
-        try:
-            # Verificación de la conexión a la red TOR
-            self.verificar_conexion_tor()
-
-            # Bucle principal de rastreo
-            while len(self.lista_urls_a_visitar) > 0 and len(self.set_direcciones_bitcoin_encontradas) < self.num_min_monederos:
-                #  Comprobar si se ha solicitado detener el hilo
-                if self.evento_parada.is_set():
-                    # Se comunica a la rutina principal que se ha cancelado la ejecución
-                    self.cola_comunicacion.put(("cancelado", "Cerrando hilo de rastreo"))
-                    return
-
-                url_actual = self.lista_urls_a_visitar.pop(0)
-                if url_actual in self.set_urls_visitadas:
-                    continue
-                # Se comunica a la rutina principal la URL que se está procesando
-                self.cola_comunicacion.put(("estado", f"Procesando: {url_actual}"))
-                self.set_urls_visitadas.add(url_actual)
-
-                # Se obtiene el HTML de la página visitada
-                html = self.obtener_html(url_actual)
-                if html:
-                    # Se procesa el HTML para buscar monederos en el código y nuevos enlaces para visitar
-                    set_direcciones_bitcoin_pagina_actual, set_nuevos_enlaces = self.procesar_y_extraer_enlaces(html, url_actual)
-                    
-                    if set_direcciones_bitcoin_pagina_actual:                     
-                        # Se añaden el total de direcciones Bitcoin encontradas en la página al diccionario de resultados
-                        self.diccionario_url_direcciones_bitcoin[url_actual] = list(set_direcciones_bitcoin_pagina_actual)
-                        
-                        # Si al menos una de los monederos no había sido rastreado previamente, se actualiza el
-                        # el conjunto total de monederos encontrados en el rastreo y 
-                        # la barra de progreso de la ventana de progreso de la rutina principal
-                        if len(set_direcciones_bitcoin_pagina_actual-self.set_direcciones_bitcoin_encontradas) > 0:
-                            self.set_direcciones_bitcoin_encontradas.update(set_direcciones_bitcoin_pagina_actual)
-                            self.cola_comunicacion.put(("monedero_encontrado", len(self.set_direcciones_bitcoin_encontradas)))
-                    
-                    # Añadir los enlaces encontrados a la lista de URLs si no ha sido visitada
-                    for enlace in set_nuevos_enlaces:
-                        if enlace not in self.set_urls_visitadas and enlace not in self.lista_urls_a_visitar:
-                            self.lista_urls_a_visitar.append(enlace)
-                
-                time.sleep(0.2)
-
-            # Envío de resultados a la rutina principal de la aplicación
-            self.cola_comunicacion.put(("terminado", self.diccionario_url_direcciones_bitcoin))
-
-        except ConnectionError as e:
-            self.cola_comunicacion.put(("error_conexion", str(e)))
-        
-        # Error genérico
-        except Exception as e:
-            self.cola_comunicacion.put(("error", str(e)))
-
-    '''
-    * FUNCIÓN: verificar_conexion_tor
-    * DESCRIPCIÓN: Comprueba que el tráfico es cursado a través de la red TOR utilizando la API de comprobación
-                   de TOR Project, que devuelve True si la petición es recibida desde un nodo de salida de dicha red.
-    * ARGS_IN:
-        - N/A
-    * ARGS_OUT:
-        - N/A
-    '''   
-    def verificar_conexion_tor(self):
-        try:      
-            respuesta_ip = requests.get("https://check.torproject.org/api/ip", proxies=self.PROXIES, timeout=20)
-            if not respuesta_ip.json().get("IsTor"):
-                raise ConnectionError("La IP utilizada no pertenece a TOR.")
-        except requests.exceptions.RequestException as e:
-            raise ConnectionError(f"No se pudo conectar con la API de verificación de TOR ({e})")
-    
-    '''
-    * FUNCIÓN: obtener_html
-    * DESCRIPCIÓN: Obtiene el código HTML de una dirección URL.
-    * ARGS_IN:
-        - url: dirección de la página.
-    * ARGS_OUT:
-        - HTML de la página. None, si el Content-Type no es text/html o si se produce algún tipo de error en la conexión.
-    ''' 
-    def obtener_html(self, url):
-        try:
-            head_response = requests.head(url, proxies=self.PROXIES, headers={'User-Agent': self.USER_AGENT}, timeout=20, allow_redirects=True)
-            head_response.raise_for_status()
-
-            content_type = head_response.headers.get('Content-Type', '').lower()
-            # Si la cabecera HEAD no contiene html, se omiten los pasos adicionales para esa URL
-            if 'text/html' not in content_type:
-                return None
-
-            response = requests.get(url, proxies=self.PROXIES, headers={'User-Agent': self.USER_AGENT}, timeout=30)
-            response.raise_for_status()
-            return response.content.decode('utf-8', errors='replace')
-    
-        except requests.exceptions.RequestException as e:
-            return None
-    '''
-    * FUNCIÓN: encontrar_direcciones_bitcoin
-    * DESCRIPCIÓN: Busca direcciones Bitcoin en un texto.
-    * ARGS_IN:
-        - texto: Texto en el que buscar monederos.
-    * ARGS_OUT:
-        - set con las direcciones de monederos Bitcoin encontrados en el texto.
-    '''
-    def encontrar_direcciones_bitcoin(self, texto):
-        set_direcciones_bitcoin_texto = set()
-        for regex in self.REGEX_BITCOIN:
-            # Comprobación de las expresiones regulares
-            set_direcciones_bitcoin_texto.update(regex.findall(texto.strip()))
-        if len(set_direcciones_bitcoin_texto) > 0:
-            for direccion_monedero in list(set_direcciones_bitcoin_texto):
-                try:
-                    # Comprobación de la sintaxis del candidato a monedero
-                    Address.parse(direccion_monedero)
-                except EncodingError:
-                    # Es eliminado si la validación es errónea
-                    set_direcciones_bitcoin_texto.remove(direccion_monedero)
-        
-        return set_direcciones_bitcoin_texto
-
-    '''
-    * FUNCIÓN: procesar_y_extraer_enlaces
-    * DESCRIPCIÓN: Procesa código HTML y busca direcciones Bitcoin y nuevos enlaces para visitar.
-    * ARGS_IN:
-        - html: código HTML de la página.
-        - url_base: URL del dominio del cuál se está procesando la página.
-    * ARGS_OUT:
-        - set con las direcciones de monederos Bitcoin encontrados en el texto.
-        - set con los enlaces a otras páginas encontrados en el código.
-    '''
-    def procesar_y_extraer_enlaces(self, html, url_base):
-        if not html: 
-            return set(), set()
-        set_direcciones_bitcoin = set()
-        soup = BeautifulSoup(html, 'lxml')
-        set_direcciones_bitcoin.update(self.encontrar_direcciones_bitcoin(soup.get_text(separator=' ')))
-        set_enlaces = set()
-        for link in soup.find_all('a', href=True):
-            if link['href']:
-                url = urljoin(url_base, link['href'])
-                if ".onion" in url:
-                    set_enlaces.add(url)
-        return set_direcciones_bitcoin, set_enlaces
-
-
 '''
 * CLASE: VentanaCrawler
 * DESCRIPCIÓN: Clase que implementa la ventana de configuración del crawler.
@@ -272,7 +119,12 @@ class VentanaCrawler(ctk.CTkFrame):
         self.hilo_crawler = None
         self.ventana_progreso = None
         self.evento_parada = Event()
-        self.cola_comunicacion = queue.Queue()
+        self.cola_comunicacion = queue.Queue(maxsize=TAMANO_MAXIMO_COLA)
+
+        # Estado del rastreo en curso mostrado en la ventana de progreso
+        self.num_min_monederos = 0
+        self.num_monederos_encontrados = 0
+        self.ventana_resultados = None
 
         # Encabezado de la página
         frame_encabezado = ctk.CTkFrame(self)
@@ -291,11 +143,44 @@ class VentanaCrawler(ctk.CTkFrame):
         self.entrada_num_min_monederos = ctk.CTkEntry(self, placeholder_text="Ej: 5", font=("Arial", 18))
         self.entrada_num_min_monederos.pack(pady=1)
 
-        self.label_urls = ctk.CTkLabel(self, text="URLs de páginas web (una por línea):", font=("Arial", 20)).pack(pady=40)
+        self.label_peticiones = ctk.CTkLabel(self, text="Número de peticiones simultáneas (opcional):", font=("Arial", 20)).pack(pady=(30, 10))
+
+        # Entrada para el número de peticiones simultáneas a través de TOR. Si se deja vacía, se rastrea secuencialmente
+        self.entrada_num_peticiones = ctk.CTkEntry(self, placeholder_text="Ej: 32", font=("Arial", 18))
+        self.entrada_num_peticiones.pack(pady=1)
+
+        self.label_procesos = ctk.CTkLabel(self, text="Número de procesos de análisis de páginas (opcional):", font=("Arial", 20)).pack(pady=(30, 10))
+
+        # Entrada para el número de procesos que analizan las páginas descargadas. Si se deja vacía, se analizan en el hilo de rastreo
+        self.entrada_num_procesos = ctk.CTkEntry(self, placeholder_text="Ej: 4", font=("Arial", 18))
+        self.entrada_num_procesos.pack(pady=1)
+
+        self.label_limites = ctk.CTkLabel(self, text="Páginas por servicio y profundidad máximas (opcional):", font=("Arial", 20)).pack(pady=(30, 10))
+
+        # Entradas para los límites del rastreo. Si se dejan vacías, no se limita el número de páginas de cada servicio
+        # oculto ni el número de enlaces seguidos desde las URLs iniciales
+        frame_limites = ctk.CTkFrame(self, fg_color="transparent")
+        frame_limites.pack(pady=1)
+        self.entrada_max_paginas_servicio = ctk.CTkEntry(frame_limites, placeholder_text="Ej: 500", font=("Arial", 18))
+        self.entrada_max_paginas_servicio.pack(side="left", padx=(0, 10))
+        self.entrada_profundidad_maxima = ctk.CTkEntry(frame_limites, placeholder_text="Ej: 5", font=("Arial", 18))
+        self.entrada_profundidad_maxima.pack(side="left")
+
+        self.label_urls = ctk.CTkLabel(self, text="URLs de páginas web (una por línea):", font=("Arial", 20)).pack(pady=(30, 10))
         
         # Entrada para las URL iniciales de búsqueda
-        self.entrada_urls = ctk.CTkTextbox(self, height=250, width=1200, font=("Arial", 18))
+        self.entrada_urls = ctk.CTkTextbox(self, height=200, width=1200, font=("Arial", 18))
         self.entrada_urls.pack(pady=5)
+
+        self.label_almacen = ctk.CTkLabel(self, text="Fichero de estado para guardar o reanudar el rastreo (opcional):", font=("Arial", 20)).pack(pady=(30, 10))
+
+        # Entrada para la ruta del fichero de estado del rastreo y botón para seleccionarlo
+        frame_almacen = ctk.CTkFrame(self, fg_color="transparent")
+        frame_almacen.pack(pady=1)
+        self.entrada_ruta_almacen = ctk.CTkEntry(frame_almacen, placeholder_text="Ej: rastreo.db", width=600, font=("Arial", 18))
+        self.entrada_ruta_almacen.pack(side="left", padx=(0, 10))
+        boton_examinar = ctk.CTkButton(frame_almacen, text="Examinar", width=100, font=("Arial", 18), command=self.seleccionar_almacen)
+        boton_examinar.pack(side="left")
         
         # Cuando es pulsado, el botón inicia el rastreo en la red TOR
         self.boton_busqueda = ctk.CTkButton(self, text="Iniciar búsqueda en TOR", font=("Arial", 20, "bold"), command=self.iniciar_crawler)
@@ -310,14 +195,11 @@ class VentanaCrawler(ctk.CTkFrame):
         - N/A
     '''
     def iniciar_crawler(self):
-        # Expresión regular que modeliza la sintaxis de una URL de servicio oculto de la red TOR
-        REGEX_URL_TOR = r"^(https?://)?[a-z2-7]{56}\.onion([/?#].*)?$"
-        
         # Obtención del texto de entrada
         texto_entrada_urls = self.entrada_urls.get("1.0", "end-1c").strip().splitlines()
         
-        # Se mantienen las URLs que cumplan la expresión regular
-        urls = [url for url in texto_entrada_urls if url.strip() and re.match(REGEX_URL_TOR, url)]
+        # Se mantienen, normalizadas, las URLs de servicios ocultos válidos
+        urls = [url for url in map(normalizar_url_inicial, texto_entrada_urls) if url]
     
         try:
             num_min_monederos = int(self.entrada_num_min_monederos.get())
@@ -326,81 +208,182 @@ class VentanaCrawler(ctk.CTkFrame):
             messagebox.showwarning("Entrada inválida", "El número mínimo de monederos debe ser un entero positivo.")
             return
 
-        if not urls:
+        try:
+            texto_num_peticiones = self.entrada_num_peticiones.get().strip()
+            num_peticiones_concurrentes = int(texto_num_peticiones) if texto_num_peticiones else 1
+            if num_peticiones_concurrentes < 1: raise ValueError
+        except ValueError:
+            messagebox.showwarning("Entrada inválida", "El número de peticiones simultáneas debe ser un entero positivo.")
+            return
+
+        try:
+            texto_num_procesos = self.entrada_num_procesos.get().strip()
+            num_procesos_analisis = int(texto_num_procesos) if texto_num_procesos else 0
+            if num_procesos_analisis < 0: raise ValueError
+        except ValueError:
+            messagebox.showwarning("Entrada inválida", "El número de procesos de análisis debe ser un entero no negativo.")
+            return
+
+        try:
+            texto_max_paginas_servicio = self.entrada_max_paginas_servicio.get().strip()
+            max_paginas_servicio = int(texto_max_paginas_servicio) if texto_max_paginas_servicio else None
+            if max_paginas_servicio is not None and max_paginas_servicio < 1: raise ValueError
+        except ValueError:
+            messagebox.showwarning("Entrada inválida", "El número máximo de páginas por servicio debe ser un entero positivo.")
+            return
+
+        try:
+            texto_profundidad_maxima = self.entrada_profundidad_maxima.get().strip()
+            profundidad_maxima = int(texto_profundidad_maxima) if texto_profundidad_maxima else None
+            if profundidad_maxima is not None and profundidad_maxima < 0: raise ValueError
+        except ValueError:
+            messagebox.showwarning("Entrada inválida", "La profundidad máxima debe ser un entero no negativo.")
+            return
+
+        # Si se indica un fichero de estado existente, el rastreo se reanuda y no son necesarias URLs iniciales
+        ruta_almacen = self.entrada_ruta_almacen.get().strip() or None
+        if not urls and not (ruta_almacen and os.path.isfile(ruta_almacen)):
             messagebox.showwarning("Entrada inválida", 
-                                   "Se debe proporcionar al menos una URL .onion inicial válida sintácticamente que incluya el protocolo (http:// o https://)")
+                                   "Se debe proporcionar al menos una URL .onion v3 inicial válida")
             return
         
+        # Instanciación del hilo de rastreo con una cola nueva, sin mensajes de rastreos anteriores
+        self.cola_comunicacion = queue.Queue(maxsize=TAMANO_MAXIMO_COLA)
+        try:
+            self.hilo_crawler = HiloCrawler(urls, num_min_monederos, self.cola_comunicacion, self.evento_parada,
+                                            num_peticiones_concurrentes=num_peticiones_concurrentes, ruta_almacen=ruta_almacen,
+                                            num_procesos_analisis=num_procesos_analisis, max_paginas_servicio=max_paginas_servicio,
+                                            profundidad_maxima=profundidad_maxima, ruta_cache_hosts=RUTA_CACHE_HOSTS)
+        except sqlite3.Error as e:
+            messagebox.showwarning("Entrada inválida", f"No se pudo abrir el fichero de estado del rastreo o la caché de hosts ({e})")
+            return
+
         # Se inhabilita el botón de búsqueda y se reinicia el evento de parada
         self.boton_busqueda.configure(state="disabled")
         self.evento_parada.clear()
+        self.num_min_monederos = num_min_monederos
+        self.num_monederos_encontrados = len(self.hilo_crawler.set_direcciones_bitcoin_encontradas)
+
+        # Los resultados se muestran a medida que se encuentran, partiendo de los del rastreo reanudado, si lo hay
+        self.ventana_resultados = self.controller.ventanas["VentanaMonederosEncontrados"]
+        self.ventana_resultados.limpiar_resultados()
+        self.ventana_resultados.agregar_resultados(list(self.hilo_crawler.diccionario_url_direcciones_bitcoin.items()))
         
         # Se muestra la ventana de progreso
         self.ventana_progreso = VentanaEmergenteProgreso(self, num_min_monederos)
         self.after(200, self.ventana_progreso.grab_set)
 
-        # Instanciación y arranque del hilo de rastreo
-        self.hilo_crawler = HiloCrawler(urls, num_min_monederos, self.cola_comunicacion, self.evento_parada)
+        # Arranque del hilo de rastreo
         self.hilo_crawler.start()
 
         # Inicio del bucle de chequeo de la cola en la interfaz gráfica
         self.after(250, self.procesar_cola)
 
+    '''
+    * FUNCIÓN: seleccionar_almacen
+    * DESCRIPCIÓN: Muestra un diálogo para seleccionar el fichero de estado del rastreo, nuevo o existente.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def seleccionar_almacen(self):
+        archivo = filedialog.asksaveasfilename(defaultextension=".db", filetypes=[("Estado del rastreo", "*.db")],
+                                               title="Fichero de estado del rastreo", confirmoverwrite=False)
+        if archivo:
+            self.entrada_ruta_almacen.delete(0, "end")
+            self.entrada_ruta_almacen.insert(0, archivo)
+
     '''
     * FUNCIÓN: procesar_cola
-    * DESCRIPCIÓN: Procesamiento de los mensajes introducidos en la cola por parte del hilo de rastreo.
+    * DESCRIPCIÓN: Procesamiento de los mensajes introducidos en la cola por parte del hilo de rastreo. En cada ciclo
+                   se leen todos los mensajes pendientes, la ventana de progreso se actualiza una única vez con el
+                   último estado y el número de monederos encontrados, y los nuevos resultados se añaden en un
+                   único lote a la ventana de monederos encontrados.
     * ARGS_IN:
         - N/A
     * ARGS_OUT:
         - N/A
     '''
     def procesar_cola(self):
-        try:
-            # Obtención de mensaje de la cola
-            mensaje = self.cola_comunicacion.get_nowait()
-            comando, datos = mensaje
+        # Se vacía la cola en cada ciclo y los mensajes de progreso se agrupan en una única actualización
+        texto_estado = None
+        num_monederos_previo = self.num_monederos_encontrados
+        lista_resultados_nuevos = []
+        mensaje_final = None
+        while mensaje_final is None:
+            try:
+                comando, datos = self.cola_comunicacion.get_nowait()
+            except queue.Empty:
+                break
 
-            num_min_monederos = int(self.entrada_num_min_monederos.get())
-
-            # Si es de tipo "estado", se actualiza el texto de la ventana emergente
+            # Solo se muestra el último estado recibido
             if comando == "estado":
-                texto_monederos_ventana = self.ventana_progreso.label_monederos_encontrados.cget("text").split(" ")[2]
-                self.ventana_progreso.actualizar_progreso(datos, int(texto_monederos_ventana), num_min_monederos)
-            
-            # Si se ha encontrado un monedero, se actualiza el número en la ventana emergente
+                texto_estado = datos
+            # Número total de monederos distintos encontrados hasta el momento
             elif comando == "monedero_encontrado":
-                texto_estado = self.ventana_progreso.label_estado.cget("text")
-                self.ventana_progreso.actualizar_progreso(texto_estado, datos, num_min_monederos)
+                self.num_monederos_encontrados = datos
+            # Monederos encontrados en una página, que se añaden en lote a la ventana de resultados
+            elif comando == "monederos_pagina":
+                lista_resultados_nuevos.append(datos)
+            elif comando in ("terminado", "cancelado", "error", "error_conexion"):
+                mensaje_final = (comando, datos)
 
-            # Si la ejecución ha terminado, se restaura la ventana de configuración del crawler, se informa al usuario
-            # y se muestra la ventana de monederos encontrados con los resultados
-            elif comando == "terminado":
-                self.restaurar_ventana_crawler()
-                messagebox.showinfo("Proceso Finalizado", "Se ha completado el rastreo")
-                self.controller.mostrar_ventana("VentanaMonederosEncontrados", resultados=datos)
-            
-            # Si la ejecución ha sido cancelada y ha finalizado la ejecución, se restaura la ventana de configuración del crawler
-            elif comando == "cancelado":
-                self.restaurar_ventana_crawler()
-            
-            # Si se ha producido un error, se informa al usuario
-            elif comando == "error":
-                messagebox.showerror("Error en el Crawler", f"Ha ocurrido un error:\n\n{datos}")
-                self.restaurar_ventana_crawler()
-            
-            # Si se ha producido un error en la verificación de la conexión de la red TOR, se informa al usuario
-            elif comando == "error_conexion":
-                messagebox.showerror("Error en el Crawler", "Error al establecer conexión con la red TOR.")
+        if lista_resultados_nuevos and self.ventana_resultados:
+            self.ventana_resultados.agregar_resultados(lista_resultados_nuevos)
+
+        # Se actualiza la ventana emergente si ha cambiado el estado o el número de monederos encontrados. La ventana
+        # conserva los valores mostrados y solo reconfigura las etiquetas que cambian
+        if self.ventana_progreso and (texto_estado is not None or self.num_monederos_encontrados != num_monederos_previo):
+            self.ventana_progreso.actualizar_progreso(texto_estado, self.num_monederos_encontrados, self.num_min_monederos)
+
+        if mensaje_final is None:
+            # Mientras el hilo siga en funcionamiento o queden mensajes, se vuelve a ejecutar esta función
+            if self.hilo_crawler and (self.hilo_crawler.is_alive() or not self.cola_comunicacion.empty()):
+                self.after(INTERVALO_LECTURA_COLA, self.procesar_cola)
+            elif self.hilo_crawler:
+                # El hilo ha finalizado sin comunicar el fin del rastreo
                 self.restaurar_ventana_crawler()
-        
-        except queue.Empty:
-            # Si la cola está vacía, no se realiza ninguna acción
-            pass
-        finally:
-            # Si el hilo sigue en funcionamiento, se vuelve a ejecutar esta función en 100 milisegundos
-            if self.hilo_crawler and self.hilo_crawler.is_alive():
-                self.after(100, self.procesar_cola)
-    
+            return
+
+        comando, datos = mensaje_final
+        # Si la ejecución ha terminado, se restaura la ventana de configuración del crawler, se informa al usuario
+        # y se muestra la ventana de monederos encontrados con los resultados
+        if comando == "terminado":
+            self.restaurar_ventana_crawler()
+            messagebox.showinfo("Proceso Finalizado", "Se ha completado el rastreo")
+            self.controller.mostrar_ventana("VentanaMonederosEncontrados", resultados=datos)
+            self.controller.ventanas["VentanaTransacciones"].precargar_monederos(datos)
+
+        # Si la ejecución ha sido cancelada y ha finalizado la ejecución, se restaura la ventana de configuración del crawler
+        elif comando == "cancelado":
+            self.restaurar_ventana_crawler()
+
+        # Si se ha producido un error, se informa al usuario
+        elif comando == "error":
+            messagebox.showerror("Error en el Crawler", f"Ha ocurrido un error:\n\n{datos}")
+            self.restaurar_ventana_crawler()
+
+        # Si se ha producido un error en la verificación de la conexión de la red TOR, se informa al usuario
+        elif comando == "error_conexion":
+            messagebox.showerror("Error en el Crawler", "Error al establecer conexión con la red TOR.")
+            self.restaurar_ventana_crawler()
+
+    '''
+    * FUNCIÓN: mostrar_resultados_parciales
+    * DESCRIPCIÓN: Función llamada por la ventana de progreso para mostrar los monederos encontrados hasta el momento.
+                   Se libera la captura de eventos de la ventana de progreso para poder explorar los resultados
+                   mientras continúa el rastreo.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def mostrar_resultados_parciales(self):
+        if self.ventana_progreso:
+            self.ventana_progreso.grab_release()
+        self.controller.mostrar_ventana("VentanaMonederosEncontrados")
+
     '''
     * FUNCIÓN: detener_crawler
     * DESCRIPCIÓN: Función llamada por la ventana de progreso para detener el hilo del crawler.
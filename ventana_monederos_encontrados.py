@@ -1,11 +1,20 @@
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
+from concurrent.futures import ThreadPoolExecutor
+from arbol_paginado import ArbolPaginado, IndiceBusqueda
+from exportador import exportar, filas_resultados, COLUMNAS_RESULTADOS, TIPOS_FICHERO_EXPORTACION
+
+# Milisegundos que se espera tras la última pulsación en el cuadro de filtro antes de aplicarlo
+RETARDO_FILTRO = 300
+# Milisegundos entre dos comprobaciones de la exportación en segundo plano
+INTERVALO_COMPROBACION_EXPORTACION = 100
 
 '''
 * CLASE: VentanaMonederosEncontrados
 * DESCRIPCIÓN: Clase que modela las características de la ventana de monederos Bitcoin encontrados
-               tras llevarse a cabo el rastreo en TOR.
+               tras llevarse a cabo el rastreo en TOR. Las URLs se insertan en el árbol por bloques a medida que
+               el usuario se desplaza, y los monederos de cada URL solo cuando se despliega su nodo.
 '''
 class VentanaMonederosEncontrados(ctk.CTkFrame):
     def __init__(self, parent, controller):
@@ -13,6 +22,16 @@ class VentanaMonederosEncontrados(ctk.CTkFrame):
         self.controller = controller
         self.resultados_crawler = {}
         self.tree_resultados = None
+        # Índice de búsqueda de las URLs por su texto y sus monederos, y posición de cada URL en el índice
+        self.indice_resultados = IndiceBusqueda()
+        self.diccionario_url_posicion = {}
+        # Nodos del árbol de cada URL insertada. Clave: URL. Valor: identificador del nodo
+        self.diccionario_url_nodo = {}
+        # Nodos de URL cuyos monederos se han insertado en el árbol
+        self.set_nodos_desplegados = set()
+        self.id_filtro_programado = None
+        # Exportación de los resultados en segundo plano
+        self.ejecutor_exportacion = ThreadPoolExecutor(max_workers=1)
 
         # Configuración de la vista jerárquica tipo árbol de los monederos encontrados
         estilo = ttk.Style()
@@ -33,6 +52,19 @@ class VentanaMonederosEncontrados(ctk.CTkFrame):
         
         self.label_titulo.pack(side="left", pady=10)
 
+        # Cuando es pulsado, el botón de exportación exporta la relación de URLs y monederos a un archivo local
+        self.boton_exportar = ctk.CTkButton(frame_encabezado, text="Exportar", font=("Arial", 20, "bold"), command=self.exportar_resultados)
+        self.boton_exportar.pack(side="right", padx=10)
+
+        # Cuadro de filtro de las URLs por texto o por dirección de monedero
+        frame_filtro = ctk.CTkFrame(self, fg_color="transparent")
+        frame_filtro.pack(fill="x", padx=20, pady=(20, 0))
+        self.entrada_filtro = ctk.CTkEntry(frame_filtro, placeholder_text="Filtrar por URL o monedero", width=600, font=("Arial", 18))
+        self.entrada_filtro.pack(side="left")
+        self.entrada_filtro.bind("<KeyRelease>", self.programar_filtro)
+        self.label_num_resultados = ctk.CTkLabel(frame_filtro, text="", font=("Arial", 16))
+        self.label_num_resultados.pack(side="left", padx=20)
+
         # Marco y árbol para los resultados del rastreo
         frame_tabla_urls_monederos = ctk.CTkFrame(self)
         frame_tabla_urls_monederos.pack(expand=True, fill="both", padx=20, pady=20)
@@ -40,37 +72,208 @@ class VentanaMonederosEncontrados(ctk.CTkFrame):
 
         # Barra de desplazamiento
         scrollbar = tk.Scrollbar(frame_tabla_urls_monederos, orient="vertical", command=self.tree_resultados.yview)
-        self.tree_resultados.configure(yscrollcommand=scrollbar.set)
+        # Carga por bloques de las URLs al desplazarse
+        self.arbol_paginado = ArbolPaginado(self.tree_resultados, scrollbar, self.insertar_url)
 
         self.tree_resultados.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
-        # Doble click sobre elemento del árbol
+        # Doble click sobre elemento del árbol y despliegue de un nodo de URL
         self.tree_resultados.bind("<Double-1>", self.doble_click)
+        self.tree_resultados.bind("<<TreeviewOpen>>", self.desplegar_url)
     
     '''
     * FUNCIÓN: set_resultados_busqueda
-    * DESCRIPCIÓN: Inserta los resultados del rastreo (monederos Bitcoin y las URL donde han sido encontrados)
-                   en el árbol de resultados de la ventana.
+    * DESCRIPCIÓN: Muestra los resultados del rastreo (monederos Bitcoin y las URL donde han sido encontrados)
+                   en el árbol de resultados de la ventana. Si el árbol ya contiene parte de estos resultados
+                   (por haberse recibido durante el rastreo), solo se insertan los que faltan.
     * ARGS_IN:
         - resultados_dict: Diccionario con los resultados. Clave: URL. Valor: Lista de monederos Bitcoin.
     * ARGS_OUT:
         - N/A
     '''
     def set_resultados_busqueda(self, resultados_dict):
-        self.resultados_crawler = resultados_dict
-
-        # Limpiar resultados de búsquedas anteriores
-        for i in self.tree_resultados.get_children():
-            self.tree_resultados.delete(i)
-
-        # Insertar nodos padre (URLs) y nodos hijo (monederos encontrados en cada URL)
-        # Se realiza distinción entre ambas tipologías para la funcionalidad del doble click
-        for url, lista_monederos in self.resultados_crawler.items():
-            parent_id = self.tree_resultados.insert('', tk.END, text=url, tags=('fila_url',))
-            
-            for monedero in lista_monederos:
-                self.tree_resultados.insert(parent_id, tk.END, text=monedero, tags=('fila_monedero', monedero))
+        # Si el árbol contiene resultados ajenos a los indicados (de búsquedas anteriores), se limpia
+        if any(url not in resultados_dict for url in self.resultados_crawler):
+            self.limpiar_resultados()
+        self.agregar_resultados(resultados_dict.items())
+
+    '''
+    * FUNCIÓN: limpiar_resultados
+    * DESCRIPCIÓN: Elimina los resultados mostrados y su índice de búsqueda.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def limpiar_resultados(self):
+        self.resultados_crawler = {}
+        self.indice_resultados = IndiceBusqueda()
+        self.diccionario_url_posicion = {}
+        self.diccionario_url_nodo = {}
+        self.set_nodos_desplegados = set()
+        self.arbol_paginado.mostrar([])
+        self.actualizar_num_resultados()
+
+    '''
+    * FUNCIÓN: agregar_resultados
+    * DESCRIPCIÓN: Añade un lote de resultados sin modificar los ya mostrados. Se llama una vez por ciclo de la
+                   interfaz con los resultados recibidos del hilo de rastreo. Las URLs nuevas que cumplen el filtro
+                   actual se añaden al final de la vista y solo se insertan en el árbol si caben en los bloques
+                   cargados.
+    * ARGS_IN:
+        - lista_resultados: iterable de tuplas (URL, lista de monederos Bitcoin encontrados en la URL).
+    * ARGS_OUT:
+        - N/A
+    '''
+    def agregar_resultados(self, lista_resultados):
+        texto_filtro = self.entrada_filtro.get()
+        lista_urls_vista = []
+        for url, lista_monederos in lista_resultados:
+            if url not in self.resultados_crawler:
+                self.resultados_crawler[url] = list(dict.fromkeys(lista_monederos))
+                posicion = self.indice_resultados.agregar(url, ' '.join([url] + self.resultados_crawler[url]))
+                self.diccionario_url_posicion[url] = posicion
+                if self.indice_resultados.coincide(posicion, texto_filtro):
+                    lista_urls_vista.append(url)
+                continue
+
+            # Solo se añaden los monederos de la URL que no se conocían todavía
+            lista_monederos_url = self.resultados_crawler[url]
+            lista_monederos_nuevos = [monedero for monedero in dict.fromkeys(lista_monederos) if monedero not in lista_monederos_url]
+            if not lista_monederos_nuevos:
+                continue
+            lista_monederos_url.extend(lista_monederos_nuevos)
+            self.indice_resultados.actualizar(self.diccionario_url_posicion[url], ' '.join(lista_monederos_nuevos))
+
+            parent_id = self.diccionario_url_nodo.get(url)
+            if parent_id in self.set_nodos_desplegados:
+                for monedero in lista_monederos_nuevos:
+                    self.tree_resultados.insert(parent_id, tk.END, text=monedero, tags=('fila_monedero', monedero))
+            elif parent_id is not None and not self.tree_resultados.get_children(parent_id):
+                self.tree_resultados.insert(parent_id, tk.END, text="", tags=('fila_pendiente',))
+
+        self.arbol_paginado.agregar(lista_urls_vista)
+        self.actualizar_num_resultados()
+
+    '''
+    * FUNCIÓN: insertar_url
+    * DESCRIPCIÓN: Inserta en el árbol el nodo de una URL. Sus monederos no se insertan hasta que se despliega el
+                   nodo: en su lugar se inserta un nodo hijo vacío para que el árbol muestre el indicador de despliegue.
+    * ARGS_IN:
+        - url: URL a insertar.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def insertar_url(self, url):
+        # Se realiza distinción entre nodos padre (URLs) y nodos hijo (monederos) para la funcionalidad del doble click
+        parent_id = self.tree_resultados.insert('', tk.END, text=url, tags=('fila_url',))
+        self.diccionario_url_nodo[url] = parent_id
+        if self.resultados_crawler[url]:
+            self.tree_resultados.insert(parent_id, tk.END, text="", tags=('fila_pendiente',))
+
+    '''
+    * FUNCIÓN: desplegar_url
+    * DESCRIPCIÓN: Inserta los monederos de una URL al desplegar su nodo por primera vez.
+    * ARGS_IN:
+        - event: Evento capturado en la ventana.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def desplegar_url(self, event):
+        parent_id = self.tree_resultados.focus()
+        if not parent_id or parent_id in self.set_nodos_desplegados:
+            return
+        if 'fila_url' not in self.tree_resultados.item(parent_id, 'tags'):
+            return
+        self.set_nodos_desplegados.add(parent_id)
+        self.tree_resultados.delete(*self.tree_resultados.get_children(parent_id))
+        for monedero in self.resultados_crawler.get(self.tree_resultados.item(parent_id, 'text'), []):
+            self.tree_resultados.insert(parent_id, tk.END, text=monedero, tags=('fila_monedero', monedero))
+
+    '''
+    * FUNCIÓN: programar_filtro
+    * DESCRIPCIÓN: Programa la aplicación del filtro tras una pausa en la escritura, de modo que no se filtra la
+                   lista completa con cada pulsación.
+    * ARGS_IN:
+        - event: Evento capturado en la ventana.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def programar_filtro(self, event=None):
+        if self.id_filtro_programado:
+            self.after_cancel(self.id_filtro_programado)
+        self.id_filtro_programado = self.after(RETARDO_FILTRO, self.aplicar_filtro)
+
+    '''
+    * FUNCIÓN: aplicar_filtro
+    * DESCRIPCIÓN: Muestra en el árbol solo las URLs que contienen el texto del filtro o alguno de cuyos monederos
+                   lo contiene.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def aplicar_filtro(self):
+        self.id_filtro_programado = None
+        self.diccionario_url_nodo = {}
+        self.set_nodos_desplegados = set()
+        self.arbol_paginado.mostrar(self.indice_resultados.buscar(self.entrada_filtro.get()))
+        self.actualizar_num_resultados()
+
+    '''
+    * FUNCIÓN: actualizar_num_resultados
+    * DESCRIPCIÓN: Muestra el número de URLs de la vista actual y el número total de URLs.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def actualizar_num_resultados(self):
+        self.label_num_resultados.configure(text=f"{len(self.arbol_paginado.lista_elementos)} de {len(self.indice_resultados)} URLs")
+
+    '''
+    * FUNCIÓN: exportar_resultados
+    * DESCRIPCIÓN: Exporta los resultados del rastreo (una fila por cada URL y monedero) a un archivo local (Excel, CSV,
+                   JSON Lines o Parquet, según la extensión elegida). El archivo se escribe por bloques en segundo
+                   plano a partir de una copia de los resultados, que pueden seguir llegando durante el rastreo.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def exportar_resultados(self):
+        if not self.resultados_crawler:
+            messagebox.showinfo("Exportar", "No hay resultados que exportar")
+            return
+        archivo = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=TIPOS_FICHERO_EXPORTACION,
+                                               title="Guardar como", initialfile="monederos_encontrados.xlsx")
+        if archivo:
+            resultados = [(url, tuple(lista_monederos)) for url, lista_monederos in self.resultados_crawler.items()]
+            self.boton_exportar.configure(state="disabled", text="Exportando...")
+            tarea = self.ejecutor_exportacion.submit(exportar, archivo, COLUMNAS_RESULTADOS, filas_resultados(resultados))
+            self.after(INTERVALO_COMPROBACION_EXPORTACION, self.comprobar_exportacion, tarea)
+
+    '''
+    * FUNCIÓN: comprobar_exportacion
+    * DESCRIPCIÓN: Comprueba desde la interfaz si ha finalizado la exportación de los resultados e informa al usuario.
+    * ARGS_IN:
+        - tarea: tarea de la exportación.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def comprobar_exportacion(self, tarea):
+        if not tarea.done():
+            self.after(INTERVALO_COMPROBACION_EXPORTACION, self.comprobar_exportacion, tarea)
+            return
+
+        self.boton_exportar.configure(state="normal", text="Exportar")
+        try:
+            num_filas = tarea.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudieron exportar los resultados:\n\n{e}")
+            return
+        messagebox.showinfo("Finalizado", f"Se han exportado {num_filas} monederos correctamente")
 
     '''
     * FUNCIÓN: doble_click
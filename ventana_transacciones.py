@@ -1,13 +1,65 @@
+import os
 import customtkinter as ctk
 from tkinter import ttk
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import pandas as pd
-from blockcypher import get_address_full
+from concurrent.futures import ThreadPoolExecutor
+from arbol_paginado import ArbolPaginado, IndiceBusqueda
+from cache_monederos import CacheMonederos
+from cliente_monederos import ClienteMonederos, URL_API_BLOCKCYPHER
+from indice_monederos import IndiceMonederos
+from monedero_bitcoin import MonederoBitcoin, formatear_btc, formatear_participantes
+from exportador import exportar, filas_transacciones, COLUMNAS_TRANSACCIONES, TIPOS_FICHERO_EXPORTACION
+
+# Milisegundos que se espera tras la última pulsación en el cuadro de filtro antes de aplicarlo
+RETARDO_FILTRO = 300
+# Milisegundos entre dos comprobaciones de la carga de un monedero en segundo plano
+INTERVALO_COMPROBACION_CARGA = 100
+# Fichero opcional en el que conservar la caché de monederos entre ejecuciones
+RUTA_CACHE_MONEDEROS = os.environ.get("TOR_CRAWLING_CACHE_MONEDEROS")
+# URL base y token opcional de la API de Blockcypher
+URL_API_MONEDEROS = os.environ.get("TOR_CRAWLING_API_MONEDEROS", URL_API_BLOCKCYPHER)
+TOKEN_API_MONEDEROS = os.environ.get("BLOCKCYPHER_TOKEN")
+# Peticiones por segundo a la API de Blockcypher (límite de las cuentas gratuitas)
+PETICIONES_POR_SEGUNDO_API = 3.0
+# Número máximo de monederos de un rastreo que se precargan. La precarga solo se realiza con un token de la API, ya
+# que sin él la cuota gratuita por hora se agotaría antes de que el usuario abra ningún monedero
+MAX_MONEDEROS_PRECARGA = int(os.environ.get("TOR_CRAWLING_MAX_PRECARGA_MONEDEROS", 50))
+# Índice local de transacciones (creado con indice_monederos.py). Si se indica, sustituye a la API de Blockcypher
+RUTA_INDICE_MONEDEROS = os.environ.get("TOR_CRAWLING_INDICE_MONEDEROS")
+
+'''
+* FUNCIÓN: crear_fuente_monederos
+* DESCRIPCIÓN: Crea la fuente de datos de los monederos según la configuración: el índice local de transacciones, si
+               se ha indicado, o el cliente de la API de Blockcypher.
+* ARGS_IN:
+    - N/A
+* ARGS_OUT:
+    - Objeto de una subclase de FuenteMonederos.
+'''
+def crear_fuente_monederos():
+    if RUTA_INDICE_MONEDEROS:
+        return IndiceMonederos(RUTA_INDICE_MONEDEROS)
+    return ClienteMonederos(URL_API_MONEDEROS, token=TOKEN_API_MONEDEROS, peticiones_por_segundo=PETICIONES_POR_SEGUNDO_API)
+
+'''
+* FUNCIÓN: origen_monederos
+* DESCRIPCIÓN: Identifica la fuente de datos de los monederos configurada, para que la caché en disco no sirva datos
+               de una fuente tras cambiar a otra.
+* ARGS_IN:
+    - N/A
+* ARGS_OUT:
+    - Texto con el tipo de fuente y su ubicación.
+'''
+def origen_monederos():
+    if RUTA_INDICE_MONEDEROS:
+        return f"indice:{os.path.abspath(RUTA_INDICE_MONEDEROS)}"
+    return f"api:{URL_API_MONEDEROS}"
 
 '''
 * CLASE: VentanaTransacciones
 * DESCRIPCIÓN: Clase que modela las características de la ventana de transacciones de un monedero Bitcoin.
+               Las filas de la tabla se insertan por bloques a medida que el usuario se desplaza.
 '''
 class VentanaTransacciones(ctk.CTkFrame):
     def __init__(self, parent, controller):
@@ -16,6 +68,21 @@ class VentanaTransacciones(ctk.CTkFrame):
         self.monedero = None
         self.label_titulo = None
         self.tabla = None
+        # Índice de búsqueda de las transacciones por hash y direcciones de emisores y receptores
+        self.indice_transacciones = IndiceBusqueda()
+        self.id_filtro_programado = None
+
+        # Carga de los monederos en segundo plano a través de una caché con tiempo de vida
+        self.cache_monederos = CacheMonederos(ruta_disco=RUTA_CACHE_MONEDEROS, origen=origen_monederos(),
+                                              serializar=MonederoBitcoin.a_diccionario,
+                                              deserializar=MonederoBitcoin.desde_diccionario)
+        self.ejecutor_carga = ThreadPoolExecutor(max_workers=2)
+        # Fuente de los datos de los monederos: el índice local, si se ha configurado, o la API de Blockcypher
+        self.fuente_monederos = crear_fuente_monederos()
+        # Tarea de la carga en curso del último monedero solicitado
+        self.tarea_carga = None
+        # Exportación de las transacciones en segundo plano
+        self.ejecutor_exportacion = ThreadPoolExecutor(max_workers=1)
 
         # Encabezado de la ventana
         frame_encabezado = ctk.CTkFrame(self)
@@ -30,8 +97,17 @@ class VentanaTransacciones(ctk.CTkFrame):
         self.label_titulo.pack(side="left", pady=10)
 
         # Cuando es pulsado, el botón de exportación desencadena la función que exporta los resultados a un archivo local
-        boton_exportar = ctk.CTkButton(frame_encabezado, text="Exportar a Excel", font=("Arial", 20, "bold"), command=self.exportar_excel)
-        boton_exportar.pack(side="right", padx=10)
+        self.boton_exportar = ctk.CTkButton(frame_encabezado, text="Exportar", font=("Arial", 20, "bold"), command=self.exportar_transacciones)
+        self.boton_exportar.pack(side="right", padx=10)
+
+        # Cuadro de filtro de las transacciones por hash, tipo o dirección de emisores y receptores
+        frame_filtro = ctk.CTkFrame(self, fg_color="transparent")
+        frame_filtro.pack(fill="x", padx=20, pady=(20, 0))
+        self.entrada_filtro = ctk.CTkEntry(frame_filtro, placeholder_text="Filtrar por hash, tipo o dirección", width=600, font=("Arial", 18))
+        self.entrada_filtro.pack(side="left")
+        self.entrada_filtro.bind("<KeyRelease>", self.programar_filtro)
+        self.label_num_transacciones = ctk.CTkLabel(frame_filtro, text="", font=("Arial", 16))
+        self.label_num_transacciones.pack(side="left", padx=20)
 
         # Marco para la tabla de transacciones
         frame_tabla = ctk.CTkFrame(self)
@@ -53,145 +129,211 @@ class VentanaTransacciones(ctk.CTkFrame):
 
         # Barra de desplazamiento
         barra_desplazamiento = tk.Scrollbar(frame_tabla, orient="vertical", command=self.tabla.yview)
-        self.tabla.configure(yscrollcommand=barra_desplazamiento.set)
+        # Carga por bloques de las transacciones al desplazarse
+        self.arbol_paginado = ArbolPaginado(self.tabla, barra_desplazamiento, self.insertar_transaccion)
 
         self.tabla.pack(side="left", fill="both", expand=True)
         barra_desplazamiento.pack(side="right", fill="y")
 
     '''
     * FUNCIÓN: set_monedero
-    * DESCRIPCIÓN: Establece el objeto instanciado de la clase MonederoBitcoin correspondiente al monedero a visualizar en 
-                   la ventana, modifica el título de la ventana con su información y llama a la función que inserta la 
-                   información de las transacciones en la ventana.
+    * DESCRIPCIÓN: Solicita la carga en segundo plano del monedero a visualizar en la ventana y muestra el estado de
+                   carga. Los datos del monedero se obtienen de la caché o, si no están, de la API, sin bloquear la
+                   interfaz.
     * ARGS_IN:
-        - monedero: Objeto de la clase MonederoBitcoin correspondiente al monedero a visualizar en la ventana.
+        - monedero: Dirección del monedero Bitcoin a visualizar en la ventana.
     * ARGS_OUT:
         - N/A
     '''    
     def set_monedero(self, monedero):
-        self.monedero = MonederoBitcoin(monedero)
-        self.label_titulo.configure(text=f"Transacciones de la dirección: {self.monedero.direccion} (Balance: {self.monedero.balance} BTC)")
+        self.monedero = None
+        self.label_titulo.configure(text=f"Cargando transacciones de la dirección: {monedero}...")
+        self.boton_exportar.configure(state="disabled")
+        self.indice_transacciones = IndiceBusqueda()
+        self.arbol_paginado.mostrar([])
+        self.label_num_transacciones.configure(text="")
+
+        self.fuente_monederos.priorizar(monedero)
+        self.tarea_carga = self.ejecutor_carga.submit(self.cargar_monedero, monedero)
+        self.after(INTERVALO_COMPROBACION_CARGA, self.comprobar_carga, self.tarea_carga, monedero)
+
+    '''
+    * FUNCIÓN: cargar_monedero
+    * DESCRIPCIÓN: Obtiene un monedero a través de la caché. Se ejecuta en un hilo en segundo plano.
+    * ARGS_IN:
+        - direccion: Dirección del monedero Bitcoin.
+    * ARGS_OUT:
+        - Objeto de la clase MonederoBitcoin.
+    '''
+    def cargar_monedero(self, direccion):
+        return self.cache_monederos.obtener(direccion, self.descargar_monedero)
+
+    '''
+    * FUNCIÓN: descargar_monedero
+    * DESCRIPCIÓN: Obtiene los datos de un monedero de la fuente configurada y construye el objeto MonederoBitcoin.
+                   La caché guarda este objeto y no los datos de la fuente, que se descartan tras la conversión.
+    * ARGS_IN:
+        - direccion: Dirección del monedero Bitcoin.
+    * ARGS_OUT:
+        - Objeto de la clase MonederoBitcoin.
+    '''
+    def descargar_monedero(self, direccion):
+        return MonederoBitcoin(direccion, fuente=self.fuente_monederos)
+
+    '''
+    * FUNCIÓN: precargar_monederos
+    * DESCRIPCIÓN: Descarga en segundo plano en la caché los primeros monederos de un rastreo finalizado, de modo
+                   que al abrirlos se muestren sin esperar a la API. Solo se realiza si se ha configurado un token de
+                   la API (el índice local no necesita precarga). Se cancelan las precargas pendientes de rastreos
+                   anteriores.
+    * ARGS_IN:
+        - resultados_dict: Diccionario con los resultados. Clave: URL. Valor: Lista de monederos Bitcoin.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def precargar_monederos(self, resultados_dict):
+        self.fuente_monederos.cancelar_precarga()
+        if not TOKEN_API_MONEDEROS:
+            return
+        direcciones = dict.fromkeys(direccion for lista_direcciones in resultados_dict.values() for direccion in lista_direcciones)
+        self.fuente_monederos.precargar(list(direcciones)[:MAX_MONEDEROS_PRECARGA], self.cache_monederos, self.descargar_monedero)
+
+    '''
+    * FUNCIÓN: comprobar_carga
+    * DESCRIPCIÓN: Comprueba desde la interfaz si ha finalizado la carga de un monedero y, en ese caso, muestra su
+                   información y sus transacciones. Las cargas de monederos que ya no están solicitados se ignoran.
+    * ARGS_IN:
+        - tarea: tarea de la carga del monedero.
+        - direccion: Dirección del monedero Bitcoin.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def comprobar_carga(self, tarea, direccion):
+        if tarea is not self.tarea_carga:
+            return
+        if not tarea.done():
+            self.after(INTERVALO_COMPROBACION_CARGA, self.comprobar_carga, tarea, direccion)
+            return
+
+        self.tarea_carga = None
+        try:
+            self.monedero = tarea.result()
+        except Exception as e:
+            self.label_titulo.configure(text=f"Transacciones de la dirección: {direccion} (Error en la carga)")
+            messagebox.showerror("Error", f"No se pudo obtener la información del monedero:\n\n{e}")
+            return
+
+        self.label_titulo.configure(text=f"Transacciones de la dirección: {self.monedero.direccion} (Balance: {formatear_btc(self.monedero.balance)} BTC)")
+        self.boton_exportar.configure(state="normal")
         self.set_tabla()
 
     '''
     * FUNCIÓN: set_tabla
-    * DESCRIPCIÓN: Inserta la información de las transacciones del monedero Bitcoin en la tabla de visualización de la ventana.
+    * DESCRIPCIÓN: Indexa las transacciones del monedero Bitcoin y muestra el primer bloque en la tabla de
+                   visualización de la ventana.
     * ARGS_IN:
         - N/A
     * ARGS_OUT:
         - N/A
     '''    
     def set_tabla(self):
-        # Limpiar la tabla antes de insertar nuevos datos
-        for i in self.tabla.get_children():
-            self.tabla.delete(i)
+        # Se indexan las transacciones del monedero para el filtro
+        self.indice_transacciones = IndiceBusqueda()
+        for tx in (self.monedero.transacciones_confirmadas if self.monedero else []):
+            direcciones = [direccion for direcciones_participante, _ in tx.emisores + tx.receptores for direccion in direcciones_participante]
+            self.indice_transacciones.agregar(tx, ' '.join([tx.hash, tx.tipo] + direcciones))
 
-        if not self.monedero or not self.monedero.transacciones_confirmadas:
-            self.tabla.insert('', tk.END, values=("No hay transacciones disponibles para esta dirección.", "", "", "", "", "", "", "", ""))
-            return
+        self.entrada_filtro.delete(0, "end")
+        self.aplicar_filtro()
 
+    '''
+    * FUNCIÓN: insertar_transaccion
+    * DESCRIPCIÓN: Inserta la fila de una transacción en la tabla de visualización de la ventana.
+    * ARGS_IN:
+        - tx: Objeto de la clase TransaccionBitcoin.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def insertar_transaccion(self, tx):
         # Formato de la información a mostrar de los emisores y receptores de cada transacción
-        for tx in self.monedero.transacciones_confirmadas:
-            emisores_str = ', '.join(f"{direccion}: {valor} BTC" for e in tx.emisores for direccion, valor in zip(e['direcciones'], [e['valor']]))
-            receptores_str = ', '.join(f"{direccion}: {valor} BTC" for r in tx.receptores for direccion, valor in zip(r['direcciones'], [r['valor']]))
-            
-            self.tabla.insert('', tk.END, values=(tx.hash, tx.valor_neto, tx.comision, tx.num_bloque,tx.fecha_confirmacion.strftime("%Y-%m-%d %H:%M"),
-                tx.num_confirmaciones,tx.tipo,emisores_str,receptores_str))
-    
-    '''
-    * FUNCIÓN: exportar_excel
-    * DESCRIPCIÓN: Almacena la información de las transacciones del monedero Bitcoin en un archivo Excel local.
+        emisores_str = formatear_participantes(tx.emisores)
+        receptores_str = formatear_participantes(tx.receptores)
+        fecha_confirmacion = tx.fecha_confirmacion
+        fecha_str = fecha_confirmacion.strftime("%Y-%m-%d %H:%M") if fecha_confirmacion else "sin confirmar"
+
+        self.tabla.insert('', tk.END, values=(tx.hash, formatear_btc(tx.valor_neto), formatear_btc(tx.comision), tx.num_bloque,fecha_str,
+            tx.num_confirmaciones,tx.tipo,emisores_str,receptores_str))
+
+    '''
+    * FUNCIÓN: programar_filtro
+    * DESCRIPCIÓN: Programa la aplicación del filtro tras una pausa en la escritura, de modo que no se filtra la
+                   lista completa con cada pulsación.
+    * ARGS_IN:
+        - event: Evento capturado en la ventana.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def programar_filtro(self, event=None):
+        if self.id_filtro_programado:
+            self.after_cancel(self.id_filtro_programado)
+        self.id_filtro_programado = self.after(RETARDO_FILTRO, self.aplicar_filtro)
+
+    '''
+    * FUNCIÓN: aplicar_filtro
+    * DESCRIPCIÓN: Muestra en la tabla solo las transacciones que contienen el texto del filtro en su hash, su tipo
+                   o las direcciones de sus emisores y receptores.
     * ARGS_IN:
         - N/A
     * ARGS_OUT:
         - N/A
     '''
-    def exportar_excel(self):
-        datos_excel = []
-        # Formato de la información a mostrar de los emisores y receptores de cada transacción
-        for tx in self.monedero.transacciones_confirmadas:
-            emisores_str = ', '.join(f"{direccion}: {valor} BTC" for e in tx.emisores for direccion, valor in zip(e['direcciones'], [e['valor']]))
-            receptores_str = ', '.join(f"{direccion}: {valor} BTC" for r in tx.receptores for direccion, valor in zip(r['direcciones'], [r['valor']]))
-            
-            datos_excel.append({"Hash": tx.hash, "Valor Neto (BTC)": tx.valor_neto, "Comisión": tx.comision,
-                "Bloque": tx.num_bloque, "Fecha": tx.fecha_confirmacion.strftime("%Y-%m-%d %H:%M"), "Confirmaciones": tx.num_confirmaciones,
-                "Emisores": emisores_str, "Receptores": receptores_str})
-
-        # Creación del DataFrame que almcacena la información de la tabla a exportar
-        df = pd.DataFrame(datos_excel)
-        
+    def aplicar_filtro(self):
+        self.id_filtro_programado = None
+        self.arbol_paginado.mostrar(self.indice_transacciones.buscar(self.entrada_filtro.get()))
+        self.label_num_transacciones.configure(text=f"{len(self.arbol_paginado.lista_elementos)} de {len(self.indice_transacciones)} transacciones")
+
+        if not self.indice_transacciones:
+            self.tabla.insert('', tk.END, values=("No hay transacciones disponibles para esta dirección.", "", "", "", "", "", "", "", ""))
+
+    '''
+    * FUNCIÓN: exportar_transacciones
+    * DESCRIPCIÓN: Exporta las transacciones del monedero Bitcoin a un archivo local (Excel, CSV, JSON Lines o Parquet,
+                   según la extensión elegida). El archivo se escribe por bloques en segundo plano.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def exportar_transacciones(self):
+        if not self.monedero:
+            return
         # Ventana de diálogo de configuración del archivo a crear
         # Por defecto se establece la dirección del monedero como nombre del fichero
-        archivo = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx")],
+        archivo = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=TIPOS_FICHERO_EXPORTACION,
             title="Guardar como", initialfile=f"{self.monedero.direccion}.xlsx")
 
         if archivo:
-            df.to_excel(archivo, index=False)
-            messagebox.showinfo("Finalizado", "Se han exportado las transacciones correctamente")
-
-'''
-* CLASE: TransaccionBitcoin
-* DESCRIPCIÓN: Clase que modela las transacciones de Bitcoin.
-'''
-class TransaccionBitcoin():
-    def __init__(self, hash, valor_neto, comision, num_bloque, fecha_confirmacion, num_confirmaciones,
-                 tipo, emisores, receptores):
-        self.hash = hash
-        self.valor_neto = valor_neto
-        self.comision = comision
-        self.num_bloque = num_bloque
-        self.fecha_confirmacion = fecha_confirmacion
-        self.num_confirmaciones = num_confirmaciones
-        self.tipo = tipo
-        self.emisores = emisores
-        self.receptores = receptores
+            self.boton_exportar.configure(state="disabled", text="Exportando...")
+            tarea = self.ejecutor_exportacion.submit(exportar, archivo, COLUMNAS_TRANSACCIONES, filas_transacciones(self.monedero))
+            self.after(INTERVALO_COMPROBACION_CARGA, self.comprobar_exportacion, tarea)
 
-'''
-* CLASE: TransaccionBitcoin
-* DESCRIPCIÓN: Clase que modela los monederos Bitcoin.
-'''
-class MonederoBitcoin():
-    
-    def __init__(self, direccion):
-        self.direccion = direccion
-        
-        # Obtención de la información del monedero a través de la API Blockcypher
-        self.datosapi = get_address_full(direccion)
-
-        # Conversión de la información financiera de satoshis a BTC
-        self.balance = self.datosapi["balance"]/100000000
-        self.total_recibido = self.datosapi["total_received"]/100000000
-        self.total_enviado = self.datosapi["total_sent"]/100000000
-        self.num_transacciones_confirmadas = self.datosapi["n_tx"]
-
-        self.balance_no_confirmado = self.datosapi["unconfirmed_balance"]/100000000
-        self.num_transacciones_no_confirmadas = self.datosapi["unconfirmed_n_tx"]
-
-        # Lista que contiene objetos de tipo TransaccionBitcoin asociados a los movimientos confirmados en los que se identifica al monedero
-        self.transacciones_confirmadas = []
-
-        if self.num_transacciones_confirmadas > 0:
-            for transaccion in self.datosapi["txs"]:
-                # Para cada transacción, estudiamos si el monedero ha participado como emisor, receptor o ambos
-                emisores = [{'direcciones': e['addresses'] or [], 'valor': e['output_value']/100000000} for e in transaccion["inputs"]]
-                receptores = [{'direcciones': r['addresses'] or [], 'valor': r['value']/100000000} for r in transaccion["outputs"]]
-                
-                en_emisores = any(self.direccion in e['direcciones'] for e in emisores)
-                en_receptores = any(self.direccion in r['direcciones'] for r in receptores)
-    
-                if en_emisores and en_receptores:
-                    tipo = "Emisor/Receptor"
-                elif en_emisores:
-                    tipo = "Emisor"
-                elif en_receptores:
-                    tipo = "Receptor"
-                else:
-                    tipo = "Revisar en la cadena"
-
-                self.transacciones_confirmadas.append(TransaccionBitcoin(hash = transaccion["hash"], valor_neto = transaccion["total"], 
-                                                                  comision = transaccion["fees"], 
-                                                                  num_bloque = transaccion["block_height"],
-                                                                  fecha_confirmacion = transaccion["confirmed"],
-                                                                  num_confirmaciones= transaccion["confirmations"], 
-                                                                  tipo = tipo, emisores = emisores, receptores = receptores))
+    '''
+    * FUNCIÓN: comprobar_exportacion
+    * DESCRIPCIÓN: Comprueba desde la interfaz si ha finalizado la exportación de las transacciones e informa al usuario.
+    * ARGS_IN:
+        - tarea: tarea de la exportación.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def comprobar_exportacion(self, tarea):
+        if not tarea.done():
+            self.after(INTERVALO_COMPROBACION_CARGA, self.comprobar_exportacion, tarea)
+            return
 
+        self.boton_exportar.configure(state="normal" if self.monedero else "disabled", text="Exportar")
+        try:
+            num_filas = tarea.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudieron exportar las transacciones:\n\n{e}")
+            return
+        messagebox.showinfo("Finalizado", f"Se han exportado {num_filas} transacciones correctamente")
@@ -0,0 +1,250 @@
+from threading import Lock
+import sqlite3
+import time
+import requests
+from circuitos import fallo_del_circuito
+
+'''
+* DESCRIPCIÓN: Seguimiento de la latencia y la disponibilidad de los hosts rastreados. El tiempo de espera de cada
+               petición se adapta a la latencia observada del host y, para los hosts aún no contactados, a la latencia
+               de primer contacto del resto. Los hosts que no responden se consideran caídos durante un tiempo de
+               vida que se duplica con cada caída consecutiva, de modo que sus URLs se descartan sin volver a agotar
+               el tiempo de espera. Si se indica un fichero, el estado se conserva entre rastreos.
+'''
+
+# Límites, en segundos, del tiempo de espera de las peticiones. El máximo se utiliza mientras no haya latencias
+TIMEOUT_MINIMO = 5.0
+TIMEOUT_MAXIMO = 30.0
+# Tiempo de espera mínimo del primer contacto con un host, que incluye el establecimiento del circuito hasta el
+# servicio oculto, como fracción del máximo. Un tiempo de espera demasiado corto haría caer los hosts lentos activos
+FRACCION_MINIMO_PRIMER_CONTACTO = 0.5
+# Pesos del suavizado exponencial de la latencia y de su desviación y multiplicador de la desviación en el tiempo de
+# espera, como en el cálculo del tiempo de retransmisión de TCP (RFC 6298)
+FACTOR_LATENCIA = 0.125
+FACTOR_DESVIACION = 0.25
+MULTIPLICADOR_DESVIACION = 4
+# Fallos consecutivos tras los que se considera caído un host que ya ha respondido alguna vez. Un host que nunca ha
+# respondido se considera caído tras el primer fallo
+FALLOS_HOST_CONOCIDO = 2
+# Tiempo de vida, en segundos, de la primera caída de un host y máximo tras duplicarse en las siguientes
+TTL_CAIDA = 1800.0
+TTL_CAIDA_MAXIMO = 86400.0
+# Segundos tras los que se eliminan del fichero los hosts sin actividad
+TIEMPO_VIDA_ENTRADAS = 30 * 86400.0
+
+
+'''
+* CLASE: EstadoVitalidad
+* DESCRIPCIÓN: Clase que almacena la latencia suavizada de un host y su desviación, sus fallos consecutivos y el
+               instante hasta el que se considera caído.
+'''
+class EstadoVitalidad():
+    def __init__(self, latencia=None, desviacion=0.0, num_fallos=0, num_caidas=0, instante_reintento=0.0, instante=0.0):
+        self.latencia = latencia
+        self.desviacion = desviacion
+        self.num_fallos = num_fallos
+        self.num_caidas = num_caidas
+        # Instante (time.time) a partir del cual se vuelve a intentar contactar con el host
+        self.instante_reintento = instante_reintento
+        # Instante (time.time) de la última actualización
+        self.instante = instante
+
+
+'''
+* CLASE: CacheVitalidadHosts
+* DESCRIPCIÓN: Clase que registra el resultado de las peticiones a cada host, calcula sus tiempos de espera y
+               determina si está caído. Los datos se conservan en memoria y, si se indica un fichero, en una base de
+               datos SQLite entre ejecuciones. Puede utilizarse desde varios hilos.
+'''
+class CacheVitalidadHosts():
+    def __init__(self, ruta_disco=None, timeout_minimo=TIMEOUT_MINIMO, timeout_maximo=TIMEOUT_MAXIMO,
+                 ttl_caida=TTL_CAIDA, ttl_caida_maximo=TTL_CAIDA_MAXIMO):
+        self.timeout_minimo = timeout_minimo
+        self.timeout_maximo = timeout_maximo
+        self.ttl_caida = ttl_caida
+        self.ttl_caida_maximo = ttl_caida_maximo
+
+        # Estado de cada host. Clave: host. Valor: EstadoVitalidad
+        self.diccionario_host_estado = {}
+        # Latencia suavizada del primer contacto con un host, que incluye el establecimiento del circuito hasta el
+        # servicio oculto, y su desviación. Determinan el tiempo de espera de los hosts sin latencia propia
+        self.latencia_primer_contacto = None
+        self.desviacion_primer_contacto = 0.0
+        self.cerrojo = Lock()
+
+        self.conexion = None
+        if ruta_disco:
+            self.conexion = sqlite3.connect(ruta_disco, check_same_thread=False)
+            self.conexion.execute("PRAGMA journal_mode=WAL")
+            self.conexion.execute("CREATE TABLE IF NOT EXISTS hosts (host TEXT PRIMARY KEY, latencia REAL, desviacion REAL NOT NULL, "
+                                  "num_fallos INTEGER NOT NULL, num_caidas INTEGER NOT NULL, instante_reintento REAL NOT NULL, "
+                                  "instante REAL NOT NULL)")
+            with self.conexion:
+                self.conexion.execute("DELETE FROM hosts WHERE instante < ? AND instante_reintento < ?",
+                                      (time.time() - TIEMPO_VIDA_ENTRADAS, time.time()))
+            for host, *valores in self.conexion.execute("SELECT host, latencia, desviacion, num_fallos, num_caidas, "
+                                                        "instante_reintento, instante FROM hosts"):
+                self.diccionario_host_estado[host] = EstadoVitalidad(*valores)
+
+        # Número de veces que un host ha pasado a considerarse caído en esta ejecución
+        self.num_hosts_caidos = 0
+
+    '''
+    * FUNCIÓN: host_caido
+    * DESCRIPCIÓN: Comprueba si un host se considera caído.
+    * ARGS_IN:
+        - host: host de la URL (netloc en minúsculas).
+    * ARGS_OUT:
+        - True si el host está caído y no debe contactarse.
+    '''
+    def host_caido(self, host):
+        with self.cerrojo:
+            estado = self.diccionario_host_estado.get(host)
+            return estado is not None and estado.instante_reintento > time.time()
+
+    '''
+    * FUNCIÓN: timeout
+    * DESCRIPCIÓN: Calcula el tiempo de espera de una petición a un host: su latencia suavizada más
+                   MULTIPLICADOR_DESVIACION veces su desviación. Sin latencia del host se utiliza la de primer
+                   contacto, con un mínimo de FRACCION_MINIMO_PRIMER_CONTACTO veces el máximo, y, sin ninguna, el
+                   tiempo de espera máximo.
+    * ARGS_IN:
+        - host: host de la URL (netloc en minúsculas).
+    * ARGS_OUT:
+        - Segundos de espera, entre el mínimo y el máximo configurados.
+    '''
+    def timeout(self, host):
+        with self.cerrojo:
+            estado = self.diccionario_host_estado.get(host)
+            if estado is not None and estado.latencia is not None:
+                latencia, desviacion = estado.latencia, estado.desviacion
+                timeout_minimo = self.timeout_minimo
+            elif self.latencia_primer_contacto is not None:
+                latencia, desviacion = self.latencia_primer_contacto, self.desviacion_primer_contacto
+                timeout_minimo = max(self.timeout_minimo, FRACCION_MINIMO_PRIMER_CONTACTO * self.timeout_maximo)
+            else:
+                return self.timeout_maximo
+        return min(self.timeout_maximo, max(timeout_minimo, latencia + MULTIPLICADOR_DESVIACION * desviacion))
+
+    '''
+    * FUNCIÓN: registrar_exito
+    * DESCRIPCIÓN: Registra la respuesta de un host, que deja de considerarse caído, y actualiza su latencia.
+    * ARGS_IN:
+        - host: host de la URL (netloc en minúsculas).
+        - latencia: segundos hasta recibir las cabeceras de la respuesta.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def registrar_exito(self, host, latencia):
+        with self.cerrojo:
+            estado = self.diccionario_host_estado.setdefault(host, EstadoVitalidad())
+            if estado.latencia is None:
+                self.latencia_primer_contacto, self.desviacion_primer_contacto = suavizar(
+                    self.latencia_primer_contacto, self.desviacion_primer_contacto, latencia)
+            estado.latencia, estado.desviacion = suavizar(estado.latencia, estado.desviacion, latencia)
+            estado.num_fallos = 0
+            estado.num_caidas = 0
+            estado.instante_reintento = 0.0
+            self.guardar(host, estado)
+
+    '''
+    * FUNCIÓN: registrar_fallo
+    * DESCRIPCIÓN: Registra un fallo de conexión con un host. Si el host nunca ha respondido, o si acumula
+                   FALLOS_HOST_CONOCIDO fallos consecutivos, se considera caído durante un tiempo de vida que se
+                   duplica con cada caída consecutiva.
+    * ARGS_IN:
+        - host: host de la URL (netloc en minúsculas).
+    * ARGS_OUT:
+        - True si el host pasa a considerarse caído.
+    '''
+    def registrar_fallo(self, host):
+        with self.cerrojo:
+            estado = self.diccionario_host_estado.setdefault(host, EstadoVitalidad())
+            estado.num_fallos += 1
+            caido = estado.latencia is None or estado.num_fallos >= FALLOS_HOST_CONOCIDO
+            if caido:
+                estado.num_caidas += 1
+                estado.num_fallos = 0
+                ttl = min(self.ttl_caida_maximo, self.ttl_caida * 2 ** min(estado.num_caidas - 1, 32))
+                estado.instante_reintento = time.time() + ttl
+                self.num_hosts_caidos += 1
+            self.guardar(host, estado)
+            return caido
+
+    '''
+    * FUNCIÓN: guardar
+    * DESCRIPCIÓN: Actualiza el instante del estado de un host y lo guarda en disco, si se ha configurado. Debe
+                   llamarse con el cerrojo adquirido.
+    * ARGS_IN:
+        - host: host de la URL.
+        - estado: EstadoVitalidad del host.
+    * ARGS_OUT:
+        - N/A
+    '''
+    def guardar(self, host, estado):
+        estado.instante = time.time()
+        if self.conexion:
+            with self.conexion:
+                self.conexion.execute("INSERT OR REPLACE INTO hosts (host, latencia, desviacion, num_fallos, num_caidas, "
+                                      "instante_reintento, instante) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                      (host, estado.latencia, estado.desviacion, estado.num_fallos, estado.num_caidas,
+                                       estado.instante_reintento, estado.instante))
+
+    '''
+    * FUNCIÓN: estadisticas
+    * DESCRIPCIÓN: Devuelve las estadísticas de la caché.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - Diccionario con el número de hosts registrados y de caídas de hosts en esta ejecución.
+    '''
+    def estadisticas(self):
+        with self.cerrojo:
+            return {"hosts": len(self.diccionario_host_estado), "hosts_caidos": self.num_hosts_caidos}
+
+    '''
+    * FUNCIÓN: cerrar
+    * DESCRIPCIÓN: Cierra la base de datos en disco, si se ha configurado.
+    * ARGS_IN:
+        - N/A
+    * ARGS_OUT:
+        - N/A
+    '''
+    def cerrar(self):
+        with self.cerrojo:
+            if self.conexion:
+                self.conexion.close()
+                self.conexion = None
+
+
+'''
+* FUNCIÓN: suavizar
+* DESCRIPCIÓN: Actualiza una latencia suavizada y su desviación con una nueva medida.
+* ARGS_IN:
+    - latencia: latencia suavizada. None, si no hay medidas previas.
+    - desviacion: desviación suavizada.
+    - medida: nueva latencia medida.
+* ARGS_OUT:
+    - Nueva latencia suavizada y nueva desviación.
+'''
+def suavizar(latencia, desviacion, medida):
+    if latencia is None:
+        return medida, medida / 2
+    desviacion = (1 - FACTOR_DESVIACION) * desviacion + FACTOR_DESVIACION * abs(medida - latencia)
+    return (1 - FACTOR_LATENCIA) * latencia + FACTOR_LATENCIA * medida, desviacion
+
+
+'''
+* FUNCIÓN: fallo_del_host
+* DESCRIPCIÓN: Comprueba si el error de una petición indica que el host no está disponible. Los errores al conectar
+               con el propio proxy de TOR no se atribuyen al host, para no marcar como caídos todos los hosts si el
+               proxy deja de funcionar.
+* ARGS_IN:
+    - excepcion: excepción lanzada por requests.
+* ARGS_OUT:
+    - True si el error es un fallo de conexión o un tiempo de espera agotado del host.
+'''
+def fallo_del_host(excepcion):
+    if not isinstance(excepcion, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return False
+    return not fallo_del_circuito(excepcion)